@@ -1,10 +1,14 @@
 import sys
 from importlib import import_module
 from types import ModuleType
+from typing import Optional, Tuple
 from . import __name__ as _module_name
 from .errors import get_exception_text
 
 
+_HELP_COMMANDS: Tuple[str, ...] = ("", "_h", "__help", "help")
+
+
 def _print_help() -> None:
     print(
         "Usage:\n"
@@ -33,7 +37,12 @@ def _print_help() -> None:
         "                              exclusion patterns.\n"
         "  distribute                  Build and distribute to PYPI (or other "
         "indexes)\n"
-        "                              with one command."
+        "                              with one command.\n"
+        "  serve                       Run a daemon which keeps installed "
+        "distribution\n"
+        "                              information in memory to speed up "
+        "subsequent\n"
+        "                              commands."
     )
 
 
@@ -44,11 +53,37 @@ def _get_command() -> str:
     return command
 
 
-def main() -> None:
+def _forward(command: str) -> None:
+    """
+    Send a command to the daemon (see `daves_dev_tools.serve`) if it is
+    running, and exit with the command's status if it was served.
+    """
+    from .serve import SERVED_COMMANDS, forward
+
+    if command in SERVED_COMMANDS:
+        status: Optional[int] = forward(
+            [command.replace("_", "-")] + sys.argv[1:]
+        )
+        if status is not None:
+            sys.exit(status)
+
+
+def main(forward: bool = True) -> None:
     """
     Run a sub-module `main` function.
+
+    Parameters:
+
+    - forward (bool) = True: If `True`, and the daemon is running, the
+      command is sent to the daemon rather than being run in this process
     """
     command = _get_command()
+    if command in _HELP_COMMANDS:
+        # Help is printed without importing any sub-modules
+        _print_help()
+        return
+    if forward:
+        _forward(command)
     module: ModuleType
     try:
         try:
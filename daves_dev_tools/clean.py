@@ -2,20 +2,34 @@
 This module cleans up files which are ignored by git
 """
 import argparse
+import json
 import os
+import re
 import shutil
-from subprocess import check_output, check_call
-from collections import deque
-from glob import iglob
-from itertools import chain
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from subprocess import (
+    DEVNULL,
+    PIPE,
+    CalledProcessError,
+    Popen,
+    check_output,
+    check_call,
+)
 from typing import (
+    Any,
+    Callable,
     Dict,
     Tuple,
     Iterable,
     Sequence,
     Set,
     FrozenSet,
+    IO,
     List,
+    Optional,
+    Pattern,
 )
 
 ROOT_DIRECTORY: str = "."
@@ -25,83 +39,202 @@ DEFAULT_EXCLUDE: Tuple[str, ...] = (
     ".git",  # Git history
     "venv",  # Commonly used location for virtual environments
 )
+_GLOB_CHARACTERS: Pattern = re.compile(r"[*?[]")
+REPORT_FORMATS: Tuple[str, ...] = ("text", "json")
+# The number of files deleted by each task submitted to the thread pool
+_DELETE_BATCH_SIZE: int = 256
+
+
+def _translate_glob_component(component: str) -> str:
+    """
+    Translate one path component of a glob pattern into a regular
+    expression, in which wildcards do not match "/" (or, as with `glob`, a
+    leading ".")
+    """
+    expression: str = (
+        "(?!\\.)" if component.startswith(("*", "?", "[")) else ""
+    )
+    index: int = 0
+    while index < len(component):
+        character: str = component[index]
+        index += 1
+        if character == "*":
+            expression += "[^/]*"
+        elif character == "?":
+            expression += "[^/]"
+        elif character == "[":
+            end: int = component.find("]", index + 1)
+            if end == -1:
+                expression += "\\["
+            else:
+                characters: str = component[index:end].replace("\\", "\\\\")
+                if characters.startswith("!"):
+                    characters = "^" + characters[1:]
+                expression += f"[{characters}]"
+                index = end + 1
+        else:
+            expression += re.escape(character)
+    return expression
 
 
-def _get_directory_globs_files(
-    directory: str, patterns: Iterable[str], *, recursive: bool = False
-) -> FrozenSet[str]:
+def _translate_glob(components: Sequence[str]) -> str:
+    """
+    Translate the path components of a glob pattern into a regular
+    expression, where "**" matches any number of directories
     """
-    Return a `frozenset` of file names matching the glob `pattern` within
-    `directory`, or in a directory matching the glob pattern.
+    expression: str = ""
+    index: int
+    component: str
+    for index, component in enumerate(components):
+        if component != "**":
+            expression += _translate_glob_component(component)
+            if index + 1 < len(components):
+                expression += "/"
+        elif index + 1 < len(components):
+            expression += "(?:.*/)?"
+        else:
+            expression += ".*"
+    return expression
+
+
+def _get_exclude_matcher(patterns: Iterable[str]) -> Callable[[str], bool]:
+    """
+    Return a function which accepts a relative path, and returns `True` if
+    the path, or any of its parent directories, matches one of the glob
+    `patterns`.
+
+    Patterns without wildcards are stored in a prefix tree of path
+    components, and all other patterns are compiled into a single regular
+    expression, so that each path is checked in one pass.
 
     Parameters:
 
-    - directory (str)
     - patterns ([str])
-    - recursive (bool) = False
     """
     if isinstance(patterns, str):
         patterns = (patterns,)
-    file_relative_paths: Set[str]
-    relative_paths: FrozenSet[str]
-    current_directory: str = os.path.curdir
-    os.chdir(directory)
-    try:
-        relative_paths = frozenset()
+    tree: Dict[str, Any] = {}
+    expressions: List[str] = []
+    pattern: str
+    for pattern in patterns:
+        components: List[str] = [
+            component
+            for component in pattern.replace("\\", "/").split("/")
+            if component and component != "."
+        ]
+        if not components:
+            continue
+        if _GLOB_CHARACTERS.search(pattern):
+            expressions.append(_translate_glob(components))
+        else:
+            node: Dict[str, Any] = tree
+            component: str
+            for component in components:
+                node = node.setdefault(component, {})
+            # An empty key indicates that a pattern ends here
+            node[""] = True
+    expression: Optional[Pattern] = (
+        re.compile(f"(?:{'|'.join(expressions)})(?:/.*)?", re.DOTALL)
+        if expressions
+        else None
+    )
 
-        def add_glob(pattern: str) -> None:
-            nonlocal relative_paths
-            relative_paths |= frozenset(iglob(pattern, recursive=recursive))
+    def is_excluded(path: str) -> bool:
+        node: Dict[str, Any] = tree
+        component: str
+        for component in path.split("/"):
+            if component not in node:
+                break
+            node = node[component]
+            if "" in node:
+                return True
+        return bool(expression and expression.fullmatch(path))
 
-        deque(map(add_glob, patterns), maxlen=0)
-        file_relative_paths = set()
-        relative_path: str
-        for relative_path in relative_paths:
-            if os.path.isdir(relative_path):
-                sub_directory: str
-                _: Iterable[str]
-                files: Iterable[str]
-                for sub_directory, _, files in os.walk(relative_path):
-                    sub_directory = sub_directory.replace("\\", "/")
-                    file: str
-                    for file in files:
-                        file_relative_paths.add(f"{sub_directory}/{file}")
-            else:
-                file_relative_paths.add(relative_path.replace("\\", "/"))
-    finally:
-        os.chdir(current_directory)
-    return frozenset(file_relative_paths)
+    return is_excluded
 
 
-def _get_directory_globs(
-    directory: str, patterns: Iterable[str], *, recursive: bool = False
-) -> FrozenSet[str]:
+def _iter_null_delimited(binary_io: IO[bytes]) -> Iterable[str]:
+    """
+    Yield each NUL-delimited path from a binary stream, as it is read
     """
-    Return a `frozenset` of directory paths matching the glob `pattern` within
-    `directory`, or in a directory matching the glob pattern.
+    remainder: bytes = b""
+    chunk: bytes
+    for chunk in iter(partial(binary_io.read1, 65536), b""):  # type: ignore
+        paths: List[bytes] = (remainder + chunk).split(b"\0")
+        remainder = paths.pop()
+        yield from map(os.fsdecode, paths)
+    if remainder:
+        yield os.fsdecode(remainder)
 
-    Parameters:
 
-    - directory (str)
-    - patterns ([str])
-    - recursive (bool) = False
-    """
-    if isinstance(patterns, str):
-        patterns = (patterns,)
-    relative_paths: FrozenSet[str]
-    current_directory: str = os.path.curdir
-    os.chdir(directory)
+def _is_git_work_tree(directory: str) -> bool:
     try:
-        relative_paths = frozenset()
+        return (
+            check_output(
+                ("git", "rev-parse", "--is-inside-work-tree"),
+                cwd=directory,
+                stderr=DEVNULL,
+                universal_newlines=True,
+            ).strip()
+            == "true"
+        )
+    except (CalledProcessError, OSError):
+        return False
 
-        def add_glob(pattern: str) -> None:
-            nonlocal relative_paths
-            relative_paths |= frozenset(iglob(pattern, recursive=recursive))
 
-        deque(map(add_glob, patterns), maxlen=0)
-    finally:
-        os.chdir(current_directory)
-    return relative_paths
+def iter_ignored_files(
+    directory: str = ".", directories: bool = False
+) -> Iterable[str]:
+    """
+    Yield the relative paths of all files in `directory` which are ignored
+    by git, as they are listed by `git ls-files`. The git index is not
+    modified. If `directory` is not in a git work tree, no paths are yielded.
+
+    Parameters:
+
+    - directory (str) = ".": The root project directory.
+    - directories (bool) = False: If `True`, a directory which is ignored
+      in its entirety is yielded as one path (ending with "/"). Note that
+      git may also yield some paths within such directories.
+    """
+    with Popen(
+        (
+            "git",
+            "ls-files",
+            "--others",
+            "--ignored",
+            "--exclude-standard",
+            "-z",
+        )
+        + (("--directory",) if directories else ()),
+        cwd=directory,
+        stdout=PIPE,
+    ) as process:
+        assert process.stdout is not None
+        try:
+            yield from _iter_null_delimited(process.stdout)
+        finally:
+            # If iteration is abandoned, stop listing files
+            if process.poll() is None:
+                process.kill()
+    if process.returncode > 0:
+        raise CalledProcessError(process.returncode, process.args)
+
+
+def _get_ignored_files_in_new_repository(directory: str) -> Set[str]:
+    # Outside of a git work tree, a repository is initialized and
+    # un-ignored files are added to it, leaving only ignored files untracked
+    check_call(("git", "init", directory))
+    check_call(("git", "add", directory))
+    return set(
+        check_output(
+            ("git", "ls-files", "-o", directory),
+            encoding="utf-8",
+            universal_newlines=True,
+        )
+        .strip()
+        .split("\n")
+    )
 
 
 def get_ignored_files(
@@ -113,6 +246,10 @@ def get_ignored_files(
     in `directory` excluding those matching any of the glob patterns
     in `exclude`.
 
+    If `directory` is in a git work tree, ignored files are listed using
+    `git ls-files`, without modifying the index. Otherwise, a repository is
+    initialized in `directory`, and all un-ignored files are added to it.
+
     Parameters:
 
     - directory (str): The root project directory.
@@ -120,128 +257,431 @@ def get_ignored_files(
       files and sub-directories to exclude.
     """
     directory = os.path.abspath(directory)
-    check_call(("git", "init", directory))
-    check_call(("git", "add", directory))
+    ignored_files: Iterable[str]
+    if _is_git_work_tree(directory):
+        ignored_files = iter_ignored_files(directory)
+    else:
+        ignored_files = _get_ignored_files_in_new_repository(directory)
+    is_excluded: Callable[[str], bool] = _get_exclude_matcher(exclude)
     return set(
-        check_output(
-            ("git", "ls-files", "-o", directory),
-            encoding="utf-8",
-            universal_newlines=True,
+        path.replace("\\", "/")
+        for path in ignored_files
+        if not is_excluded(path.replace("\\", "/"))
+    )
+
+
+def _is_empty(path: str) -> bool:
+    try:
+        with os.scandir(path) as entries:
+            return not any(entry.name != ".DS_Store" for entry in entries)
+    except OSError:
+        return False
+
+
+def _delete_empty_sub_directories(
+    path: str,
+    relative_path: str,
+    is_excluded: Callable[[str], bool],
+    dry_run: bool = False,
+    echo: bool = True,
+) -> Tuple[int, int]:
+    """
+    Delete empty sub-directories of `path` (including those which become
+    empty once their own sub-directories are deleted), and return the
+    number of directories deleted and the number of entries remaining in
+    `path`. The contents of excluded directories are not inspected.
+    """
+    number_of_deleted_directories: int = 0
+    number_of_remaining_entries: int = 0
+    entries: List[os.DirEntry]
+    try:
+        with os.scandir(path) as entries_iterator:
+            entries = list(entries_iterator)
+    except OSError:
+        return 0, 1
+    entry: os.DirEntry
+    for entry in entries:
+        if entry.name == ".DS_Store":
+            continue
+        if not entry.is_dir(follow_symlinks=False):
+            number_of_remaining_entries += 1
+            continue
+        entry_relative_path: str = (
+            f"{relative_path}/{entry.name}" if relative_path else entry.name
         )
-        .strip()
-        .split("\n")
-    ) - _get_directory_globs_files(directory, exclude, recursive=True)
+        empty: bool
+        if is_excluded(entry_relative_path):
+            empty = _is_empty(entry.path)
+        else:
+            number_of_sub_directories: int
+            number_of_entries: int
+            (
+                number_of_sub_directories,
+                number_of_entries,
+            ) = _delete_empty_sub_directories(
+                entry.path, entry_relative_path, is_excluded, dry_run, echo
+            )
+            number_of_deleted_directories += number_of_sub_directories
+            empty = not number_of_entries
+        if empty:
+            _delete_directory(entry.path, dry_run, echo)
+            number_of_deleted_directories += 1
+        else:
+            number_of_remaining_entries += 1
+    return number_of_deleted_directories, number_of_remaining_entries
 
 
-def _is_sub_directory_excluded(
-    sub_directory: str, directory: str, exclude: FrozenSet[str]
-) -> bool:
-    relative_sub_directory: str = os.path.relpath(
-        os.path.abspath(sub_directory), directory
-    )
-    if relative_sub_directory.startswith("./"):
-        relative_sub_directory = relative_sub_directory[2:]
-    relative_sub_directory_list: List[str] = relative_sub_directory.split("/")
-    index: int
-    for index in range(1, len(relative_sub_directory_list)):
-        ancestor: str = "/".join(relative_sub_directory_list[:index])
-        if ancestor in exclude:
-            return True
-    return False
+def _delete_directory(
+    path: str, dry_run: bool = False, echo: bool = True
+) -> None:
+    if dry_run:
+        if echo:
+            print(f"rm -R {path}")
+    else:
+        # The directory may still contain ".DS_Store" files
+        shutil.rmtree(path)
 
 
 def delete_empty_directories(
     directory: str = ".",
     exclude: FrozenSet[str] = frozenset(),
     dry_run: bool = False,
-    _recurrence: bool = False,
+    report: str = "text",
 ) -> int:
     """
-    Deletes empty directories under the current directory.
+    Deletes empty directories under the current directory, in a single
+    bottom-up pass: directories which become empty once their empty
+    sub-directories are deleted are deleted as well.
 
     Parameters:
 
     - exclude ({str}) = frozenset():
-      A set of top-level directory names to exclude
+      A set of glob patterns for directories whose contents should be left
+      untouched
+    - report (str) = "text": If "json", a JSON object is printed with the
+      number of "empty_directories" deleted
     """
-    number_of_deleted_directories: int = 0
-    sub_directory: str
-    sub_directories: Sequence[str]
-    files: Sequence[str]
-    exclude = _get_directory_globs(directory, exclude)
-    for sub_directory, sub_directories, files in os.walk(
-        directory, topdown=False
-    ):
-        if not (
-            _is_sub_directory_excluded(sub_directory, directory, exclude)
-            or any(
-                filter(
-                    lambda name: name != ".DS_Store",
-                    chain(sub_directories, files),
-                )
+    echo: bool = report == "text"
+    number_of_deleted_directories: int
+    number_of_remaining_entries: int
+    (
+        number_of_deleted_directories,
+        number_of_remaining_entries,
+    ) = _delete_empty_sub_directories(
+        directory, "", _get_exclude_matcher(exclude), dry_run, echo
+    )
+    if not number_of_remaining_entries:
+        _delete_directory(directory, dry_run, echo)
+        number_of_deleted_directories += 1
+    if not echo:
+        print(
+            json.dumps({"empty_directories": number_of_deleted_directories}),
+            flush=True,
+        )
+    elif number_of_deleted_directories and not dry_run:
+        print(f"Deleted {number_of_deleted_directories} empty directories")
+    return number_of_deleted_directories
+
+
+def _format_size(size: float) -> str:
+    unit: str
+    for unit in ("bytes", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            break
+        size /= 1024
+    else:
+        unit = "TiB"
+    return f"{size:.0f} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+
+
+def _remove_files(paths_sizes: Sequence[Tuple[str, int]]) -> Tuple[int, int]:
+    """
+    Delete a batch of files, and return the number of files and bytes
+    deleted
+    """
+    number_of_files: int = 0
+    number_of_bytes: int = 0
+    path: str
+    size: int
+    for path, size in paths_sizes:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        number_of_files += 1
+        number_of_bytes += size
+    return number_of_files, number_of_bytes
+
+
+class _Deleter:
+    """
+    This class deletes files in batches using a thread pool, followed by any
+    ignored directories which have been emptied, and counts the files and
+    bytes deleted.
+    """
+
+    def __init__(
+        self,
+        executor: ThreadPoolExecutor,
+        is_excluded: Callable[[str], bool],
+        dry_run: bool = False,
+        report: str = "text",
+    ) -> None:
+        self.executor: ThreadPoolExecutor = executor
+        self.is_excluded: Callable[[str], bool] = is_excluded
+        self.dry_run: bool = dry_run
+        self.report: str = report
+        self.batch: List[Tuple[str, int]] = []
+        self.futures: List["Future[Tuple[int, int]]"] = []
+        # Directories to remove once their files are deleted, with
+        # sub-directories preceding their parents
+        self.directories: List[str] = []
+        self.number_of_files: int = 0
+        self.number_of_bytes: int = 0
+        # The number of files and bytes listed in each top-level directory
+        # ("." for files in the root directory)
+        self.directory_name: str = "."
+        self.directories_files_bytes: Dict[str, List[int]] = {}
+
+    def set_directory_name(self, directory_name: str) -> None:
+        """
+        Set the top-level directory of the files being added. Ignored paths
+        are listed in order, so once the directory changes, the previous
+        directory's totals are reported.
+        """
+        if directory_name != self.directory_name:
+            if self.directory_name != ".":
+                self.report_directory(self.directory_name)
+            self.directory_name = directory_name
+
+    def report_directory(self, directory_name: str) -> None:
+        files_bytes: Optional[List[int]] = self.directories_files_bytes.pop(
+            directory_name, None
+        )
+        if files_bytes and self.report == "json":
+            print(
+                json.dumps(
+                    {
+                        "directory": directory_name,
+                        "files": files_bytes[0],
+                        "bytes": files_bytes[1],
+                    }
+                ),
+                flush=True,
+            )
+
+    def submit(self) -> None:
+        if self.batch:
+            self.futures.append(
+                self.executor.submit(_remove_files, self.batch)
             )
+            self.batch = []
+
+    def add_file(self, path: str, size: int, echo: bool = True) -> None:
+        files_bytes: List[int] = self.directories_files_bytes.setdefault(
+            self.directory_name, [0, 0]
+        )
+        files_bytes[0] += 1
+        files_bytes[1] += size
+        if self.dry_run:
+            if echo and self.report == "text":
+                print(f"rm {path}")
+            self.number_of_files += 1
+            self.number_of_bytes += size
+        else:
+            self.batch.append((path, size))
+            if len(self.batch) >= _DELETE_BATCH_SIZE:
+                self.submit()
+
+    def _add_directory(
+        self, path: str, relative_path: str
+    ) -> Tuple[bool, List[str]]:
+        """
+        Delete all files in a directory (and its sub-directories) which are
+        not excluded, and return `True` if the directory can be removed,
+        along with the commands a dry run should print: "rm -R" for the
+        directory if it can be removed, otherwise the commands for its
+        contents.
+        """
+        removable: bool = True
+        commands: List[str] = []
+        entry: os.DirEntry
+        with os.scandir(path) as entries:
+            for entry in entries:
+                entry_relative_path: str = f"{relative_path}/{entry.name}"
+                if self.is_excluded(entry_relative_path):
+                    removable = False
+                elif entry.is_dir(follow_symlinks=False):
+                    entry_removable: bool
+                    entry_commands: List[str]
+                    entry_removable, entry_commands = self._add_directory(
+                        entry.path, entry_relative_path
+                    )
+                    removable = removable and entry_removable
+                    commands.extend(entry_commands)
+                else:
+                    # Files are still walked in a dry run, in order to count
+                    # the files and bytes which would be deleted
+                    self.add_file(
+                        entry.path,
+                        entry.stat(follow_symlinks=False).st_size,
+                        echo=False,
+                    )
+                    if self.dry_run:
+                        commands.append(f"rm {entry.path}")
+        if removable:
+            self.directories.append(path)
+            commands = [f"rm -R {path}"] if self.dry_run else []
+        return removable, commands
+
+    def add_directory(self, path: str, relative_path: str) -> bool:
+        """
+        Delete all files in a directory (and its sub-directories) which are
+        not excluded, and return `True` if the directory can be removed. In
+        a dry run, a directory which can be removed is printed once (rather
+        than each file in it).
+        """
+        removable: bool
+        commands: List[str]
+        removable, commands = self._add_directory(path, relative_path)
+        if self.report == "text":
+            command: str
+            for command in commands:
+                print(command)
+        return removable
+
+    def finish(self) -> Tuple[int, int]:
+        """
+        Wait for all files to be deleted, remove emptied directories, and
+        return the number of files and bytes deleted
+        """
+        self.submit()
+        directory_name: str
+        for directory_name in list(self.directories_files_bytes.keys()):
+            self.report_directory(directory_name)
+        number_of_files: int
+        number_of_bytes: int
+        for number_of_files, number_of_bytes in (
+            future.result() for future in self.futures
         ):
-            if dry_run:
-                print(f"rm -R {sub_directory}")
-            else:
-                shutil.rmtree(sub_directory)
-            number_of_deleted_directories += 1
-    if number_of_deleted_directories and not dry_run:
-        number_of_deleted_directories += delete_empty_directories(
-            directory,
-            exclude=exclude,
-            dry_run=dry_run,
-            _recurrence=True,
+            self.number_of_files += number_of_files
+            self.number_of_bytes += number_of_bytes
+        self.futures = []
+        if not self.dry_run:
+            path: str
+            for path in self.directories:
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    pass
+        self.directories = []
+        return self.number_of_files, self.number_of_bytes
+
+
+def _iter_ignored_paths(directory: str) -> Iterable[str]:
+    """
+    Yield the relative paths of ignored files, and of directories which are
+    ignored in their entirety (ending with "/"), omitting any paths within
+    those directories
+    """
+    if not _is_git_work_tree(directory):
+        yield from filter(
+            None, _get_ignored_files_in_new_repository(directory)
         )
-    if (not _recurrence) and number_of_deleted_directories:
-        if not dry_run:
-            print(f"Deleted {number_of_deleted_directories} empty directories")
-    return number_of_deleted_directories
+        return
+    ignored_directory: str = ""
+    path: str
+    for path in iter_ignored_files(directory, directories=True):
+        # Paths are listed in order, so those in an ignored directory
+        # immediately follow it
+        if not (ignored_directory and path.startswith(ignored_directory)):
+            if path.endswith("/"):
+                ignored_directory = path
+            yield path
+
+
+def _get_top_level_directory_name(relative_path: str) -> str:
+    name: str
+    separator: str
+    name, separator, _ = relative_path.partition("/")
+    return name if separator else "."
+
+
+def _delete_ignored_path(
+    deleter: _Deleter, directory: str, relative_path: str
+) -> None:
+    path: str = os.path.join(directory, relative_path)
+    if relative_path.endswith("/"):
+        deleter.add_directory(path.rstrip("/"), relative_path.rstrip("/"))
+    else:
+        try:
+            deleter.add_file(path, os.lstat(path).st_size)
+        except FileNotFoundError:
+            pass
 
 
 def delete_ignored(
     directory: str = ".",
     exclude: FrozenSet[str] = frozenset(),
     dry_run: bool = False,
-) -> None:
+    jobs: Optional[int] = None,
+    report: str = "text",
+) -> Tuple[int, int]:
     """
-    Delete files which are ignored by Git.
+    Delete files which are ignored by Git, and return the number of files
+    and bytes deleted. Files are deleted concurrently, and directories which
+    are ignored in their entirety are removed along with their contents.
 
     Parameters:
 
     - root_directory (str): The root project directory.
     - exclude ({{str}}) = {EXCLUDE_DIRECTORIES}: A `frozenset` of
       directories to leave untouched.
+    - dry_run (bool) = False: Print the files which would be deleted,
+      instead of deleting them
+    - jobs (int|None) = None: The maximum number of threads with which to
+      delete files (by default, this is determined by the number of CPUs)
+    - report (str) = "text": If "json", a JSON object is printed for each
+      top-level directory, as it is listed, with the number of ignored
+      "files" and "bytes" found in it, followed by an object with the total
+      number of "files" and "bytes" deleted and the elapsed "seconds"
     """
-    sub_directory_name: str
-    directories_files: Dict[str, Set[str]] = {}
-    paths: Set[str]
-    path: str
-    for path in get_ignored_files(directory=directory, exclude=exclude):
-        sub_directory_name = ""
-        if "/" in path:
-            sub_directory_name = path.split("/")[0]
-        if sub_directory_name not in directories_files:
-            directories_files[sub_directory_name] = set()
-        directories_files[sub_directory_name].add(
-            os.path.join(directory, path)
+    directory = os.path.abspath(directory)
+    is_excluded: Callable[[str], bool] = _get_exclude_matcher(exclude)
+    start: float = time.perf_counter()
+    number_of_files: int
+    number_of_bytes: int
+    with ThreadPoolExecutor(max_workers=jobs or None) as executor:
+        deleter: _Deleter = _Deleter(executor, is_excluded, dry_run, report)
+        relative_path: str
+        for relative_path in _iter_ignored_paths(directory):
+            relative_path = relative_path.replace("\\", "/")
+            if not is_excluded(relative_path.rstrip("/")):
+                deleter.set_directory_name(
+                    _get_top_level_directory_name(relative_path)
+                )
+                _delete_ignored_path(deleter, directory, relative_path)
+        number_of_files, number_of_bytes = deleter.finish()
+    seconds: float = time.perf_counter() - start
+    if report == "json":
+        print(
+            json.dumps(
+                {
+                    "files": number_of_files,
+                    "bytes": number_of_bytes,
+                    "seconds": round(seconds, 3),
+                }
+            ),
+            flush=True,
         )
-    for sub_directory_name, paths in directories_files.items():
-        number_of_files: int = len(paths)
-        if not dry_run:
-            print(
-                f"Deleting {number_of_files} ignored "
-                f'file{"s" if number_of_files > 1 else ""} in '
-                f"{sub_directory_name}"
-            )
-        for path in paths:
-            if dry_run:
-                print(f"rm {path}")
-            else:
-                try:
-                    os.remove(path)
-                except FileNotFoundError:
-                    pass
+    elif number_of_files and not dry_run:
+        print(
+            f"Deleted {number_of_files} ignored "
+            f'file{"s" if number_of_files > 1 else ""} '
+            f"({_format_size(number_of_bytes)}) in {seconds:.2f} seconds "
+            f"({number_of_files / (seconds or 1):.0f} files/s)"
+        )
+    return number_of_files, number_of_bytes
 
 
 delete_ignored.__doc__ = delete_ignored.__doc__.format(  # type: ignore
@@ -253,6 +693,8 @@ def clean(
     directory: str = ".",
     exclude: FrozenSet[str] = frozenset(DEFAULT_EXCLUDE),
     dry_run: bool = False,
+    jobs: Optional[int] = None,
+    report: str = "text",
 ) -> None:
     """
     Cleanup (delete) files which are ignored by Git and subsequently delete all
@@ -263,9 +705,19 @@ def clean(
     - root_directory (str) = ".": The project's root directory.
     - exclude ({{str}}) = {EXCLUDE_DIRECTORIES}: A `frozenset` of
       directories to leave untouched.
+    - jobs (int|None) = None: The maximum number of threads with which to
+      delete files (by default, this is determined by the number of CPUs)
+    - report (str) = "text": If "json", JSON objects are printed (one per
+      line) with the number of files and bytes found in each top-level
+      directory, the total number of files and bytes deleted, and the
+      number of empty directories deleted, in place of other output
     """
-    delete_ignored(directory, exclude=exclude, dry_run=dry_run)
-    delete_empty_directories(directory, exclude=exclude, dry_run=dry_run)
+    delete_ignored(
+        directory, exclude=exclude, dry_run=dry_run, jobs=jobs, report=report
+    )
+    delete_empty_directories(
+        directory, exclude=exclude, dry_run=dry_run, report=report
+    )
 
 
 clean.__doc__ = clean.__doc__.format(  # type: ignore
@@ -308,6 +760,30 @@ def main() -> None:
             "commands (a list of `rm FILE` commands)."
         ),
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        type=int,
+        help=(
+            "The maximum number of threads with which to delete files (by "
+            "default, this is determined by the number of CPUs)"
+        ),
+    )
+    parser.add_argument(
+        "--report",
+        default="text",
+        choices=REPORT_FORMATS,
+        help=(
+            'If "json", print a JSON object (on one line) for each '
+            "top-level directory containing ignored files, as it is "
+            'listed, with the number of "files" and "bytes" found, '
+            'followed by the total number of "files" and "bytes" deleted '
+            'and the number of "empty_directories" deleted, in place of '
+            "other output (use with `--dry-run` to measure the space "
+            "which would be freed)"
+        ),
+    )
     parser.add_argument(
         "directory",
         type=str,
@@ -322,6 +798,8 @@ def main() -> None:
             arguments.exclude if arguments.exclude else DEFAULT_EXCLUDE
         ),
         dry_run=arguments.dry_run,
+        jobs=arguments.jobs,
+        report=arguments.report,
     )
 
 
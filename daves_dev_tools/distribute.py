@@ -2,7 +2,6 @@ import functools
 import os
 import re
 import sys
-from distutils.core import run_setup
 from time import time
 from typing import (
     Any,
@@ -49,6 +48,9 @@ def _list_dist(
 
 
 def _setup(directory: str) -> FrozenSet[str]:
+    # `distutils` is imported on first use, as it is slow to import
+    from distutils.core import run_setup
+
     start_time: float = time()
     current_directory: str = os.path.abspath(os.path.curdir)
     os.chdir(directory)
@@ -110,6 +112,8 @@ def _dist(
 
 
 def _cleanup(directory: str) -> None:
+    from distutils.core import run_setup
+
     current_directory: str = os.path.abspath(os.path.curdir)
     os.chdir(directory)
     try:
@@ -1,10 +1,14 @@
 import sys
 from importlib import import_module
 from types import ModuleType
+from typing import Tuple
 from ..errors import get_exception_text
 from . import __name__ as _module_name
 
 
+_HELP_COMMANDS: Tuple[str, ...] = ("", "_h", "__help", "help")
+
+
 def _print_help() -> None:
     print(
         "Usage:\n"
@@ -31,6 +35,10 @@ def main() -> None:
     Run a sub-module `main` function.
     """
     command = _get_command()
+    if command in _HELP_COMMANDS:
+        # Help is printed without importing any sub-modules
+        _print_help()
+        return
     module: ModuleType
     try:
         try:
@@ -1,6 +1,6 @@
 import argparse
 import os
-from subprocess import check_call
+from subprocess import CalledProcessError, check_call, run
 from tempfile import mkdtemp
 from itertools import chain
 from shutil import move, rmtree
@@ -13,6 +13,56 @@ def _iglob_recursive(pathname: str) -> Iterator[str]:
     return iglob(pathname, recursive=True)
 
 
+def _get_sparse_checkout_pattern(file: str) -> str:
+    """
+    Translate a glob pattern (relative to the repository root) into a
+    sparse-checkout pattern
+    """
+    file = file.replace("\\", "/")
+    while file.startswith("./"):
+        file = file[2:]
+    # Anchor the pattern to the repository root (as with the glob pattern)
+    return "/" + file.lstrip("/")
+
+
+def _clone(
+    repo: str, directory: str, files: Iterable[str], branch: str = ""
+) -> None:
+    """
+    Perform a shallow clone of `repo` into `directory`, checking out only
+    the files matching the glob patterns in `files`.
+
+    A partial clone is attempted first, so that only blobs for matching
+    files are downloaded. If the installed git version, or the remote, does
+    not support this, the entire tree is cloned.
+    """
+    clone_command: Tuple[str, ...] = (
+        "git",
+        "clone",
+        "-q",
+        "--depth",
+        "1",
+        "--single-branch",
+    ) + (("-b", branch) if branch else ())
+    try:
+        check_call(
+            clone_command
+            + ("--filter=blob:none", "--no-checkout", "--sparse")
+            + (repo, directory)
+        )
+        run(
+            ("git", "sparse-checkout", "set", "--no-cone", "--stdin"),
+            input="\n".join(map(_get_sparse_checkout_pattern, files)),
+            cwd=directory,
+            universal_newlines=True,
+            check=True,
+        )
+        check_call(("git", "checkout", "-q"), cwd=directory)
+    except CalledProcessError:
+        rmtree(directory, ignore_errors=True)
+        check_call(clone_command + (repo, directory))
+
+
 def download(
     repo: str,
     files: Iterable[str] = ("**",),
@@ -23,7 +73,8 @@ def download(
 ) -> List[str]:
     """
     Download files from a git repository and return a list of the files
-    downloaded.
+    downloaded. Where supported by git and the remote, only the files
+    matching `files` are fetched (using a partial clone and sparse checkout).
 
     Parameters:
 
@@ -38,8 +89,7 @@ def download(
     - user (str) = ""
     - password (str) = ""
     """
-    if isinstance(files, str):
-        files = (files,)
+    files = (files,) if isinstance(files, str) else tuple(files)
     if not directory:
         directory = os.path.curdir
     if user or password:
@@ -47,13 +97,7 @@ def download(
     directory = os.path.abspath(directory)
     # Shallow clone into a temp directory
     temp_directory: str = mkdtemp(prefix="git_download_")
-    check_call(
-        (
-            ("git", "clone", "-q", "--depth", "1", "--single-branch")
-            + (("-b", branch) if branch else ())
-            + (repo, temp_directory)
-        )
-    )
+    _clone(repo, temp_directory, files, branch)
     # Remove the git directory, so those files aren't accidentally matched
     rmtree(os.path.join(temp_directory, ".git"), ignore_errors=True)
     current_directory: str = os.path.abspath(os.path.curdir)
@@ -78,8 +122,7 @@ def download(
     for path in matched_files:
         relative_path: str = os.path.relpath(path, temp_directory)
         new_path = os.path.join(directory, relative_path)
-        if os.path.sep in relative_path:
-            os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
         print(new_path)
         move(path, new_path)
         downloaded_paths.append(new_path)
@@ -15,7 +15,8 @@ def tag_version(directory: str = os.path.curdir, message: str = "") -> None:
     - directory (str)
     - message (str)
     """
-    version: str = get_setup_distribution_version(directory)
+    # The version is not cached, as it may be derived from version control
+    version: str = get_setup_distribution_version(directory, cache=False)
     if version:
         current_directory: str = os.path.abspath(os.path.curdir)
         os.chdir(directory)
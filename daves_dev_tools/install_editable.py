@@ -1,20 +1,22 @@
 import argparse
-import pkg_resources
 import re
-import sys
 import os
 from subprocess import list2cmdline
 from glob import glob
 from itertools import chain
 from pipes import quote
 from typing import Iterable, Set, List, Tuple, Pattern, Sequence
+from .requirements.index import IndexedDistribution
 from .requirements.utilities import (
     get_distribution,
     get_installed_distributions,
+    get_python_executable,
     get_requirements_required_distribution_names,
     normalize_name,
     get_setup_distribution_name,
     is_installed,
+    set_refresh_editable_distributions,
+    set_target_environment,
 )
 from .utilities import iter_parse_delimited_values, iter_sys_argv_pop, run
 
@@ -32,7 +34,7 @@ def _get_requirement_string(
 ) -> str:
     requirement_string: str = os.path.abspath(directory)
     if is_installed(name) and include_extras:
-        distribution: pkg_resources.Distribution = get_distribution(name)
+        distribution: IndexedDistribution = get_distribution(name)
         if distribution.extras:
             requirement_string = (
                 f"{requirement_string}[{','.join(distribution.extras)}]"
@@ -97,12 +99,9 @@ def _iter_find_distributions(
 def _get_distribution_major_version(name: str) -> int:
     version: str = ""
     try:
-        version = pkg_resources.get_distribution(name).version
-    except Exception:
-        try:
-            version = get_distribution(name).version
-        except KeyError:
-            pass
+        version = get_distribution(name).version
+    except KeyError:
+        pass
     if version:
         return int(version.split(".")[0])
     return -1
@@ -166,7 +165,12 @@ def find_and_install_distributions(
         )
     )
     if requirements:
-        command: Tuple[str, ...] = (sys.executable, "-m", "pip", "install")
+        command: Tuple[str, ...] = (
+            get_python_executable(),
+            "-m",
+            "pip",
+            "install",
+        )
         # For setuptools version 64, we use compatibility mode to avoid
         # issues with implicit namespace packages and mypy
         if _get_distribution_major_version("setuptools") >= 64:
@@ -206,6 +210,7 @@ def install_editable(
     dry_run: bool = False,
     include_extras: bool = False,
     pip_install_arguments: Sequence[str] = (),
+    batch_install: bool = False,
 ) -> None:
     """
     Install, in editable/develop mode, all distributions, except for those
@@ -231,9 +236,14 @@ def install_editable(
     - include_extras (bool)
     - pip_install_arguments ([str]): Additional arguments to pass on to
       `pip install`
+    - batch_install (bool) = False: If `True`, any missing distributions
+      required by `requirements` are installed using a single `pip install`
+      command
     """
     required_distribution_names: Set[str] = (
-        get_requirements_required_distribution_names(requirements)
+        get_requirements_required_distribution_names(
+            requirements, batch_install=batch_install
+        )
         if requirements
         else set(get_installed_distributions().keys())
     )
@@ -351,12 +361,63 @@ def main() -> None:
         const=True,
         help="Install all extras for all discovered distributions",
     )
+    parser.add_argument(
+        "-nr",
+        "--no-refresh",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't regenerate stale metadata for editable installations "
+            "before reading installed distributions (for read-only use, "
+            "where the cost of checking for stale metadata isn't warranted)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        type=int,
+        help=(
+            "The maximum number of editable installations for which "
+            "metadata may be regenerated concurrently (by default, the "
+            "number of CPUs is used)"
+        ),
+    )
+    parser.add_argument(
+        "-bi",
+        "--batch-install",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Install all missing distributions required by the specified "
+            "requirements using a single `pip install` command, rather than "
+            "installing each missing distribution as it is encountered"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--python",
+        default="",
+        type=str,
+        help=(
+            "The python executable of an environment to operate on, instead "
+            "of the current environment. Distribution metadata is read "
+            "directly from the environment's site-packages directories "
+            "(the executable is only run for `pip` commands)."
+        ),
+    )
     # For backwards compatibility, we accept requirements as either
     # positional or keyword arguments
     positional_arguments: List[str] = list(iter_sys_argv_pop())
     namespace: argparse.Namespace
     unknown_arguments: List[str]
     namespace, unknown_arguments = parser.parse_known_args()
+    set_refresh_editable_distributions(
+        not namespace.no_refresh, jobs=namespace.jobs
+    )
+    set_target_environment(namespace.python)
     install_editable(
         requirements=namespace.requirement + positional_arguments,
         directories=namespace.directory,
@@ -368,6 +429,7 @@ def main() -> None:
         dry_run=namespace.dry_run,
         include_extras=namespace.include_extras,
         pip_install_arguments=unknown_arguments,
+        batch_install=namespace.batch_install,
     )
 
 
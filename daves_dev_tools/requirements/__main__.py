@@ -1,11 +1,15 @@
 import sys
 from importlib import import_module
 from types import ModuleType
+from typing import Tuple
 from ..errors import get_exception_text
 
 from . import __name__ as _module_name
 
 
+_HELP_COMMANDS: Tuple[str, ...] = ("", "_h", "__help", "help")
+
+
 def _print_help() -> None:
     print(
         "Usage:\n"
@@ -18,7 +22,10 @@ def _print_help() -> None:
         "  freeze                      Print dependencies inferred from an "
         "installed distribution\n"
         "                              or project, in a similar format to the "
-        "output of `pip freeze`."
+        "output of `pip freeze`.\n"
+        "  graph                       Print the requirement graph for an "
+        "installed distribution\n"
+        "                              or project as JSON or Graphviz DOT."
     )
 
 
@@ -34,6 +41,10 @@ def main() -> None:
     Run a sub-module `main` function.
     """
     command = _get_command()
+    if command in _HELP_COMMANDS:
+        # Help is printed without importing any sub-modules
+        _print_help()
+        return
     module: ModuleType
     try:
         try:
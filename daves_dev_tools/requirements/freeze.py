@@ -1,17 +1,23 @@
-import pkg_resources
 import argparse
 from fnmatch import fnmatch
 from itertools import chain
-from typing import Iterable, Tuple, Set
+from typing import Dict, Iterable, List, Tuple, Set
+from warnings import warn
 from more_itertools import unique_everseen
+from .index import IndexedDistribution
 from .utilities import (
     get_required_distribution_names,
     get_distribution,
+    get_python_executable,
     install_requirement,
+    install_missing_requirements,
     iter_configuration_file_requirement_strings,
     get_requirement_string_distribution_name,
     normalize_name,
     is_configuration_file,
+    parse_requirement,
+    set_refresh_editable_distributions,
+    set_target_environment,
 )
 from ..utilities import iter_parse_delimited_values
 
@@ -27,6 +33,9 @@ def get_frozen_requirements(
     exclude: Iterable[str] = (),
     exclude_recursive: Iterable[str] = (),
     no_version: Iterable[str] = (),
+    batch_install: bool = False,
+    hashes: bool = False,
+    find_links: Iterable[str] = (),
 ) -> Tuple[str, ...]:
     """
     Get the (frozen) requirements for one or more specified distributions or
@@ -44,6 +53,16 @@ def get_frozen_requirements(
       those requirements occur elsewhere.
     - no_version ([str]) = (): Exclude version numbers from the output
       (only return distribution names)
+    - batch_install (bool) = False: If `True`, all missing required
+      distributions are installed using a single `pip install` command
+      before requirements are resolved, rather than being installed one at a
+      time as they are encountered
+    - hashes (bool) = False: If `True`, pinned requirements are followed by
+      `--hash` options for each archive from which the installed version of
+      that distribution could have been installed (see
+      `daves_dev_tools.requirements.hashes`)
+    - find_links ([str]) = (): Local directories containing wheels and/or
+      sdists to hash when `hashes` is `True`
     """
     # Separate requirement strings from requirement files
     if isinstance(requirements, str):
@@ -59,7 +78,7 @@ def get_frozen_requirements(
     )
     requirement_strings: Set[str] = requirements - requirement_files
     name: str
-    return tuple(
+    frozen_requirements: Tuple[str, ...] = tuple(
         sorted(
             _iter_frozen_requirements(
                 unique_everseen(
@@ -91,10 +110,62 @@ def get_frozen_requirements(
                 ),
                 exclude_recursive=set(map(normalize_name, exclude_recursive)),
                 no_version=no_version,
+                batch_install=batch_install,
             ),
             key=lambda name: name.lower(),
         )
     )
+    if hashes:
+        frozen_requirements = _add_requirement_hashes(
+            frozen_requirements, find_links
+        )
+    return frozen_requirements
+
+
+def _add_requirement_hashes(
+    requirement_strings: Iterable[str], find_links: Iterable[str] = ()
+) -> Tuple[str, ...]:
+    """
+    Append `--hash` options to each pinned requirement string
+    """
+    from .hashes import get_distributions_hashes
+
+    requirement_strings = tuple(requirement_strings)
+    requirement_string: str
+    pinned_names: Dict[str, str] = {
+        requirement_string: normalize_name(
+            parse_requirement(requirement_string).name
+        )
+        for requirement_string in requirement_strings
+        if "==" in requirement_string
+    }
+    distributions_hashes: Dict[
+        str, Tuple[str, ...]
+    ] = get_distributions_hashes(
+        map(get_distribution, pinned_names.values()), find_links
+    )
+    missing: List[str] = sorted(
+        set(pinned_names.values()) - set(distributions_hashes.keys())
+    )
+    if missing:
+        warn(
+            "No archive hashes could be found for the following "
+            f"distributions: {', '.join(missing)}"
+        )
+
+    def get_requirement_string(requirement_string: str) -> str:
+        name: str = pinned_names.get(requirement_string, "")
+        return " \\\n    ".join(
+            chain(
+                (requirement_string,),
+                (
+                    f"--hash={hash_}"
+                    for hash_ in distributions_hashes.get(name, ())
+                ),
+            )
+        )
+
+    return tuple(map(get_requirement_string, requirement_strings))
 
 
 def _iter_frozen_requirements(
@@ -102,7 +173,14 @@ def _iter_frozen_requirements(
     exclude: Set[str],
     exclude_recursive: Set[str],
     no_version: Iterable[str] = (),
+    batch_install: bool = False,
 ) -> Iterable[str]:
+    if batch_install:
+        requirement_strings = tuple(requirement_strings)
+        install_missing_requirements(
+            requirement_strings, exclude=exclude_recursive
+        )
+
     def get_requirement_string(distribution_name: str) -> str:
         def distribution_name_matches_pattern(pattern: str) -> bool:
             return fnmatch(distribution_name, pattern)
@@ -117,10 +195,14 @@ def _iter_frozen_requirements(
             map(distribution_name_matches_pattern, no_version)
         ):
             return distribution_name
-        distribution: pkg_resources.Distribution
+        distribution: IndexedDistribution
         try:
             distribution = get_distribution(distribution_name)
         except KeyError:
+            if not get_python_executable():
+                # The distribution is missing from a target environment
+                # in which it cannot be installed
+                return distribution_name
             # If the distribution is missing, install it
             install_requirement(distribution_name, echo=False)
             distribution = get_distribution(distribution_name)
@@ -153,6 +235,9 @@ def freeze(
     exclude: Iterable[str] = (),
     exclude_recursive: Iterable[str] = (),
     no_version: Iterable[str] = (),
+    batch_install: bool = False,
+    hashes: bool = False,
+    find_links: Iterable[str] = (),
 ) -> None:
     """
     Print the (frozen) requirements for one or more specified requirements or
@@ -172,6 +257,16 @@ def freeze(
     - no_version ([str]) = (): Exclude version numbers from the output
       (only print distribution names) for package names matching any of these
       patterns
+    - batch_install (bool) = False: If `True`, all missing required
+      distributions are installed using a single `pip install` command
+      before requirements are resolved, rather than being installed one at a
+      time as they are encountered
+    - hashes (bool) = False: If `True`, pinned requirements are followed by
+      `--hash` options for each archive from which the installed version of
+      that distribution could have been installed (see
+      `daves_dev_tools.requirements.hashes`)
+    - find_links ([str]) = (): Local directories containing wheels and/or
+      sdists to hash when `hashes` is `True`
     """
     print(
         "\n".join(
@@ -180,6 +275,9 @@ def freeze(
                 exclude=exclude,
                 exclude_recursive=exclude_recursive,
                 no_version=no_version,
+                batch_install=batch_install,
+                hashes=hashes,
+                find_links=find_links,
             )
         )
     )
@@ -250,7 +348,97 @@ def main() -> None:
             "value must be single-quoted if it contains wildcards)"
         ),
     )
+    parser.add_argument(
+        "-nr",
+        "--no-refresh",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't regenerate stale metadata for editable installations "
+            "before reading installed distributions (for read-only use, "
+            "where the cost of checking for stale metadata isn't warranted)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        type=int,
+        help=(
+            "The maximum number of editable installations for which "
+            "metadata may be regenerated concurrently (by default, the "
+            "number of CPUs is used)"
+        ),
+    )
+    parser.add_argument(
+        "-bi",
+        "--batch-install",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Install all missing required distributions using a single "
+            "`pip install` command, rather than installing each missing "
+            "distribution as it is encountered"
+        ),
+    )
+    parser.add_argument(
+        "-ha",
+        "--hashes",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Follow each pinned requirement with `--hash` options, for use "
+            "with `pip install --require-hashes`. Hashes are obtained from "
+            "the archive hashes pip records for direct URL installations, and "
+            "by hashing matching archives found in the directories specified "
+            "using -fl / --find-links."
+        ),
+    )
+    parser.add_argument(
+        "-fl",
+        "--find-links",
+        default=[],
+        type=str,
+        action="append",
+        help=(
+            "A local directory containing wheels and/or sdists (such as one "
+            "populated by `pip download` or `pip wheel`) to hash "
+            "when using -ha / --hashes"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--python",
+        default="",
+        type=str,
+        help=(
+            "The python executable of an environment to inspect, instead "
+            "of the current environment. Distribution metadata is read "
+            "directly from the environment's site-packages directories "
+            "(the executable is only run for `pip` commands)."
+        ),
+    )
+    parser.add_argument(
+        "-sp",
+        "--site-packages",
+        default=[],
+        type=str,
+        action="append",
+        help=(
+            "A site-packages directory of an environment to inspect, "
+            "instead of the current environment (this may be passed more "
+            "than once). If -p / --python is provided, site-packages "
+            "directories are inferred when not specified."
+        ),
+    )
     arguments: argparse.Namespace = parser.parse_args()
+    set_refresh_editable_distributions(
+        not arguments.no_refresh, jobs=arguments.jobs
+    )
+    set_target_environment(arguments.python, arguments.site_packages)
     freeze(
         requirements=arguments.requirement,
         exclude=tuple(iter_parse_delimited_values(arguments.exclude)),
@@ -258,6 +446,9 @@ def main() -> None:
             iter_parse_delimited_values(arguments.exclude_recursive)
         ),
         no_version=arguments.no_version,
+        batch_install=arguments.batch_install,
+        hashes=arguments.hashes,
+        find_links=arguments.find_links,
     )
 
 
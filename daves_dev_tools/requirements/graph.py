@@ -0,0 +1,379 @@
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import IO, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from packaging.requirements import Requirement
+from more_itertools import unique_everseen
+from .index import IndexedDistribution
+from .utilities import (
+    RequirementGraph,
+    get_installed_distributions,
+    get_requirement,
+    get_requirement_graph,
+    get_requirement_node,
+    install_missing_requirements,
+    is_configuration_file,
+    iter_configuration_file_requirement_strings,
+    normalize_name,
+    set_refresh_editable_distributions,
+    set_target_environment,
+)
+from ..utilities import iter_parse_delimited_values
+
+__all__: List[str] = [
+    "GraphNode",
+    "iter_graph_nodes",
+    "write_graph_json",
+    "write_graph_dot",
+    "write_graph",
+]
+
+
+@dataclass
+class GraphNode:
+    """
+    A resolved node of a requirement graph: a distribution, as installed
+    with a specific set of extras, and the requirements (edges) which apply
+    to it in the current environment.
+    """
+
+    name: str
+    extras: Tuple[str, ...]
+    version: Optional[str]
+    requirements: Tuple[Requirement, ...]
+
+    @property
+    def id(self) -> str:
+        return _get_node_id((self.name, self.extras))
+
+
+def _get_node_id(node: Tuple[str, Tuple[str, ...]]) -> str:
+    name: str
+    extras: Tuple[str, ...]
+    name, extras = node
+    if extras:
+        return f"{name}[{','.join(extras)}]"
+    return name
+
+
+def _get_requirement_node_id(requirement: Requirement) -> str:
+    return _get_node_id(get_requirement_node(requirement))
+
+
+def _iter_root_requirements(requirements: Iterable[str]) -> Iterable[str]:
+    # Separate requirement strings from requirement files
+    if isinstance(requirements, str):
+        requirements = (requirements,)
+    requirement: str
+    for requirement in requirements:
+        if is_configuration_file(requirement):
+            yield from iter_configuration_file_requirement_strings(requirement)
+        else:
+            yield requirement
+
+
+def iter_graph_nodes(
+    requirements: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+    echo: bool = False,
+    batch_install: bool = False,
+) -> Iterable[GraphNode]:
+    """
+    Resolve the requirement graph for one or more specified distributions or
+    configuration files, yielding each node as it is resolved.
+
+    Parameters:
+
+    - requirements ([str]): One or more requirement specifiers (for example:
+      "requirement-name[extra-a,extra-b]" or ".[extra-a, extra-b]) and/or paths
+      to a setup.cfg, pyproject.toml, tox.ini or requirements.txt file
+    - exclude ([str]): One or more distributions to exclude. Excluding a
+      distribution also halts traversal of its requirements.
+    - echo (bool) = False: If `True`, commands and responses executed in
+      subprocesses will be printed to `sys.stdout`
+    - batch_install (bool) = False: If `True`, all missing required
+      distributions are installed using a single `pip install` command
+      before the graph is resolved
+    """
+    if isinstance(exclude, str):
+        exclude = (exclude,)
+    exclude_names: Set[str] = set(map(normalize_name, exclude))
+    root_requirements: Tuple[Requirement, ...] = tuple(
+        map(
+            get_requirement,
+            unique_everseen(_iter_root_requirements(requirements)),
+        )
+    )
+    if batch_install:
+        install_missing_requirements(
+            root_requirements, exclude_names, echo=echo
+        )
+    graph: RequirementGraph = get_requirement_graph()
+    visited: Set[Tuple[str, Tuple[str, ...]]] = set()
+    stack: List[Requirement] = list(reversed(root_requirements))
+    while stack:
+        requirement: Requirement = stack.pop()
+        node: Tuple[str, Tuple[str, ...]] = get_requirement_node(requirement)
+        if (node in visited) or (node[0] in exclude_names):
+            continue
+        visited.add(node)
+        edges: Tuple[Requirement, ...] = tuple(
+            requirement_
+            for requirement_ in graph.get_requirements(requirement, echo=echo)
+            if get_requirement_node(requirement_)[0] not in exclude_names
+        )
+        distribution: Optional[
+            IndexedDistribution
+        ] = get_installed_distributions().get(node[0])
+        yield GraphNode(
+            name=node[0],
+            extras=node[1],
+            version=distribution.version if distribution else None,
+            requirements=edges,
+        )
+        stack.extend(reversed(edges))
+
+
+def _get_node_json(node: GraphNode) -> Dict[str, object]:
+    requirement: Requirement
+    return {
+        "id": node.id,
+        "name": node.name,
+        "extras": list(node.extras),
+        "version": node.version,
+        "requires": [
+            {
+                "id": _get_requirement_node_id(requirement),
+                "specifier": str(requirement.specifier),
+                "marker": (
+                    str(requirement.marker) if requirement.marker else None
+                ),
+            }
+            for requirement in node.requirements
+        ],
+    }
+
+
+def write_graph_json(nodes: Iterable[GraphNode], file_io: IO[str]) -> None:
+    """
+    Write graph nodes to `file_io` as a JSON array, one node at a time.
+    Each node's edges are listed in its "requires" array, and reference
+    other nodes by "id".
+    """
+    separator: str = "\n"
+    file_io.write("[")
+    node: GraphNode
+    for node in nodes:
+        file_io.write(separator)
+        file_io.write(json.dumps(_get_node_json(node)))
+        separator = ",\n"
+    file_io.write("\n]\n")
+
+
+def write_graph_dot(nodes: Iterable[GraphNode], file_io: IO[str]) -> None:
+    """
+    Write graph nodes to `file_io` in Graphviz DOT format, one node (and its
+    edges) at a time.
+    """
+    file_io.write("digraph requirements {\n")
+    node: GraphNode
+    for node in nodes:
+        node_id: str = json.dumps(node.id)
+        label: str = node.id
+        if node.version is not None:
+            label = f"{label}\n{node.version}"
+        file_io.write(f"  {node_id} [label={json.dumps(label)}];\n")
+        requirement: Requirement
+        for requirement in node.requirements:
+            edge_label: str = str(requirement.specifier)
+            if requirement.marker:
+                edge_label = f"{edge_label}; {requirement.marker}".lstrip()
+            file_io.write(
+                f"  {node_id} -> "
+                f"{json.dumps(_get_requirement_node_id(requirement))}"
+                + (f" [label={json.dumps(edge_label)}]" if edge_label else "")
+                + ";\n"
+            )
+    file_io.write("}\n")
+
+
+_WRITERS: Dict[str, Callable[[Iterable[GraphNode], IO[str]], None]] = {
+    "json": write_graph_json,
+    "dot": write_graph_dot,
+}
+
+
+def write_graph(
+    requirements: Iterable[str] = (),
+    file_io: Optional[IO[str]] = None,
+    output_format: str = "json",
+    exclude: Iterable[str] = (),
+    echo: bool = False,
+    batch_install: bool = False,
+) -> None:
+    """
+    Resolve the requirement graph for one or more specified distributions or
+    configuration files, and write it to `file_io` as it is resolved.
+
+    Parameters:
+
+    - requirements ([str]): One or more requirement specifiers and/or paths
+      to a setup.cfg, pyproject.toml, tox.ini or requirements.txt file
+    - file_io (typing.IO[str]) = None: The file to which the graph should
+      be written (defaults to `sys.stdout`)
+    - output_format (str) = "json": Either "json" or "dot" (Graphviz)
+    - exclude ([str]): One or more distributions to exclude
+    - echo (bool) = False: If `True`, commands and responses executed in
+      subprocesses will be printed to `sys.stdout`
+    - batch_install (bool) = False: If `True`, all missing required
+      distributions are installed using a single `pip install` command
+    """
+    _WRITERS[output_format](
+        iter_graph_nodes(
+            requirements,
+            exclude=exclude,
+            echo=echo,
+            batch_install=batch_install,
+        ),
+        file_io or sys.stdout,
+    )
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="daves-dev-tools requirements graph",
+        description=(
+            "This command prints the requirement graph for an installed "
+            "distribution or project, including extras, installed versions, "
+            "and the specifiers and markers of each requirement, as JSON or "
+            "in Graphviz DOT format."
+        ),
+    )
+    parser.add_argument(
+        "requirement",
+        nargs="+",
+        type=str,
+        help=(
+            "One or more requirement specifiers (for example: "
+            '"requirement-name", "requirement-name[extra-a,extra-b]", '
+            '".[extra-a, extra-b]" or '
+            '"../other-editable-package-directory[extra-a, extra-b]) '
+            "and/or paths to a setup.py, setup.cfg, pyproject.toml, "
+            "tox.ini or requirements.txt file"
+        ),
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        default="json",
+        choices=tuple(_WRITERS.keys()),
+        help='The output format (default: "json")',
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        type=str,
+        help="A file path to which the graph should be written",
+    )
+    parser.add_argument(
+        "-e",
+        "--exclude",
+        default=[],
+        type=str,
+        action="append",
+        help=(
+            "A distribution (or comma-separated list of distributions) to "
+            "exclude from the graph. Requirements of excluded "
+            "distributions are not traversed."
+        ),
+    )
+    parser.add_argument(
+        "-nr",
+        "--no-refresh",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't regenerate stale metadata for editable installations "
+            "before reading installed distributions (for read-only use, "
+            "where the cost of checking for stale metadata isn't warranted)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        type=int,
+        help=(
+            "The maximum number of editable installations for which "
+            "metadata may be regenerated concurrently (by default, the "
+            "number of CPUs is used)"
+        ),
+    )
+    parser.add_argument(
+        "-bi",
+        "--batch-install",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Install all missing required distributions using a single "
+            "`pip install` command, rather than installing each missing "
+            "distribution as it is encountered"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--python",
+        default="",
+        type=str,
+        help=(
+            "The python executable of an environment to inspect, instead "
+            "of the current environment. Distribution metadata is read "
+            "directly from the environment's site-packages directories "
+            "(the executable is only run for `pip` commands)."
+        ),
+    )
+    parser.add_argument(
+        "-sp",
+        "--site-packages",
+        default=[],
+        type=str,
+        action="append",
+        help=(
+            "A site-packages directory of an environment to inspect, "
+            "instead of the current environment (this may be passed more "
+            "than once). If -p / --python is provided, site-packages "
+            "directories are inferred when not specified."
+        ),
+    )
+    arguments: argparse.Namespace = parser.parse_args()
+    set_refresh_editable_distributions(
+        not arguments.no_refresh, jobs=arguments.jobs
+    )
+    set_target_environment(arguments.python, arguments.site_packages)
+    exclude: Tuple[str, ...] = tuple(
+        iter_parse_delimited_values(arguments.exclude)
+    )
+    if arguments.output == "-":
+        write_graph(
+            arguments.requirement,
+            output_format=arguments.format,
+            exclude=exclude,
+            batch_install=arguments.batch_install,
+        )
+    else:
+        with open(arguments.output, "w") as file_io:
+            write_graph(
+                arguments.requirement,
+                file_io=file_io,
+                output_format=arguments.format,
+                exclude=exclude,
+                batch_install=arguments.batch_install,
+            )
+
+
+if __name__ == "__main__":
+    main()
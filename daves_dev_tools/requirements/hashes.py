@@ -0,0 +1,253 @@
+"""
+This module finds content hashes for installed distributions, for use in
+`--hash` options of pip requirement files.
+
+A `--hash` option must match the archive (wheel or sdist) which pip
+downloads, so hashes are obtained from the archive hash recorded by pip for
+direct URL installations (in *direct_url.json*) and by hashing matching
+archives found in local directories (such as a wheelhouse populated by
+`pip download` or `pip wheel`). The digests listed in a distribution's
+*RECORD* describe installed files, rather than the archive, and so cannot be
+used for this purpose.
+
+Archives are hashed concurrently using memory-mapped reads, and digests are
+cached keyed on each archive's path, modification time and size.
+"""
+import hashlib
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from packaging.version import InvalidVersion, Version
+from .index import IndexedDistribution
+from .utilities import normalize_name
+from ..utilities import read_cache, write_cache
+
+__all__: List[str] = [
+    "get_file_sha256",
+    "get_files_sha256",
+    "get_distributions_hashes",
+]
+# Increment this whenever the structure of cached file hashes changes
+_FILE_HASHES_VERSION: int = 1
+_SDIST_SUFFIXES: Tuple[str, ...] = (".tar.gz", ".zip", ".tar.bz2")
+# The hash algorithms accepted by pip in `--hash` options
+_ALLOWED_ALGORITHMS: Tuple[str, ...] = ("sha256", "sha384", "sha512")
+
+
+def get_file_sha256(path: str) -> str:
+    """
+    Return the hexadecimal SHA-256 digest of a file's contents, reading the
+    file using a memory map (so that large archives are not loaded into
+    memory).
+    """
+    with open(path, "rb") as file_io:
+        if not os.fstat(file_io.fileno()).st_size:
+            # Empty files cannot be memory-mapped
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(
+            file_io.fileno(), 0, access=mmap.ACCESS_READ
+        ) as file_map:
+            return hashlib.sha256(file_map).hexdigest()
+
+
+def _get_file_fingerprint(path: str) -> List[int]:
+    stat_result: os.stat_result = os.stat(path)
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
+def _update_files_sha256_cache(entries: Dict[str, List[Any]]) -> None:
+    """
+    Merge `entries` into the cache of file digests, re-reading the cache
+    immediately before writing so that entries written by concurrent runs
+    are retained, and dropping entries for files which no longer exist.
+    """
+    cache: Dict[str, Any] = read_cache(
+        "file-hashes", "sha256", _FILE_HASHES_VERSION
+    )
+    cache.update(entries)
+    write_cache(
+        "file-hashes",
+        "sha256",
+        _FILE_HASHES_VERSION,
+        {
+            path: entry
+            for path, entry in cache.items()
+            if path in entries or os.path.exists(path)
+        },
+    )
+
+
+def get_files_sha256(
+    paths: Iterable[str], jobs: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Return a dictionary mapping each of the specified file paths to the
+    hexadecimal SHA-256 digest of its contents. Digests are computed in a
+    thread pool, and cached keyed on each file's path, modification time and
+    size (entries for files which no longer exist are dropped from the cache
+    whenever it is written).
+
+    Parameters:
+
+    - paths ([str])
+    - jobs (int|None) = None: The maximum number of files to hash
+      concurrently (by default, the number of CPUs is used)
+    """
+    cache: Dict[str, Any] = read_cache(
+        "file-hashes", "sha256", _FILE_HASHES_VERSION
+    )
+    digests: Dict[str, str] = {}
+    stale: Dict[str, List[Any]] = {}
+    path: str
+    for path in map(os.path.abspath, paths):
+        fingerprint: List[int] = _get_file_fingerprint(path)
+        cached: List[Any] = cache.get(path) or []
+        if cached[:2] == fingerprint:
+            digests[path] = cached[2]
+        else:
+            stale[path] = fingerprint
+    if stale:
+        with ThreadPoolExecutor(
+            max_workers=min(jobs or os.cpu_count() or 1, len(stale))
+        ) as executor:
+            digest: str
+            for path, digest in zip(
+                stale.keys(), executor.map(get_file_sha256, stale.keys())
+            ):
+                digests[path] = digest
+                stale[path].append(digest)
+        _update_files_sha256_cache(stale)
+    return digests
+
+
+def _get_version_key(version: str) -> str:
+    try:
+        return str(Version(version))
+    except InvalidVersion:
+        return version
+
+
+def _parse_archive_file_name(file_name: str) -> Tuple[str, str]:
+    """
+    Return the normalized distribution name and version for a wheel or sdist
+    file name, or empty strings if the file is not a recognized archive.
+    """
+    if file_name.endswith(".whl"):
+        parts: List[str] = file_name[:-4].split("-")
+        if len(parts) >= 5:
+            return normalize_name(parts[0]), _get_version_key(parts[1])
+        return "", ""
+    suffix: str
+    for suffix in _SDIST_SUFFIXES:
+        if file_name.endswith(suffix):
+            name: str
+            version: str
+            name, _, version = file_name[: -len(suffix)].rpartition("-")
+            if name:
+                return normalize_name(name), _get_version_key(version)
+    return "", ""
+
+
+def _get_archive_paths(
+    directories: Iterable[str],
+) -> Dict[Tuple[str, str], List[str]]:
+    """
+    Map (name, version) tuples to the paths of matching archives found in
+    the specified directories.
+    """
+    archive_paths: Dict[Tuple[str, str], List[str]] = {}
+    directory: str
+    for directory in directories:
+        entry: os.DirEntry
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                key: Tuple[str, str] = _parse_archive_file_name(entry.name)
+                if key[0] and entry.is_file():
+                    archive_paths.setdefault(key, []).append(entry.path)
+    return archive_paths
+
+
+def _iter_direct_url_hashes(
+    distribution: IndexedDistribution,
+) -> Iterable[str]:
+    """
+    Yield archive hashes (as "algorithm:digest") recorded by pip in
+    *direct_url.json* when a distribution is installed from an archive URL.
+    Hashes using algorithms which pip does not accept in `--hash` options
+    (such as md5 or sha1) are skipped.
+    """
+    if not distribution.egg_info:
+        return
+    try:
+        with open(
+            os.path.join(distribution.egg_info, "direct_url.json")
+        ) as direct_url_io:
+            archive_info: Dict[str, Any] = (
+                json.load(direct_url_io).get("archive_info") or {}
+            )
+    except (OSError, ValueError):
+        return
+    hashes: Dict[str, str] = dict(archive_info.get("hashes") or {})
+    if archive_info.get("hash"):
+        algorithm: str
+        digest: str
+        algorithm, _, digest = archive_info["hash"].partition("=")
+        hashes.setdefault(algorithm, digest)
+    for algorithm, digest in hashes.items():
+        if algorithm.lower() in _ALLOWED_ALGORITHMS and digest:
+            yield f"{algorithm.lower()}:{digest}"
+
+
+def get_distributions_hashes(
+    distributions: Iterable[IndexedDistribution],
+    find_links: Iterable[str] = (),
+    jobs: Optional[int] = None,
+) -> Dict[str, Tuple[str, ...]]:
+    """
+    Return a dictionary mapping normalized distribution names to a sorted
+    tuple of archive hashes (formatted as "sha256:digest", as used in pip
+    `--hash` options). Distributions for which no archive hash can be found
+    are omitted.
+
+    Parameters:
+
+    - distributions ([IndexedDistribution])
+    - find_links ([str]): Local directories in which to look for the wheels
+      and/or sdists from which distributions were installed
+    - jobs (int|None) = None: The maximum number of archives to hash
+      concurrently (by default, the number of CPUs is used)
+    """
+    if isinstance(find_links, str):
+        find_links = (find_links,)
+    archive_paths: Dict[Tuple[str, str], List[str]] = _get_archive_paths(
+        find_links
+    )
+    hashes: Dict[str, Set[str]] = {}
+    distribution_archive_paths: Dict[str, List[str]] = {}
+    distribution: IndexedDistribution
+    for distribution in distributions:
+        name: str = normalize_name(distribution.project_name)
+        hashes[name] = set(_iter_direct_url_hashes(distribution))
+        distribution_archive_paths[name] = archive_paths.get(
+            (name, _get_version_key(distribution.version)), []
+        )
+    digests: Dict[str, str] = get_files_sha256(
+        (
+            path
+            for paths in distribution_archive_paths.values()
+            for path in paths
+        ),
+        jobs=jobs,
+    )
+    paths: List[str]
+    for name, paths in distribution_archive_paths.items():
+        hashes[name] |= {
+            f"sha256:{digests[os.path.abspath(path)]}" for path in paths
+        }
+    return {
+        name: tuple(sorted(name_hashes))
+        for name, name_hashes in hashes.items()
+        if name_hashes
+    }
@@ -0,0 +1,129 @@
+"""
+This module provides an alternative to the persistent distribution index
+(see `daves_dev_tools.requirements.index`) built on `importlib.metadata`.
+
+Distributions are discovered by listing metadata entries, and the metadata
+of each distribution is only read when that distribution is first looked up,
+so no cache is written and nothing is read for distributions which are never
+accessed.
+"""
+import os
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+)
+import importlib_metadata
+from packaging.utils import canonicalize_name
+from .index import IndexedDistribution
+
+__all__: List[str] = ["ImportlibDistributions"]
+
+
+def _get_entry_path(distribution: importlib_metadata.Distribution) -> str:
+    # `PathDistribution` does not expose the path of its metadata publicly
+    return str(getattr(distribution, "_path", "") or "")
+
+
+def _get_entry_project_name(
+    distribution: importlib_metadata.Distribution,
+) -> str:
+    """
+    As with the index, the project name is inferred from the entry name
+    (formatted as "{name}-{version}.dist-info") when possible, so that
+    metadata does not need to be read in order to list distributions.
+    """
+    entry_name: str = os.path.basename(_get_entry_path(distribution))
+    return (
+        entry_name.rpartition(".")[0].partition("-")[0]
+        or distribution.metadata.get("Name")
+        or ""
+    )
+
+
+def _iter_requires_txt_extras(text: str) -> Iterable[str]:
+    line: str
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("[") and line.endswith("]"):
+            extra: str = line[1:-1].partition(":")[0].strip()
+            if extra:
+                yield extra
+
+
+def _get_indexed_distribution(
+    distribution: importlib_metadata.Distribution, project_name: str
+) -> IndexedDistribution:
+    extras: List[str] = list(
+        distribution.metadata.get_all("Provides-Extra") or ()
+    )
+    requires_txt: Optional[str] = distribution.read_text("requires.txt")
+    if requires_txt:
+        extras = list(
+            dict.fromkeys(
+                extras + list(_iter_requires_txt_extras(requires_txt))
+            )
+        )
+    entry_path: str = _get_entry_path(distribution)
+    return IndexedDistribution(
+        project_name=project_name,
+        version=distribution.version,
+        requirements=distribution.requires or (),
+        extras=extras,
+        location=os.path.dirname(entry_path),
+        egg_info=entry_path,
+    )
+
+
+class ImportlibDistributions(Mapping[str, IndexedDistribution]):
+    """
+    A read-only mapping of normalized distribution names to the
+    distributions found in the specified directories, with metadata loaded
+    lazily using `importlib.metadata`.
+
+    Parameters:
+
+    - paths ([str]): The directories to search, in order of precedence
+    - normalize_name (typing.Callable[[str], str]) = canonicalize_name: The
+      function used to normalize distribution names
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        normalize_name: Callable[[str], str] = canonicalize_name,
+    ) -> None:
+        self._entries: Dict[str, importlib_metadata.Distribution] = {}
+        self._project_names: Dict[str, str] = {}
+        self._distributions: Dict[str, IndexedDistribution] = {}
+        distribution: importlib_metadata.Distribution
+        for distribution in importlib_metadata.distributions(path=list(paths)):
+            project_name: str = _get_entry_project_name(distribution)
+            name: str = normalize_name(project_name)
+            # Distributions found earlier in the path take precedence
+            if name and (name not in self._entries):
+                self._entries[name] = distribution
+                self._project_names[name] = project_name
+
+    def __getitem__(self, name: str) -> IndexedDistribution:
+        try:
+            return self._distributions[name]
+        except KeyError:
+            distribution: IndexedDistribution = _get_indexed_distribution(
+                self._entries[name], self._project_names[name]
+            )
+            self._distributions[name] = distribution
+            return distribution
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
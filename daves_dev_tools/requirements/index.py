@@ -0,0 +1,504 @@
+"""
+This module maintains a persistent index of the distributions installed in
+each directory on `sys.path` (typically a *site-packages* directory).
+
+Each index records the name, version, requirements, extras and location of
+every distribution whose metadata is found in the directory, keyed on the
+modification times of the `*.dist-info` and `*.egg-info` entries. When an
+index is loaded, only those entries which have been added, removed or
+modified since the index was written are re-read, so a warm run does not need
+to parse the metadata of every installed distribution.
+"""
+import os
+import re
+import sys
+from time import time
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from packaging.markers import InvalidMarker
+from packaging.requirements import InvalidRequirement, Requirement
+from packaging.version import InvalidVersion, Version
+from ..utilities import read_cache, write_cache
+
+__all__: List[str] = [
+    "INDEX_VERSION",
+    "IndexedDistribution",
+    "DistributionIndex",
+    "get_distribution_index",
+    "get_metadata_fingerprint",
+    "iter_indexed_distributions",
+    "set_marker_environment",
+]
+# Increment this whenever the structure of a serialized index changes, in
+# order to invalidate indices written by prior versions
+INDEX_VERSION: int = 1
+_METADATA_SUFFIXES: Tuple[str, ...] = (".dist-info", ".egg-info")
+# Directory modification times more recent than this (in seconds) are
+# not trusted, since an entry could be added within the timestamp granularity
+# of the file system without altering the directory's modification time
+_RACY_INTERVAL: float = 2.0
+# Environment marker variables (such as "python_version") which override
+# those of the running interpreter when evaluating requirements (see
+# `set_marker_environment`)
+_marker_environment: Dict[str, str] = {}
+
+
+def set_marker_environment(
+    environment: Optional[Dict[str, str]] = None
+) -> None:
+    """
+    Override environment marker variables (such as "python_version" or
+    "sys_platform") used to evaluate the requirements of installed
+    distributions, when inspecting an environment other than the one running
+    daves-dev-tools. Any variable not provided takes the value of the running
+    interpreter.
+
+    Parameters:
+
+    - environment ({str: str}|None) = None: Marker variable values, or
+      `None` to evaluate markers using only the running interpreter
+    """
+    global _marker_environment
+    _marker_environment = dict(environment or {})
+
+
+def _get_safe_name(name: str) -> str:
+    """
+    Replace runs of non-alphanumeric/. characters with a single "-" (this is
+    equivalent to `pkg_resources.safe_name`)
+    """
+    return re.sub(r"[^A-Za-z0-9.]+", "-", name)
+
+
+class IndexedDistribution:
+    """
+    A light-weight (and serializable) distribution, exposing those attributes
+    and methods of `pkg_resources.Distribution` which are used by
+    daves-dev-tools.
+
+    Parameters:
+
+    - project_name (str)
+    - version (str)
+    - requirements ([str]): Requirement strings, as found in the
+      "Requires-Dist" metadata (including environment markers)
+    - extras ([str]): The names of extras provided by the distribution
+    - location (str): The directory in which the metadata was found
+    - egg_info (str): The path of the metadata (*.dist-info or *.egg-info)
+    """
+
+    __slots__ = (
+        "project_name",
+        "version",
+        "requirements",
+        "extras",
+        "location",
+        "egg_info",
+        "_parsed_requirements",
+    )
+
+    def __init__(
+        self,
+        project_name: str,
+        version: str,
+        requirements: Sequence[str] = (),
+        extras: Sequence[str] = (),
+        location: str = "",
+        egg_info: str = "",
+    ) -> None:
+        self.project_name: str = _get_safe_name(project_name)
+        self.version: str = version
+        self.requirements: Tuple[str, ...] = tuple(requirements)
+        self.extras: Tuple[str, ...] = tuple(extras)
+        self.location: str = location
+        self.egg_info: str = egg_info
+        self._parsed_requirements: Optional[List[Requirement]] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}({self.project_name!r}, "
+            f"{self.version!r}, location={self.location!r})"
+        )
+
+    def _get_parsed_requirements(self) -> List[Requirement]:
+        if self._parsed_requirements is None:
+            requirements: List[Requirement] = []
+            requirement_string: str
+            for requirement_string in self.requirements:
+                try:
+                    requirements.append(Requirement(requirement_string))
+                except InvalidRequirement:
+                    pass
+            self._parsed_requirements = requirements
+        return self._parsed_requirements
+
+    def requires(self, extras: Iterable[str] = ()) -> List[Requirement]:
+        """
+        Return the requirements applicable to the current environment (or
+        to the environment described by `set_marker_environment`) when this
+        distribution is installed with the specified `extras`.
+        """
+        environments: Tuple[Dict[str, str], ...] = tuple(
+            dict(_marker_environment, extra=extra)
+            for extra in ("",) + tuple(extras)
+        )
+        requirements: List[Requirement] = []
+        requirement: Requirement
+        for requirement in self._get_parsed_requirements():
+            if requirement.marker is None:
+                requirements.append(requirement)
+                continue
+            try:
+                if any(map(requirement.marker.evaluate, environments)):
+                    requirements.append(requirement)
+            except InvalidMarker:
+                pass
+        return requirements
+
+    def as_requirement(self) -> Requirement:
+        """
+        Return a requirement pinned to the installed version of this
+        distribution.
+        """
+        operator: str = "=="
+        try:
+            Version(self.version)
+        except InvalidVersion:
+            operator = "==="
+        return Requirement(f"{self.project_name}{operator}{self.version}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "project_name": self.project_name,
+            "version": self.version,
+            "requirements": list(self.requirements),
+            "extras": list(self.extras),
+            "location": self.location,
+            "egg_info": self.egg_info,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndexedDistribution":
+        return cls(**data)
+
+
+def _iter_metadata_headers(path: str) -> Iterable[Tuple[str, str]]:
+    """
+    Yield (key, value) tuples for each header in a METADATA or PKG-INFO file,
+    stopping at the first blank line (so that the, often lengthy,
+    description is never read).
+    """
+    key: str = ""
+    value: str = ""
+    line: str
+    with open(path, encoding="utf-8", errors="replace") as metadata_io:
+        for line in metadata_io:
+            if line[:1] in (" ", "\t") and key:
+                value = f"{value}\n{line.strip()}"
+                continue
+            if key:
+                yield key, value
+                key = ""
+            line = line.rstrip("\r\n")
+            if not line:
+                break
+            if ":" in line:
+                key, value = line.split(":", 1)
+                key = key.strip().lower()
+                value = value.strip()
+    if key:
+        yield key, value
+
+
+def _iter_requires_txt_requirement_strings(path: str) -> Iterable[str]:
+    """
+    Yield "Requires-Dist"-style requirement strings (with extras expressed
+    as environment markers) from an egg-info *requires.txt* file.
+    """
+    marker: str = ""
+    line: str
+    with open(path, encoding="utf-8", errors="replace") as requires_io:
+        for line in requires_io:
+            line = line.strip()
+            if (not line) or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                extra: str
+                section_marker: str
+                extra, _, section_marker = line[1:-1].partition(":")
+                markers: List[str] = []
+                if extra.strip():
+                    markers.append(f'extra == "{extra.strip()}"')
+                if section_marker.strip():
+                    markers.append(f"({section_marker.strip()})")
+                marker = " and ".join(markers)
+            elif marker:
+                yield f"{line}; {marker}"
+            else:
+                yield line
+
+
+def _iter_requires_txt_extras(path: str) -> Iterable[str]:
+    line: str
+    with open(path, encoding="utf-8", errors="replace") as requires_io:
+        for line in requires_io:
+            line = line.strip()
+            if line.startswith("[") and line.endswith("]"):
+                extra: str = line[1:-1].partition(":")[0].strip()
+                if extra:
+                    yield extra
+
+
+def _get_metadata_file_path(path: str) -> str:
+    """
+    Return the path to the METADATA or PKG-INFO file for a *.dist-info or
+    *.egg-info directory (or file)
+    """
+    if path.endswith(".dist-info"):
+        return os.path.join(path, "METADATA")
+    if os.path.isdir(path):
+        return os.path.join(path, "PKG-INFO")
+    return path
+
+
+def _read_distribution(directory: str, name: str) -> IndexedDistribution:
+    """
+    Read the metadata for the *.dist-info or *.egg-info entry `name` in
+    `directory`.
+    """
+    path: str = os.path.join(directory, name)
+    headers: Dict[str, List[str]] = {}
+    key: str
+    value: str
+    try:
+        for key, value in _iter_metadata_headers(
+            _get_metadata_file_path(path)
+        ):
+            headers.setdefault(key, []).append(value)
+    except OSError:
+        pass
+    # As with `pkg_resources`, the project name is inferred from the entry
+    # name (formatted as "{name}-{version}.dist-info") when possible
+    stem: str = name.rpartition(".")[0]
+    project_name: str = stem.partition("-")[0] or headers.get("name", [""])[0]
+    version: str = (
+        headers.get("version", [""])[0]
+        or stem.partition("-")[2].partition("-")[0]
+    )
+    requirements: List[str] = headers.get("requires-dist", [])
+    extras: List[str] = headers.get("provides-extra", [])
+    if name.endswith(".egg-info"):
+        requires_txt_path: str = os.path.join(path, "requires.txt")
+        if os.path.isfile(requires_txt_path):
+            requirements = list(
+                _iter_requires_txt_requirement_strings(requires_txt_path)
+            )
+            extras = list(
+                dict.fromkeys(
+                    extras + list(_iter_requires_txt_extras(requires_txt_path))
+                )
+            )
+    return IndexedDistribution(
+        project_name=project_name,
+        version=version,
+        requirements=requirements,
+        extras=extras,
+        location=directory,
+        egg_info=path,
+    )
+
+
+def get_metadata_fingerprint(path: str) -> List[int]:
+    """
+    Get the modification times (and size) of a metadata entry and the files
+    within it from which distribution information is read. If the entry no
+    longer exists, an empty list is returned.
+    """
+    fingerprint: List[int] = []
+    try:
+        stat_result: os.stat_result = os.stat(path)
+    except OSError:
+        return fingerprint
+    fingerprint.append(stat_result.st_mtime_ns)
+    if os.path.isdir(path):
+        file_name: str
+        for file_name in (
+            ("METADATA",)
+            if path.endswith(".dist-info")
+            else ("PKG-INFO", "requires.txt")
+        ):
+            try:
+                stat_result = os.stat(os.path.join(path, file_name))
+                fingerprint += [stat_result.st_mtime_ns, stat_result.st_size]
+            except OSError:
+                fingerprint += [0, 0]
+    else:
+        fingerprint.append(stat_result.st_size)
+    return fingerprint
+
+
+class DistributionIndex:
+    """
+    A persistent index of the distributions installed in one directory.
+
+    Parameters:
+
+    - directory (str): A directory on `sys.path`, such as *site-packages*
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory: str = os.path.abspath(directory)
+        self._directory_mtime: Optional[int] = None
+        # Metadata entry names mapped to fingerprints and distributions
+        self._fingerprints: Dict[str, List[int]] = {}
+        self._distributions: Dict[str, IndexedDistribution] = {}
+        self._load()
+
+    def _load(self) -> None:
+        data: Dict[str, Any] = read_cache(
+            "distribution-index", self.directory, INDEX_VERSION
+        )
+        if data:
+            self._directory_mtime = data.get("directory_mtime")
+            name: str
+            entry: Dict[str, Any]
+            for name, entry in data.get("entries", {}).items():
+                self._fingerprints[name] = entry["fingerprint"]
+                self._distributions[name] = IndexedDistribution.from_dict(
+                    entry["distribution"]
+                )
+
+    def save(self) -> None:
+        """
+        Persist this index to the user's cache directory
+        """
+        name: str
+        write_cache(
+            "distribution-index",
+            self.directory,
+            INDEX_VERSION,
+            {
+                "directory_mtime": self._directory_mtime,
+                "entries": {
+                    name: {
+                        "fingerprint": self._fingerprints[name],
+                        "distribution": self._distributions[name].to_dict(),
+                    }
+                    for name in self._distributions
+                },
+            },
+        )
+
+    def _iter_entry_names(self) -> Iterable[str]:
+        entry: os.DirEntry
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(_METADATA_SUFFIXES):
+                    yield entry.name
+
+    def _refresh_entry(self, name: str) -> bool:
+        fingerprint: List[int] = get_metadata_fingerprint(
+            os.path.join(self.directory, name)
+        )
+        if not fingerprint:
+            if name in self._distributions:
+                del self._distributions[name]
+                del self._fingerprints[name]
+                return True
+        elif self._fingerprints.get(name) != fingerprint:
+            self._distributions[name] = _read_distribution(
+                self.directory, name
+            )
+            self._fingerprints[name] = fingerprint
+            return True
+        return False
+
+    def refresh(self) -> bool:
+        """
+        Re-read metadata for entries which have been added or modified since
+        the index was last refreshed, and remove entries which no longer
+        exist. If anything has changed, the index is saved and `True` is
+        returned.
+        """
+        changed: bool = False
+        names: Tuple[str, ...]
+        try:
+            directory_mtime: int = os.stat(self.directory).st_mtime_ns
+        except OSError:
+            names = ()
+        else:
+            if directory_mtime == self._directory_mtime:
+                # No entries have been added or removed, so we only need to
+                # check the entries we already know about
+                names = tuple(self._distributions.keys())
+            else:
+                names = tuple(self._iter_entry_names())
+                changed = True
+                # Don't persist a modification time so recent that another
+                # entry could be added without altering it
+                self._directory_mtime = (
+                    None
+                    if (time() - directory_mtime / 1e9) < _RACY_INTERVAL
+                    else directory_mtime
+                )
+        removed_names: Set[str] = set(self._distributions.keys()) - set(names)
+        name: str
+        for name in removed_names:
+            del self._distributions[name]
+            del self._fingerprints[name]
+            changed = True
+        for name in names:
+            changed = self._refresh_entry(name) or changed
+        if changed:
+            self.save()
+        return changed
+
+    def iter_distributions(self) -> Iterable[IndexedDistribution]:
+        """
+        Yield all distributions in this index (in a consistent order).
+        """
+        name: str
+        for name in sorted(self._distributions.keys()):
+            yield self._distributions[name]
+
+
+_indices: Dict[str, DistributionIndex] = {}
+
+
+def get_distribution_index(directory: str) -> DistributionIndex:
+    """
+    Get the (refreshed) distribution index for `directory`.
+    """
+    directory = os.path.abspath(directory)
+    index: Optional[DistributionIndex] = _indices.get(directory)
+    if index is None:
+        index = _indices[directory] = DistributionIndex(directory)
+    index.refresh()
+    return index
+
+
+def iter_indexed_distributions(
+    paths: Optional[Iterable[str]] = None,
+) -> Iterable[IndexedDistribution]:
+    """
+    Yield all distributions found in the specified directories (`sys.path`
+    by default), in order of precedence.
+
+    Parameters:
+
+    - paths ([str]) = sys.path
+    """
+    if paths is None:
+        paths = sys.path
+    path: str
+    for path in dict.fromkeys(map(os.path.abspath, paths)):
+        if os.path.isdir(path):
+            yield from get_distribution_index(path).iter_distributions()
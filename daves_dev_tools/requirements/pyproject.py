@@ -0,0 +1,370 @@
+"""
+This module locates the requirement strings in a pyproject.toml file
+(`build-system.requires`, `project.dependencies` and
+`project.optional-dependencies`) by their position in the document, so that
+they can be edited without re-serializing the document (which would discard
+comments, ordering and formatting).
+
+Only as much TOML syntax is interpreted as is needed to find the extent of
+each key and value. The located strings are checked against the document as
+parsed by `tomli`, and documents which cannot be edited reliably are
+reported by raising a `ValueError`.
+"""
+import json
+import re
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, List, Pattern, Tuple
+
+__all__: List[str] = [
+    "StringSpan",
+    "iter_pyproject_requirement_strings",
+    "iter_requirement_string_spans",
+    "get_edited_pyproject_toml",
+]
+_BARE_KEY_PATTERN: Pattern = re.compile(r"[A-Za-z0-9_-]+")
+_SCALAR_PATTERN: Pattern = re.compile(r"[^,\]}#\r\n]*")
+_ESCAPES: Dict[str, str] = {
+    "b": "\b",
+    "t": "\t",
+    "n": "\n",
+    "f": "\f",
+    "r": "\r",
+    '"': '"',
+    "\\": "\\",
+}
+
+
+@dataclass
+class StringSpan:
+    """
+    The location of a string literal in a TOML document.
+
+    Attributes:
+
+    - start (int): The index at which the literal (including quotes) begins
+    - end (int): The index following the end of the literal
+    - content_start (int): The index at which the literal's content begins
+    - content_end (int): The index following the end of the literal's
+      content
+    - value (str): The (decoded) value of the string
+    """
+
+    start: int
+    end: int
+    content_start: int
+    content_end: int
+    value: str
+
+
+def _is_requirements_key(key: Tuple[str, ...]) -> bool:
+    return key in (
+        ("build-system", "requires"),
+        ("project", "dependencies"),
+    ) or (len(key) == 3 and key[:2] == ("project", "optional-dependencies"))
+
+
+def iter_pyproject_requirement_strings(
+    pyproject: Dict[str, Any]
+) -> Iterable[str]:
+    """
+    Yield the requirement strings found in a parsed pyproject.toml document
+    (`build-system.requires`, `project.dependencies` and
+    `project.optional-dependencies`).
+    """
+    project: Dict[str, Any] = pyproject.get("project", {})
+    requirements: Any
+    for requirements in chain(
+        (
+            pyproject.get("build-system", {}).get("requires", ()),
+            project.get("dependencies", ()),
+        ),
+        project.get("optional-dependencies", {}).values(),
+    ):
+        if isinstance(requirements, list):
+            yield from (
+                requirement
+                for requirement in requirements
+                if isinstance(requirement, str)
+            )
+
+
+class _Scanner:
+    """
+    This class locates requirement string literals in a TOML document
+    """
+
+    def __init__(self, text: str) -> None:
+        self.text: str = text
+        self.position: int = 0
+        self.spans: List[StringSpan] = []
+
+    def error(self, message: str) -> ValueError:
+        line: int = self.text.count("\n", 0, self.position) + 1
+        return ValueError(f"{message} (line {line})")
+
+    def skip(self, newlines: bool = True) -> None:
+        """
+        Skip whitespace and comments (and optionally, line breaks)
+        """
+        characters: str = " \t\r\n" if newlines else " \t"
+        while self.position < len(self.text):
+            character: str = self.text[self.position]
+            if character in characters:
+                self.position += 1
+            elif character == "#":
+                end: int = self.text.find("\n", self.position)
+                self.position = len(self.text) if end == -1 else end
+            else:
+                break
+
+    def expect(self, token: str) -> None:
+        self.skip(newlines=False)
+        if not self.text.startswith(token, self.position):
+            raise self.error(f"Expected {token!r}")
+        self.position += len(token)
+
+    def end_line(self) -> None:
+        self.skip(newlines=False)
+        if self.position < len(self.text) and (
+            self.text[self.position] not in "\r\n"
+        ):
+            raise self.error("Expected a line break")
+
+    def scan_key(self) -> Tuple[str, ...]:
+        """
+        Scan a (possibly dotted) key
+        """
+        keys: List[str] = []
+        while True:
+            self.skip(newlines=False)
+            if self.text.startswith(('"', "'"), self.position):
+                keys.append(self.scan_string().value)
+            else:
+                match = _BARE_KEY_PATTERN.match(self.text, self.position)
+                if not match:
+                    raise self.error("Expected a key")
+                keys.append(match.group())
+                self.position = match.end()
+            self.skip(newlines=False)
+            if not self.text.startswith(".", self.position):
+                return tuple(keys)
+            self.position += 1
+
+    def _scan_basic_content(self, end: int, multiline: bool) -> str:
+        # Decode a basic string's content, from the current position up to
+        # (but excluding) `end`
+        value: List[str] = []
+        text: str = self.text
+        position: int = self.position
+        while position < end:
+            character: str = text[position]
+            position += 1
+            if character != "\\":
+                value.append(character)
+                continue
+            escape: str = text[position]
+            position += 1
+            if escape in _ESCAPES:
+                value.append(_ESCAPES[escape])
+            elif escape in ("u", "U"):
+                digits: int = position + (4 if escape == "u" else 8)
+                value.append(chr(int(text[position:digits], 16)))
+                position = digits
+            elif multiline and escape in " \t\r\n":
+                # A line-ending backslash trims all following whitespace
+                while position < end and text[position] in " \t\r\n":
+                    position += 1
+            else:
+                raise self.error("Invalid escape sequence")
+        return "".join(value)
+
+    def _find_content_end(self, content_start: int, delimiter: str) -> int:
+        text: str = self.text
+        content_end: int = content_start
+        while True:
+            content_end = text.find(delimiter, content_end)
+            if content_end == -1:
+                raise self.error("Unterminated string")
+            if delimiter[0] == '"':
+                # Skip escaped quotes
+                backslashes: int = 0
+                while text[content_end - 1 - backslashes] == "\\":
+                    backslashes += 1
+                if backslashes % 2:
+                    content_end += 1
+                    continue
+            if len(delimiter) == 3:
+                # Up to two quotes may immediately precede the closing
+                # delimiter of a multi-line string
+                while text.startswith(delimiter[0], content_end + 3):
+                    content_end += 1
+            return content_end
+
+    def scan_string(self) -> StringSpan:
+        start: int = self.position
+        text: str = self.text
+        quote: str = text[start]
+        multiline: bool = text.startswith(quote * 3, start)
+        delimiter: str = quote * 3 if multiline else quote
+        content_start: int = start + len(delimiter)
+        if multiline:
+            # A line break immediately following the opening delimiter is
+            # trimmed
+            if text.startswith("\n", content_start):
+                content_start += 1
+            elif text.startswith("\r\n", content_start):
+                content_start += 2
+        content_end: int = self._find_content_end(content_start, delimiter)
+        value: str
+        self.position = content_start
+        if quote == '"':
+            value = self._scan_basic_content(content_end, multiline)
+        else:
+            value = text[content_start:content_end]
+        self.position = content_end + len(delimiter)
+        return StringSpan(
+            start=start,
+            end=self.position,
+            content_start=content_start,
+            content_end=content_end,
+            value=value,
+        )
+
+    def scan_array(self, key: Tuple[str, ...]) -> None:
+        self.position += 1
+        while True:
+            self.skip()
+            if self.text.startswith("]", self.position):
+                self.position += 1
+                return
+            if self.text.startswith(('"', "'"), self.position):
+                span: StringSpan = self.scan_string()
+                if _is_requirements_key(key):
+                    self.spans.append(span)
+            else:
+                self.scan_value(key + ("",))
+            self.skip()
+            if self.text.startswith(",", self.position):
+                self.position += 1
+            elif not self.text.startswith("]", self.position):
+                raise self.error("Expected ',' or ']'")
+
+    def scan_inline_table(self, key: Tuple[str, ...]) -> None:
+        self.position += 1
+        self.skip(newlines=False)
+        if self.text.startswith("}", self.position):
+            self.position += 1
+            return
+        while True:
+            value_key: Tuple[str, ...] = self.scan_key()
+            self.expect("=")
+            self.scan_value(key + value_key)
+            self.skip(newlines=False)
+            if self.text.startswith("}", self.position):
+                self.position += 1
+                return
+            self.expect(",")
+
+    def scan_value(self, key: Tuple[str, ...]) -> None:
+        self.skip(newlines=False)
+        character: str = (
+            self.text[self.position] if self.position < len(self.text) else ""
+        )
+        if character in ('"', "'"):
+            self.scan_string()
+        elif character == "[":
+            self.scan_array(key)
+        elif character == "{":
+            self.scan_inline_table(key)
+        else:
+            match = _SCALAR_PATTERN.match(self.text, self.position)
+            assert match is not None
+            if not match.group().strip():
+                raise self.error("Expected a value")
+            self.position = match.end()
+
+    def scan(self) -> List[StringSpan]:
+        table: Tuple[str, ...] = ()
+        while True:
+            self.skip()
+            if self.position >= len(self.text):
+                return self.spans
+            if self.text.startswith("[", self.position):
+                array_table: bool = self.text.startswith("[[", self.position)
+                self.position += 2 if array_table else 1
+                table = self.scan_key()
+                self.expect("]]" if array_table else "]")
+            else:
+                key: Tuple[str, ...] = self.scan_key()
+                self.expect("=")
+                self.scan_value(table + key)
+            self.end_line()
+
+
+def iter_requirement_string_spans(data: str) -> Iterable[StringSpan]:
+    """
+    Yield the location of each requirement string literal in the text of a
+    pyproject.toml file, in the order in which they appear. A `ValueError`
+    is raised if the document is not valid TOML, or if the located strings
+    do not match those found when the document is parsed by `tomli`.
+    """
+    import tomli
+
+    try:
+        expected: List[str] = list(
+            iter_pyproject_requirement_strings(tomli.loads(data))
+        )
+    except tomli.TOMLDecodeError as error:
+        raise ValueError(str(error)) from error
+    spans: List[StringSpan] = _Scanner(data).scan()
+    if sorted(span.value for span in spans) != sorted(expected):
+        raise ValueError(
+            "The requirement strings in this document could not be located"
+        )
+    return iter(spans)
+
+
+def _get_string_literal(data: str, span: StringSpan, value: str) -> str:
+    """
+    Return a string literal for `value`, changing only the content of the
+    original literal if it is a single-line string containing no escape
+    sequences, and `value` requires none
+    """
+    quote: str = data[span.start]
+    content_start: int = span.content_start
+    content_end: int = span.content_end
+    if (
+        (content_start - span.start == 1)
+        and data[content_start:content_end] == span.value
+        and quote not in value
+        and "\\" not in value
+        and not any((ord(character) < 32) for character in value)
+    ):
+        return f"{quote}{value}{quote}"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def get_edited_pyproject_toml(data: str, edit: Callable[[str], str]) -> str:
+    """
+    Return the text of a pyproject.toml file with each requirement string
+    replaced by the result of `edit(requirement_string)`. Only the string
+    literals which change are rewritten, and all other text is left as-is.
+
+    Parameters:
+
+    - data (str): The contents of a **pyproject.toml** file
+    - edit (typing.Callable[[str], str])
+    """
+    parts: List[str] = []
+    position: int = 0
+    span: StringSpan
+    for span in iter_requirement_string_spans(data):
+        value: str = edit(span.value)
+        if value != span.value:
+            start: int = span.start
+            parts.append(data[position:start])
+            parts.append(_get_string_literal(data, span, value))
+            position = span.end
+    parts.append(data[position:])
+    return "".join(parts)
@@ -1,33 +1,65 @@
 import os
 import argparse
+import sys
 import tomli
 import tomli_w
 import re
-from io import StringIO
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from copy import copy
 from dataclasses import dataclass
-from pkg_resources import Distribution
-from configparser import ConfigParser, SectionProxy
+from itertools import chain, islice
 from typing import (
     Dict,
     Iterable,
+    Iterator,
     IO,
     List,
     Callable,
+    Mapping,
+    Sequence,
     Set,
-    Union,
     Tuple,
     Any,
+    Match,
     Optional,
+    Pattern,
 )
-from packaging.specifiers import Specifier, SpecifierSet
+from packaging.specifiers import Specifier
 from packaging.requirements import Requirement
-from packaging.version import Version, parse as parse_version
+from packaging.version import Version
 from more_itertools import unique_everseen
-from ..utilities import iter_parse_delimited_values
+from ..install_editable import EXCLUDE_DIRECTORY_REGULAR_EXPRESSIONS
+from ..utilities import iter_parse_delimited_values, write_text_atomically
+from .index import IndexedDistribution
+from .pyproject import get_edited_pyproject_toml
 from .utilities import (
     normalize_name,
     get_installed_distributions,
+    is_configuration_file,
     is_requirement_string,
+    iter_configuration_file_requirement_strings,
+    get_parse_cache_info,
+    parse_requirement,
+    parse_specifier_set,
+    parse_version,
+    set_refresh_editable_distributions,
+)
+
+_SPECIFIER_PATTERN: Pattern = re.compile(
+    r"(===|~=|==|!=|<=|>=|<|>)(\s*)([^\s,;()\[\]]+)"
+)
+_SECTION_PATTERN: Pattern = re.compile(r"^\[([^\]]+)\]")
+# The names of configuration files (other than requirements*.txt files) found
+# by `iter_find_requirements_files`
+_REQUIREMENTS_FILE_NAMES: Tuple[str, ...] = (
+    "setup.cfg",
+    "pyproject.toml",
+    "tox.ini",
 )
 
 
@@ -60,6 +92,48 @@ class _Version:
     local: Any
 
 
+def _get_updated_specifier_string(
+    specifier: Specifier, installed_version: Version
+) -> str:
+    """
+    Return a specifier string updated to match the installed version of the
+    package, if the specifier is *inclusive*
+    """
+    # Only update requirement to match our installed version
+    # if the requirement is *inclusive* (and not a prefix match)
+    if (
+        ("=" not in specifier.operator)
+        or ("!" in specifier.operator)
+        or specifier.version.endswith(".*")
+    ):
+        return str(specifier)
+    specifier_version: Version = parse_version(specifier.version)
+    assert installed_version.release is not None
+    if specifier_version.release is None:
+        return f"{specifier.operator}"
+    greater_or_equal_specificity: bool = len(specifier_version.release) >= len(
+        installed_version.release
+    )
+    specifier_version_data: _Version = _Version(
+        epoch=installed_version.epoch,
+        # Truncate the updated version requirement at the same
+        # level of specificity as the old
+        release=installed_version.release[: len(specifier_version.release)],
+        pre=(installed_version.pre if greater_or_equal_specificity else None),
+        post=(
+            installed_version.post if greater_or_equal_specificity else None
+        ),
+        dev=(installed_version.dev if greater_or_equal_specificity else None),
+        local=(
+            installed_version.local if greater_or_equal_specificity else None
+        ),
+    )
+    version_string: str = Version.__str__(
+        specifier_version_data  # type: ignore
+    )
+    return f"{specifier.operator}{version_string}"
+
+
 def _update_requirement_specifiers(
     requirement: Requirement, installed_version_string: str
 ) -> None:
@@ -69,60 +143,35 @@ def _update_requirement_specifiers(
     """
     installed_version: Version = parse_version(installed_version_string)
     specifier: Specifier
-    updated_specifier_strings: List[str] = []
-    for specifier in requirement.specifier:  # type: ignore
-        # Only update requirement to match our installed version
-        # if the requirement is *inclusive*
-        if ("=" in specifier.operator) and ("!" not in specifier.operator):
-            specifier_version: Version = parse_version(specifier.version)
-            assert installed_version.release is not None
-            if specifier_version.release is None:
-                updated_specifier_strings.append(f"{specifier.operator}")
-            else:
-                greater_or_equal_specificity: bool = len(
-                    specifier_version.release
-                ) >= len(installed_version.release)
-                specifier_version_data: _Version = _Version(
-                    epoch=installed_version.epoch,
-                    # Truncate the updated version requirement at the same
-                    # level of specificity as the old
-                    release=installed_version.release[
-                        : len(specifier_version.release)
-                    ],
-                    pre=(
-                        installed_version.pre
-                        if greater_or_equal_specificity
-                        else None
-                    ),
-                    post=(
-                        installed_version.post
-                        if greater_or_equal_specificity
-                        else None
-                    ),
-                    dev=(
-                        installed_version.dev
-                        if greater_or_equal_specificity
-                        else None
-                    ),
-                    local=(
-                        installed_version.local
-                        if greater_or_equal_specificity
-                        else None
-                    ),
-                )
-                version_string: str = Version.__str__(
-                    specifier_version_data  # type: ignore
-                )
-                updated_specifier_strings.append(
-                    f"{specifier.operator}{version_string}"
-                )
-        else:
-            updated_specifier_strings.append(str(specifier))
-    requirement.specifier = SpecifierSet(",".join(updated_specifier_strings))
+    requirement.specifier = parse_specifier_set(
+        ",".join(
+            _get_updated_specifier_string(specifier, installed_version)
+            for specifier in requirement.specifier  # type: ignore
+        )
+    )
+
+
+def _get_installed_version(
+    name: str, versions: Optional[Mapping[str, Optional[str]]] = None
+) -> Optional[str]:
+    """
+    Look up the installed version of a distribution in `versions` (a table
+    of normalized names to installed versions, or `None` for distributions
+    which are not installed), falling back to the installed distributions
+    for names not in the table
+    """
+    if (versions is not None) and (name in versions):
+        return versions[name]
+    distribution: Optional[
+        IndexedDistribution
+    ] = get_installed_distributions().get(name)
+    return distribution.version if distribution else None
 
 
 def _get_updated_requirement_string(
-    requirement_string: str, ignore: Set[str]
+    requirement_string: str,
+    ignore: Set[str],
+    versions: Optional[Mapping[str, Optional[str]]] = None,
 ) -> str:
     """
     This function updates version numbers in a requirement string to match
@@ -131,19 +180,66 @@ def _get_updated_requirement_string(
     # Skip empty requirement strings
     if not is_requirement_string(requirement_string):
         return requirement_string
-    requirement: Requirement = Requirement(requirement_string)
+    # Parsed requirements are shared, so a copy is modified
+    requirement: Requirement = copy(parse_requirement(requirement_string))
     name: str = normalize_name(requirement.name)
     if name in ignore:
         return requirement_string
-    try:
-        distribution: Distribution = get_installed_distributions()[name]
-        _update_requirement_specifiers(requirement, distribution.version)
-    except KeyError:
-        # If the requirement isn't installed, we can't update the version
-        pass
+    version: Optional[str] = _get_installed_version(name, versions)
+    # If the requirement isn't installed, we can't update the version
+    if version is not None:
+        _update_requirement_specifiers(requirement, version)
     return str(requirement)
 
 
+def _get_patched_requirement_string(
+    requirement_string: str,
+    ignore: Set[str],
+    versions: Optional[Mapping[str, Optional[str]]] = None,
+) -> str:
+    """
+    This function updates version numbers in a requirement string to match
+    those installed in the current environment, replacing only the version
+    numbers which have changed (all other characters are left as-is)
+    """
+    if not is_requirement_string(requirement_string):
+        return requirement_string
+    requirement: Requirement = parse_requirement(requirement_string)
+    name: str = normalize_name(requirement.name)
+    version: Optional[str] = (
+        None
+        if (name in ignore or requirement.url)
+        else _get_installed_version(name, versions)
+    )
+    if version is None:
+        return requirement_string
+    installed_version: Version = parse_version(version)
+    updated_specifier_strings: Dict[Tuple[str, str], str] = {
+        (specifier.operator, specifier.version): _get_updated_specifier_string(
+            specifier, installed_version
+        )
+        for specifier in requirement.specifier  # type: ignore
+    }
+
+    def replace(match: Match) -> str:
+        operator: str = match.group(1)
+        updated_specifier_string: str = updated_specifier_strings.get(
+            (operator, match.group(3)), ""
+        )
+        if not updated_specifier_string:
+            return match.group(0)
+        return (
+            f"{operator}{match.group(2)}"
+            f"{updated_specifier_string[len(operator):]}"
+        )
+
+    # Specifiers precede any environment marker
+    specifiers: str
+    marker: str
+    specifiers, separator, marker = requirement_string.partition(";")
+    return _SPECIFIER_PATTERN.sub(replace, specifiers) + separator + marker
+
+
 def _normalize_ignore_argument(ignore: Iterable[str]) -> Set[str]:
     ignore_set: Set[str]
     # Normalize/harmonize excluded project names
@@ -153,7 +249,11 @@ def _normalize_ignore_argument(ignore: Iterable[str]) -> Set[str]:
     return ignore_set
 
 
-def get_updated_requirements_txt(data: str, ignore: Iterable[str] = ()) -> str:
+def get_updated_requirements_txt(
+    data: str,
+    ignore: Iterable[str] = (),
+    versions: Optional[Mapping[str, Optional[str]]] = None,
+) -> str:
     """
     Return the contents of a **requirements.txt** file, updated to reflect the
     currently installed project versions, excluding those specified in
@@ -163,22 +263,205 @@ def get_updated_requirements_txt(data: str, ignore: Iterable[str] = ()) -> str:
 
     - data (str): The contents of a **setup.cfg** file
     - ignore ([str]): One or more project names to leave as-is
+    - versions ({str: str|None}|None) = None: A table mapping normalized
+      distribution names to installed versions (by default, versions are
+      looked up in the current environment)
     """
     ignore_set: Set[str] = _normalize_ignore_argument(ignore)
 
-    def get_updated_requirement_string(requirement: str) -> str:
-        return _get_updated_requirement_string(requirement, ignore=ignore_set)
+    def get_updated_line(line: str) -> str:
+        # Preserve carriage returns preceding line feeds
+        requirement: str = line.rstrip("\r")
+        line_end: str = "\r" * (len(line) - len(requirement))
+        return (
+            _get_updated_requirement_string(
+                requirement, ignore=ignore_set, versions=versions
+            )
+            + line_end
+        )
+
+    return "\n".join(map(get_updated_line, data.split("\n")))
+
+
+@dataclass
+class _IniLine:
+    """
+    A line of an INI-style (setup.cfg or tox.ini) file, along with the
+    section and option to which it belongs.
+
+    Attributes:
+
+    - text (str): The line, including any line break
+    - section (str): The name of the section in which the line occurs
+    - option (str): The (lower-case) name of the option whose value the line
+      belongs to, or an empty string if it does not belong to an option
+    - value_start (int): The index in `text` at which the option value
+      begins, or -1 if the line does not contain any part of a value
+      (section headers, option names without a value, comments and blank
+      lines)
+    """
 
-    return "\n".join(map(get_updated_requirement_string, data.split("\n")))
+    text: str
+    section: str
+    option: str
+    value_start: int
+
+
+def _iter_ini_lines(data: str) -> Iterable[_IniLine]:
+    """
+    Tokenize an INI-style file, line by line, following the same rules as
+    `configparser.ConfigParser` (with default settings)
+    """
+    section: str = ""
+    option: str = ""
+    line: str
+    for line in data.splitlines(True):
+        stripped: str = line.strip()
+        if (not stripped) or stripped[0] in "#;":
+            # Blank lines and comments do not end a multi-line value
+            yield _IniLine(line, section, option, -1)
+        elif line[0].isspace():
+            yield _IniLine(
+                line,
+                section,
+                option,
+                (len(line) - len(line.lstrip())) if option else -1,
+            )
+        else:
+            section_match: Optional[Match] = _SECTION_PATTERN.match(line)
+            if section_match:
+                section = section_match.group(1).strip()
+                option = ""
+                yield _IniLine(line, section, option, -1)
+            else:
+                delimiter_indices: List[int] = [
+                    index
+                    for index in (line.find("="), line.find(":"))
+                    if index != -1
+                ]
+                if delimiter_indices:
+                    value_start: int = min(delimiter_indices)
+                    option = line[:value_start].strip().lower()
+                    yield _IniLine(line, section, option, value_start + 1)
+                else:
+                    option = ""
+                    yield _IniLine(line, section, option, -1)
+
+
+def _get_updated_ini_line_text(
+    line: _IniLine, get_updated_value: Callable[[str], str]
+) -> str:
+    """
+    Apply `get_updated_value` to the (stripped) value on a line, leaving all
+    surrounding characters as-is
+    """
+    value_start: int = line.value_start
+    prefix: str = line.text[:value_start]
+    value: str = line.text[value_start:]
+    stripped_value: str = value.strip()
+    if not stripped_value:
+        return line.text
+    value_end: int = len(value.rstrip())
+    leading_whitespace: str = value[: len(value) - len(value.lstrip())]
+    trailing_whitespace: str = value[value_end:]
+    return (
+        f"{prefix}{leading_whitespace}"
+        f"{get_updated_value(stripped_value)}{trailing_whitespace}"
+    )
+
+
+def _get_option_end(lines: Sequence[_IniLine], start: int) -> int:
+    """
+    Return the index following the last line of the option beginning at
+    `start` (trailing blank lines and comments are not considered part of
+    the option)
+    """
+    end: int = start + 1
+    index: int
+    for index in range(start + 1, len(lines)):
+        line: _IniLine = lines[index]
+        if (line.section, line.option) != (
+            lines[start].section,
+            lines[start].option,
+        ) or line.text[0] not in " \t\r\n#;":
+            break
+        if line.value_start != -1:
+            end = index + 1
+    return end
+
+
+def _get_all_extra_text(
+    lines: Sequence[_IniLine],
+    texts: Sequence[str],
+    all_extra_name: str,
+) -> str:
+    """
+    Return the text for an extra consolidating the requirements of all
+    other extras in a setup.cfg file, using the same indentation as the
+    other extras
+    """
+    indent: str = "    "
+    requirements: List[str] = []
+    line: _IniLine
+    text: str
+    for line, text in zip(lines, texts):
+        if (
+            line.section == "options.extras_require"
+            and line.option not in ("", all_extra_name)
+            and line.value_start != -1
+        ):
+            value_start: int = line.value_start
+            requirement: str = text[value_start:].strip()
+            if requirement:
+                requirements.append(requirement)
+                if text[0].isspace():
+                    indent = text[: line.value_start]
+    newline: str = "\r\n" if texts and texts[0].endswith("\r\n") else "\n"
+    return f"{all_extra_name} ={newline}" + "".join(
+        f"{indent}{requirement}{newline}"
+        for requirement in unique_everseen(requirements)
+    )
+
+
+def _get_setup_cfg_with_all_extra(
+    lines: List[_IniLine], texts: List[str], all_extra_name: str
+) -> str:
+    """
+    Add or replace an extra consolidating the requirements of all other
+    extras in a setup.cfg file
+    """
+    extras_indices: List[int] = [
+        index
+        for index, line in enumerate(lines)
+        if line.section == "options.extras_require"
+    ]
+    if not extras_indices:
+        return "".join(texts)
+    all_extra_text: str = _get_all_extra_text(lines, texts, all_extra_name)
+    index: int
+    for index in extras_indices:
+        if lines[index].option == all_extra_name:
+            end: int = _get_option_end(lines, index)
+            return "".join(texts[:index] + [all_extra_text] + texts[end:])
+    # Add the extra following the last non-blank line of the section
+    index = max(index for index in extras_indices if lines[index].text.strip())
+    if not texts[index].endswith("\n"):
+        all_extra_text = f"\n{all_extra_text}"
+    index += 1
+    return "".join(texts[:index] + [all_extra_text] + texts[index:])
 
 
 def get_updated_setup_cfg(
-    data: str, ignore: Iterable[str] = (), all_extra_name: str = ""
+    data: str,
+    ignore: Iterable[str] = (),
+    all_extra_name: str = "",
+    versions: Optional[Mapping[str, Optional[str]]] = None,
 ) -> str:
     """
     Return the contents of a **setup.cfg** file, updated to reflect the
     currently installed project versions, excluding those specified in
-    `ignore`.
+    `ignore`. Only version numbers which have changed are replaced, so
+    comments and formatting are preserved.
 
     Parameters:
 
@@ -186,203 +469,518 @@ def get_updated_setup_cfg(
     - ignore ([str]): One or more project names to leave as-is
     - all_extra_name (str): A name under which to store an extra which
       consolidates requirements from all other extras
+    - versions ({str: str|None}|None) = None: A table mapping normalized
+      distribution names to installed versions (by default, versions are
+      looked up in the current environment)
     """
     ignore_set: Set[str] = _normalize_ignore_argument(ignore)
 
     def get_updated_requirement_string(requirement: str) -> str:
-        return _get_updated_requirement_string(requirement, ignore=ignore_set)
-
-    # Parse
-    parser: ConfigParser = ConfigParser()
-    parser.read_string(data)
-    # Update
-    if ("options" in parser) and ("install_requires" in parser["options"]):
-        parser["options"]["install_requires"] = "\n".join(
-            map(  # type: ignore
-                get_updated_requirement_string,
-                parser["options"]["install_requires"].split("\n"),
-            )
+        return _get_patched_requirement_string(
+            requirement, ignore=ignore_set, versions=versions
+        )
+
+    def is_requirement_line(line: _IniLine) -> bool:
+        return (line.value_start != -1) and (
+            (line.section, line.option) == ("options", "install_requires")
+            or line.section == "options.extras_require"
         )
-    if "options.extras_require" in parser:
-        extras_require: SectionProxy = parser["options.extras_require"]
-        all_extra_requirements: List[str] = []
-        extra_name: str
-        extra_requirements_string: str
-        extra_requirements: List[str]
-        for extra_name, extra_requirements_string in extras_require.items():
-            if extra_name != all_extra_name:
-                extra_requirements = list(
-                    map(
-                        get_updated_requirement_string,
-                        extra_requirements_string.split("\n"),
-                    )
-                )
-                if all_extra_name:
-                    all_extra_requirements += extra_requirements
-                extras_require[extra_name] = "\n".join(extra_requirements)
-        # If a name was specified for an all-encompasing extra,
-        # we de-duplicate and update or create that extra
-        if all_extra_name:
-            # We pre-pend an empty requirement string in order to]
-            # force new-line creation at the beginning of the extra
-            extras_require[all_extra_name] = "\n".join(
-                unique_everseen([""] + all_extra_requirements)
-            )
-    # Return as a string
-    setup_cfg: str
-    setup_cfg_io: IO[str]
-    with StringIO() as setup_cfg_io:
-        parser.write(setup_cfg_io)
-        setup_cfg_io.seek(0)
-        setup_cfg = re.sub(r"[ ]+(\n|$)", r"\1", setup_cfg_io.read()).strip()
-        return f"{setup_cfg}\n"
 
+    lines: List[_IniLine] = list(_iter_ini_lines(data))
+    line: _IniLine
+    texts: List[str] = [
+        _get_updated_ini_line_text(line, get_updated_requirement_string)
+        if is_requirement_line(line)
+        else line.text
+        for line in lines
+    ]
+    if all_extra_name:
+        return _get_setup_cfg_with_all_extra(
+            lines, texts, all_extra_name.lower()
+        )
+    return "".join(texts)
 
-def get_updated_tox_ini(data: str, ignore: Iterable[str] = ()) -> str:
+
+def get_updated_tox_ini(
+    data: str,
+    ignore: Iterable[str] = (),
+    versions: Optional[Mapping[str, Optional[str]]] = None,
+) -> str:
     """
     Return the contents of a **tox.ini** file, updated to reflect the
     currently installed project versions, excluding those specified in
-    `ignore`.
+    `ignore`. Only version numbers which have changed are replaced, so
+    comments and formatting are preserved.
 
     Parameters:
 
     - data (str): The contents of a **tox.ini** file
     - ignore ([str]): One or more project names to leave as-is
+    - versions ({str: str|None}|None) = None: A table mapping normalized
+      distribution names to installed versions (by default, versions are
+      looked up in the current environment)
     """
     ignore_set: Set[str] = _normalize_ignore_argument(ignore)
 
     def get_updated_requirement_string(requirement: str) -> str:
-        prefix: Optional[str] = None
-        if ":" in requirement:
+        if (":" in requirement) and not is_requirement_string(requirement):
+            # Requirements may be conditional on a factor ("py38: pytest")
+            prefix: str
             prefix, requirement = requirement.split(":", maxsplit=1)
-        requirement = _get_updated_requirement_string(
-            requirement, ignore=ignore_set
-        )
-        if prefix is not None:
-            requirement = f"{prefix}: {requirement.lstrip()}"
-        return requirement
-
-    # Parse
-    parser: ConfigParser = ConfigParser()
-    parser.read_string(data)
-
-    def update_section_options(section_name: str, option_name: str) -> None:
-        if parser.has_option(section_name, option_name):
-            parser.set(
-                section_name,
-                option_name,
-                "\n".join(
-                    map(
-                        get_updated_requirement_string,
-                        parser.get(section_name, option_name).split("\n"),
-                    )
-                ),
+            return f"{prefix}:" + _get_updated_ini_line_text(
+                _IniLine(requirement, "", "", 0),
+                get_updated_requirement_string,
             )
+        # tox permits comments following a requirement
+        comment: str
+        requirement, comment_separator, comment = requirement.partition(" #")
+        return (
+            _get_patched_requirement_string(
+                requirement, ignore=ignore_set, versions=versions
+            )
+            + comment_separator
+            + comment
+        )
+
+    def is_requirement_line(line: _IniLine) -> bool:
+        return (line.value_start != -1) and (
+            line.option == "deps"
+            or (line.section, line.option) == ("tox", "requires")
+        )
+
+    line: _IniLine
+    return "".join(
+        _get_updated_ini_line_text(line, get_updated_requirement_string)
+        if is_requirement_line(line)
+        else line.text
+        for line in _iter_ini_lines(data)
+    )
 
-    def update_section(section_name: str) -> None:
-        update_section_options(section_name, "deps")
-        if section_name == "tox":
-            update_section_options(section_name, "requires")
 
-    # Update
-    list(map(update_section, parser.sections()))
-    # Return as a string
-    tox_ini: str
-    tox_ini_io: IO[str]
-    with StringIO() as tox_ini_io:
-        parser.write(tox_ini_io)
-        tox_ini_io.seek(0)
-        tox_ini = re.sub(r"[ ]+(\n|$)", r"\1", tox_ini_io.read()).strip()
-        return f"{tox_ini}\n"
+def _get_updated_pyproject(
+    pyproject: Dict[str, Any], edit: Callable[[str], str]
+) -> Dict[str, Any]:
+    requirements: Optional[List[str]]
+    build_system: Dict[str, Any] = pyproject.get("build-system", {})
+    requirements = build_system.get("requires")
+    if requirements is not None:
+        build_system["requires"] = list(map(edit, requirements))
+    project: Dict[str, Any] = pyproject.get("project", {})
+    requirements = project.get("dependencies")
+    if requirements is not None:
+        project["dependencies"] = list(map(edit, requirements))
+    optional_dependencies: Dict[str, Any] = project.get(
+        "optional-dependencies", {}
+    )
+    extra_name: str
+    for extra_name, requirements in optional_dependencies.items():
+        optional_dependencies[extra_name] = list(map(edit, requirements))
+    return pyproject
 
 
 def get_updated_pyproject_toml(
-    data: str, ignore: Iterable[str] = (), all_extra_name: str = ""
+    data: str,
+    ignore: Iterable[str] = (),
+    all_extra_name: str = "",
+    versions: Optional[Mapping[str, Optional[str]]] = None,
 ) -> str:
     """
     Return the contents of a **pyproject.toml** file, updated to reflect the
     currently installed project versions, excluding those specified in
-    `ignore`.
+    `ignore`. Requirements in `build-system.requires`,
+    `project.dependencies` and `project.optional-dependencies` are updated,
+    and only the strings which change are rewritten, so comments and
+    formatting are preserved.
 
     Parameters:
 
     - data (str): The contents of a **pyproject.toml** file
     - ignore ([str]): One or more project names to leave as-is
+    - versions ({str: str|None}|None) = None: A table mapping normalized
+      distribution names to installed versions (by default, versions are
+      looked up in the current environment)
     """
     ignore_set: Set[str] = _normalize_ignore_argument(ignore)
 
     def get_updated_requirement_string(requirement: str) -> str:
-        return _get_updated_requirement_string(requirement, ignore=ignore_set)
+        return _get_patched_requirement_string(
+            requirement, ignore=ignore_set, versions=versions
+        )
 
-    # Parse
-    pyproject: Dict[str, Any] = tomli.loads(data)
-    if ("build-system" in pyproject) and (
-        "requires" in pyproject["build-system"]
-    ):
-        pyproject["build-system"]["requires"] = list(
-            map(
-                get_updated_requirement_string,
-                pyproject["build-system"]["requires"],
+    try:
+        return get_edited_pyproject_toml(data, get_updated_requirement_string)
+    except ValueError:
+        # If requirement strings cannot be located reliably, fall back to
+        # re-serializing the document
+        pyproject: Dict[str, Any] = tomli.loads(data)
+        updated_data: str = tomli_w.dumps(
+            _get_updated_pyproject(
+                tomli.loads(data), get_updated_requirement_string
             )
         )
-        return tomli_w.dumps(pyproject)
-    return data
+        return data if tomli.loads(updated_data) == pyproject else updated_data
 
 
-def _update(
-    path: str, ignore: Iterable[str] = (), all_extra_name: str = ""
-) -> None:
-    data: str
-    update_function: Callable[[str], str]
-    kwargs: Dict[str, Union[str, Iterable[str]]] = {}
+def _get_update_function(path: str) -> Callable[..., str]:
     base_file_name: str = os.path.basename(path).lower()
     if base_file_name == "setup.cfg":
-        update_function = get_updated_setup_cfg
-        if all_extra_name:
-            kwargs["all_extra_name"] = all_extra_name
+        return get_updated_setup_cfg
     elif base_file_name == "pyproject.toml":
-        update_function = get_updated_pyproject_toml
+        return get_updated_pyproject_toml
     elif base_file_name == "tox.ini":
-        update_function = get_updated_tox_ini
-    else:
-        update_function = get_updated_requirements_txt
-    kwargs["ignore"] = ignore
+        return get_updated_tox_ini
+    return get_updated_requirements_txt
+
+
+@dataclass
+class _RequirementsFile:
+    """
+    The contents of a file in which requirements are to be updated, and the
+    names of the distributions it references
+    """
+
+    path: str
+    data: str
+    names: Tuple[str, ...]
+
+
+def _read_requirements_file(path: str) -> _RequirementsFile:
+    data: str
     file_io: IO[str]
-    with open(path) as file_io:
+    # Line endings are read as-is, so that they are preserved when the
+    # updated file is written
+    with open(path, newline="") as file_io:
         data = file_io.read()
-    updated_data: str = update_function(data, **kwargs)
-    if updated_data == data:
-        print(f"All requirements were already up-to-date in {path}")
+    names: Tuple[str, ...] = ()
+    if is_configuration_file(path):
+        requirement_strings: Iterable[
+            str
+        ] = iter_configuration_file_requirement_strings(path, data)
+        names = tuple(
+            normalize_name(parse_requirement(requirement_string).name)
+            for requirement_string in requirement_strings
+        )
+    return _RequirementsFile(path=path, data=data, names=names)
+
+
+def _get_installed_versions(
+    names: Iterable[str],
+) -> Dict[str, Optional[str]]:
+    """
+    Build a table mapping each of the specified (normalized) distribution
+    names to its installed version, or to `None` if not installed
+    """
+    installed_distributions: Mapping[
+        str, IndexedDistribution
+    ] = get_installed_distributions()
+    versions: Dict[str, Optional[str]] = {}
+    name: str
+    for name in names:
+        if name not in versions:
+            distribution: Optional[
+                IndexedDistribution
+            ] = installed_distributions.get(name)
+            versions[name] = distribution.version if distribution else None
+    return versions
+
+
+def _get_updated_requirements_file_data(
+    requirements_file: _RequirementsFile,
+    ignore: Iterable[str] = (),
+    all_extra_name: str = "",
+    versions: Optional[Mapping[str, Optional[str]]] = None,
+) -> str:
+    update_function: Callable[..., str] = _get_update_function(
+        requirements_file.path
+    )
+    kwargs: Dict[str, Any] = dict(ignore=ignore, versions=versions)
+    if all_extra_name and (update_function is get_updated_setup_cfg):
+        kwargs["all_extra_name"] = all_extra_name
+    return update_function(requirements_file.data, **kwargs)
+
+
+def _is_requirements_file_name(file_name: str) -> bool:
+    file_name = file_name.lower()
+    if file_name.endswith(".txt"):
+        # Only text files named as requirement files are considered, since
+        # any text file would otherwise be treated as a requirements.txt
+        return file_name.startswith("requirements")
+    return file_name in _REQUIREMENTS_FILE_NAMES
+
+
+def _scan_directory(
+    directory: str, exclude_directory_patterns: Tuple[Pattern, ...]
+) -> Tuple[List[str], List[str]]:
+    """
+    Return the paths of the sub-directories to traverse, and of the
+    requirements files found, in a directory
+    """
+    sub_directories: List[str] = []
+    files: List[str] = []
+    entry: os.DirEntry
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not any(
+                        pattern.match(entry.name)
+                        for pattern in exclude_directory_patterns
+                    ):
+                        sub_directories.append(entry.path)
+                elif _is_requirements_file_name(
+                    entry.name
+                ) and is_configuration_file(entry.path):
+                    files.append(entry.path)
+    except (PermissionError, FileNotFoundError):
+        pass
+    return sub_directories, files
+
+
+def iter_find_requirements_files(
+    directory: str,
+    exclude_directory_regular_expressions: Iterable[
+        str
+    ] = EXCLUDE_DIRECTORY_REGULAR_EXPRESSIONS,
+    jobs: Optional[int] = None,
+) -> Iterable[str]:
+    """
+    Yield the path of every setup.cfg, pyproject.toml, tox.ini and
+    requirements*.txt file in a directory tree, as it is found. Directories
+    are scanned concurrently, and symbolic links to directories are not
+    followed.
+
+    Parameters:
+
+    - directory (str): The root of the directory tree to search
+    - exclude_directory_regular_expressions ([str]): Directories with names
+      matching any of these patterns (such as ".git", "venv" and
+      "site-packages", by default) are not searched
+    - jobs (int|None) = None: The maximum number of directories to scan
+      concurrently (by default, this is determined by the number of CPUs)
+    """
+    exclude_directory_patterns: Tuple[Pattern, ...] = tuple(
+        map(re.compile, exclude_directory_regular_expressions)
+    )
+    with ThreadPoolExecutor(max_workers=jobs or None) as executor:
+        pending: Set[Future] = {
+            executor.submit(
+                _scan_directory, directory, exclude_directory_patterns
+            )
+        }
+        while pending:
+            done: Set[Future]
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future: Future
+            for future in done:
+                sub_directories: List[str]
+                files: List[str]
+                sub_directories, files = future.result()
+                yield from files
+                pending.update(
+                    executor.submit(
+                        _scan_directory,
+                        sub_directory,
+                        exclude_directory_patterns,
+                    )
+                    for sub_directory in sub_directories
+                )
+
+
+def _print_diff(requirements_file: _RequirementsFile, data: str) -> None:
+    from difflib import unified_diff
+
+    line: str
+    for line in unified_diff(
+        requirements_file.data.splitlines(True),
+        data.splitlines(True),
+        fromfile=requirements_file.path,
+        tofile=requirements_file.path,
+    ):
+        sys.stdout.write(line)
+        if not line.endswith("\n"):
+            sys.stdout.write("\n\\ No newline at end of file\n")
+
+
+def _apply_update(
+    requirements_file: _RequirementsFile,
+    data: str,
+    check: bool = False,
+    diff: bool = False,
+) -> None:
+    """
+    Write or report the updated contents of a file
+    """
+    if data == requirements_file.data:
+        if not (check or diff):
+            print(
+                "All requirements were already up-to-date in "
+                f"{requirements_file.path}"
+            )
+    elif diff:
+        _print_diff(requirements_file, data)
+    elif check:
+        print(f"Requirements are out-of-date in {requirements_file.path}")
     else:
-        print(f"Updating requirements in {path}")
-        with open(path, "w") as file_io:
-            file_io.write(updated_data)
+        print(f"Updating requirements in {requirements_file.path}")
+        write_text_atomically(requirements_file.path, data)
+
+
+def _get_checked_requirements_file_data(
+    path: str, ignore: Iterable[str] = (), all_extra_name: str = ""
+) -> Tuple[_RequirementsFile, str]:
+    """
+    Read, resolve and update one requirements file, returning the file as
+    read along with its updated data
+    """
+    requirements_file: _RequirementsFile = _read_requirements_file(path)
+    return requirements_file, _get_updated_requirements_file_data(
+        requirements_file,
+        ignore=ignore,
+        all_extra_name=all_extra_name,
+        versions=_get_installed_versions(requirements_file.names),
+    )
+
+
+def _check(
+    paths: Iterable[str],
+    ignore: Iterable[str] = (),
+    all_extra_name: str = "",
+    jobs: Optional[int] = None,
+) -> bool:
+    """
+    Return `True` as soon as any of the specified files is found in which
+    requirements are out-of-date, without writing any files
+    """
+    # Read installed distributions once, before files are processed
+    get_installed_distributions()
+    # This is the default used by `ThreadPoolExecutor` in python 3.8+
+    max_workers: int = jobs or min(32, (os.cpu_count() or 1) + 4)
+    path_iterator: Iterator[str] = iter(unique_everseen(paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Set["Future[Tuple[_RequirementsFile, str]]"] = set()
+        try:
+            while True:
+                # Paths are only pulled from `paths` (which may be a
+                # generator searching a directory tree) to keep a bounded
+                # number of files in flight
+                pending.update(
+                    executor.submit(
+                        _get_checked_requirements_file_data,
+                        path,
+                        ignore,
+                        all_extra_name,
+                    )
+                    for path in islice(
+                        path_iterator, (2 * max_workers) - len(pending)
+                    )
+                )
+                if not pending:
+                    break
+                done: Set["Future[Tuple[_RequirementsFile, str]]"]
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                future: "Future[Tuple[_RequirementsFile, str]]"
+                for future in done:
+                    requirements_file: _RequirementsFile
+                    data: str
+                    requirements_file, data = future.result()
+                    if data != requirements_file.data:
+                        _apply_update(requirements_file, data, check=True)
+                        return True
+        finally:
+            # Files which have not yet been processed are skipped
+            for future in pending:
+                future.cancel()
+    return False
 
 
 def update(
     paths: Iterable[str],
     ignore: Iterable[str] = (),
     all_extra_name: str = "",
-) -> None:
+    jobs: Optional[int] = None,
+    check: bool = False,
+    diff: bool = False,
+) -> bool:
     """
-    Update requirement versions in the specified files.
+    Update requirement versions in the specified files, and return `True`
+    if any file was (or, when `check` or `diff` is `True`, would be)
+    changed.
+
+    Files are read and parsed concurrently, the installed version of each
+    distribution referenced by any file is then looked up once, and files
+    are updated concurrently using this table. Only files whose contents
+    have changed are (atomically) written.
 
     Parameters:
 
     - path (str|[str}): One or more local paths to setup.cfg and/or
-      requirements.txt files
+      requirements.txt files. Files are read as they are yielded, so `paths`
+      may be a generator such as `iter_find_requirements_files`.
     - ignore ([str]): One or more project names to ignore (leave as-is)
     - all_extra_name (str): If provided, an extra which consolidates
       the requirements for all other extras will be added/updated to
       *setup.cfg* (this argument is ignored for *requirements.txt* files)
+    - jobs (int|None) = None: The maximum number of files to process
+      concurrently (by default, this is determined by the number of CPUs)
+    - check (bool) = False: If `True`, no files are written, and processing
+      stops as soon as any file is found which would change (each file is
+      read, resolved and updated independently, and pending files are
+      cancelled once a change is found)
+    - diff (bool) = False: If `True`, no files are written, and a unified
+      diff is printed for each file which would change
     """
     if isinstance(paths, str):
         paths = (paths,)
+    ignore = tuple(_normalize_ignore_argument(ignore))
+    if check:
+        return _check(paths, ignore, all_extra_name, jobs)
+    changed: bool = False
+    requirements_file: _RequirementsFile
+    with ThreadPoolExecutor(max_workers=jobs or None) as executor:
+        # Parse
+        requirements_files: List[_RequirementsFile] = list(
+            executor.map(_read_requirements_file, unique_everseen(paths))
+        )
+        # Resolve
+        versions: Dict[str, Optional[str]] = _get_installed_versions(
+            chain(
+                *(
+                    requirements_file.names
+                    for requirements_file in requirements_files
+                )
+            )
+        )
 
-    def update_(path: str) -> None:
-        _update(path, ignore=ignore, all_extra_name=all_extra_name)
+        # Rewrite
+        def get_updated_data(requirements_file: _RequirementsFile) -> str:
+            return _get_updated_requirements_file_data(
+                requirements_file,
+                ignore=ignore,
+                all_extra_name=all_extra_name,
+                versions=versions,
+            )
 
-    list(map(update_, paths))
+        # Write (or report)
+        data: str
+        for requirements_file, data in zip(
+            requirements_files,
+            executor.map(get_updated_data, requirements_files),
+        ):
+            _apply_update(requirements_file, data, diff=diff)
+            if data != requirements_file.data:
+                changed = True
+    return changed
+
+
+def _print_parse_statistics() -> None:
+    name: str
+    info: Dict[str, int]
+    for name, info in get_parse_cache_info().items():
+        print(
+            f"{name}: {info['hits']} hits, {info['misses']} misses "
+            f"({info['currsize']} of {info['maxsize']} cached)",
+            file=sys.stderr,
+        )
 
 
 def main() -> None:
@@ -417,19 +1015,107 @@ def main() -> None:
     )
     parser.add_argument(
         "path",
-        nargs="+",
+        nargs="*",
         type=str,
         help=(
             "One or more local paths to a *setup.cfg* and/or "
             "*requirements.txt* file"
         ),
     )
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        default=[],
+        type=str,
+        action="append",
+        help=(
+            "Update every setup.cfg, pyproject.toml, tox.ini and "
+            "requirements*.txt file found in this directory or its "
+            "sub-directories, excluding hidden directories and those named "
+            '"venv" or "site-packages" (this may be passed more than once)'
+        ),
+    )
+    parser.add_argument(
+        "-nr",
+        "--no-refresh",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't regenerate stale metadata for editable installations "
+            "before reading installed distributions (for read-only use, "
+            "where the cost of checking for stale metadata isn't warranted)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        type=int,
+        help=(
+            "The maximum number of files to update, and of editable "
+            "installations for which metadata may be regenerated, "
+            "concurrently (by default, this is determined by the number of "
+            "CPUs)"
+        ),
+    )
+    parser.add_argument(
+        "-ps",
+        "--parse-statistics",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Once finished, print the number of cache hits and misses for "
+            "parsed requirements, specifier sets and versions to stderr"
+        ),
+    )
+    parser.add_argument(
+        "--check",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't write any files, and exit with a non-zero status as soon "
+            "as a file is found in which requirements are out-of-date"
+        ),
+    )
+    parser.add_argument(
+        "--diff",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't write any files, but print a unified diff of the changes "
+            "which would be made, and exit with a non-zero status if any "
+            "file would change"
+        ),
+    )
     arguments: argparse.Namespace = parser.parse_args()
-    update(
-        paths=arguments.path,
+    if not (arguments.path or arguments.recursive):
+        parser.error("a path or -r / --recursive directory is required")
+    set_refresh_editable_distributions(
+        not arguments.no_refresh, jobs=arguments.jobs
+    )
+    directory: str
+    changed: bool = update(
+        paths=chain(
+            arguments.path,
+            *(
+                iter_find_requirements_files(directory, jobs=arguments.jobs)
+                for directory in arguments.recursive
+            ),
+        ),
         ignore=tuple(iter_parse_delimited_values(arguments.ignore)),
         all_extra_name=arguments.all_extra_name,
+        jobs=arguments.jobs,
+        check=arguments.check,
+        diff=arguments.diff,
     )
+    if arguments.parse_statistics:
+        _print_parse_statistics()
+    if changed and (arguments.check or arguments.diff):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,8 @@
+import ast
 import functools
+import re
 import sys
 import os
-import tomli
-import pkg_resources
-import importlib_metadata
 from runpy import run_path
 from shutil import rmtree, move
 from tempfile import mkdtemp
@@ -27,11 +26,24 @@ from typing import (
     Union,
     Callable,
     Any,
+    AbstractSet,
+    FrozenSet,
+    Match,
+    Mapping,
 )
 from packaging.utils import canonicalize_name
 from packaging.requirements import InvalidRequirement, Requirement
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version, parse as _parse_version
 from more_itertools import unique_everseen
-from ..utilities import lru_cache, run
+from .index import (
+    IndexedDistribution,
+    get_metadata_fingerprint,
+    iter_indexed_distributions,
+    set_marker_environment,
+)
+from .pyproject import iter_pyproject_requirement_strings
+from ..utilities import lru_cache, run, read_cache, write_cache
 from ..errors import append_exception_text, get_exception_text
 
 _return_dict_str_str_lru_cache: Callable[
@@ -41,13 +53,63 @@ _BUILTIN_DISTRIBUTION_NAMES: Tuple[str] = ("distribute",)
 # This variable tracks the absolute file paths from which a package has been
 # re-installed, in order to avoid performing a reinstall redundantly
 _reinstalled_locations: Set[str] = set()
+_SETUP_FILE_NAMES: Tuple[str, ...] = (
+    "setup.py",
+    "setup.cfg",
+    "pyproject.toml",
+)
+# Increment this whenever the structure of editable distribution fingerprints
+# changes, in order to invalidate those cached by prior versions
+_EDITABLE_FINGERPRINT_VERSION: int = 1
+# When `False`, distribution metadata for editable installs is not refreshed
+# prior to reading installed distributions
+_refresh_editable: bool = True
+# The maximum number of editable projects for which metadata is regenerated
+# concurrently (`0` indicates the number of CPUs should be used)
+_refresh_editable_jobs: int = 0
+# Increment this whenever the structure of cached setup metadata changes
+_SETUP_METADATA_VERSION: int = 2
+# Project directories mapped to a fingerprint of their setup files, and
+# metadata values retrieved while the fingerprint was current
+_setup_metadata: Dict[str, Tuple[List[List[Any]], Dict[str, str]]] = {}
+# When not `None`, distributions are read from these directories (belonging
+# to a target environment) rather than from `sys.path`
+_target_paths: Optional[Tuple[str, ...]] = None
+# The python executable of the target environment, if known
+_target_python: str = ""
+# Environment marker variables of a Windows target environment
+_WINDOWS_MARKER_ENVIRONMENT: Dict[str, str] = {
+    "os_name": "nt",
+    "platform_system": "Windows",
+    "sys_platform": "win32",
+}
+# The source of installed distribution metadata: either "index" (a
+# persistent, incrementally refreshed index) or "importlib" (metadata
+# read lazily, for each distribution, using `importlib.metadata`)
+METADATA_BACKENDS: Tuple[str, ...] = ("index", "importlib")
+_metadata_backend: str = (
+    os.environ.get("DAVES_DEV_TOOLS_METADATA_BACKEND", "").lower() or "index"
+)
+# The maximum number of requirements, specifier sets and versions (each)
+# retained by `parse_requirement`, `parse_specifier_set` and `parse_version`
+PARSE_CACHE_SIZE: int = 4096
 
 
 def normalize_name(name: str) -> str:
     """
     Normalize a project/distribution name
     """
-    return pkg_resources.safe_name(canonicalize_name(name)).lower()
+    # This is equivalent to `pkg_resources.safe_name`, applied to the
+    # canonical name
+    return re.sub(r"[^A-Za-z0-9.]+", "-", canonicalize_name(name)).lower()
+
+
+def _to_filename(name: str) -> str:
+    """
+    Convert a project name to the form used in metadata file names (this is
+    equivalent to `pkg_resources.to_filename`)
+    """
+    return name.replace("-", "_")
 
 
 class ConfigurationFileType(Enum):
@@ -141,8 +203,275 @@ def _iter_path_editable_distribution_locations(
 
 def _iter_editable_distribution_locations() -> Iterable[Tuple[str, str]]:
     yield from chain(
-        *map(_iter_path_editable_distribution_locations, sys.path)
+        *map(
+            _iter_path_editable_distribution_locations,
+            get_distribution_paths(),
+        )
+    )
+
+
+def _read_pyvenv_cfg(prefix: Path) -> Dict[str, str]:
+    values: Dict[str, str] = {}
+    try:
+        with open(prefix.joinpath("pyvenv.cfg")) as pyvenv_cfg_io:
+            line: str
+            for line in pyvenv_cfg_io:
+                key: str
+                separator: str
+                value: str
+                key, separator, value = line.partition("=")
+                if separator:
+                    values[key.strip().lower()] = value.strip()
+    except OSError:
+        pass
+    return values
+
+
+def _get_executable_prefix(executable: Path) -> Path:
+    if executable.parent.name in ("bin", "Scripts"):
+        return executable.parent.parent
+    return executable.parent
+
+
+def _get_python_version(executable: Path, pyvenv_cfg: Dict[str, str]) -> str:
+    """
+    Return the version of a python executable (as "X.Y" or "X.Y.Z") found in
+    the *pyvenv.cfg* of its environment, or in the executable's name, or an
+    empty string if the version cannot be determined.
+    """
+    version: str = pyvenv_cfg.get("version", "") or pyvenv_cfg.get(
+        "version_info", ""
+    )
+    if version:
+        return ".".join(version.split(".")[:3])
+    version_match: Optional[Match[str]] = re.match(
+        r"python(\d+\.\d+)", executable.name
+    )
+    return version_match.group(1) if version_match else ""
+
+
+def _iter_prefix_site_packages(prefix: Path, version: str) -> Iterable[str]:
+    patterns: Tuple[str, ...] = (
+        (
+            f"lib*/python{version}/site-packages",
+            f"lib*/python{version}/dist-packages",
+            "lib/python3/dist-packages",
+        )
+        if version
+        else ("lib*/python*/site-packages", "lib*/python*/dist-packages")
+    ) + ("Lib/site-packages",)
+    pattern: str
+    for pattern in patterns:
+        yield from sorted(map(str, filter(Path.is_dir, prefix.glob(pattern))))
+
+
+def get_python_site_packages(python: str) -> Tuple[str, ...]:
+    """
+    Infer the site-packages directories of the environment to which a python
+    executable belongs from the layout of the environment (without running
+    the executable).
+
+    Parameters:
+
+    - python (str): The path of a python executable, such as
+      "path/to/venv/bin/python"
+    """
+    # Symbolic links are not resolved, since the executable of a virtual
+    # environment is typically a link to the base interpreter
+    executable: Path = Path(os.path.abspath(python))
+    prefix: Path = _get_executable_prefix(executable)
+    pyvenv_cfg: Dict[str, str] = _read_pyvenv_cfg(prefix)
+    version: str = ".".join(
+        _get_python_version(executable, pyvenv_cfg).split(".")[:2]
+    )
+    prefixes: List[Path] = [prefix]
+    if pyvenv_cfg.get("home") and (
+        pyvenv_cfg.get("include-system-site-packages", "").lower() == "true"
+    ):
+        home: Path = Path(pyvenv_cfg["home"])
+        prefixes.append(
+            home.parent if home.name in ("bin", "Scripts") else home
+        )
+    return tuple(
+        unique_everseen(
+            chain(
+                *(
+                    _iter_prefix_site_packages(prefix_, version)
+                    for prefix_ in prefixes
+                )
+            ),
+            # "lib64" is often a link to "lib"
+            key=os.path.realpath,
+        )
+    )
+
+
+def _iter_pth_file_paths(directory: str) -> Iterable[str]:
+    """
+    Yield the (existing) directories added to `sys.path` by *.pth files in a
+    site-packages directory, in the same manner as the `site` module (but
+    without executing "import" lines).
+    """
+    file_path: Path
+    for file_path in sorted(Path(directory).glob("*.pth")):
+        try:
+            with open(file_path) as file_io:
+                line: str
+                for line in file_io:
+                    line = line.rstrip()
+                    if line and not line.startswith(("#", "import ")):
+                        path: str = os.path.join(directory, line)
+                        if os.path.isdir(path):
+                            yield os.path.normpath(path)
+        except (OSError, UnicodeDecodeError):
+            pass
+
+
+def _get_implementation_marker_environment(
+    implementation: str,
+) -> Dict[str, str]:
+    return {
+        "implementation_name": implementation.lower(),
+        "platform_python_implementation": implementation,
+    }
+
+
+def _get_site_packages_marker_environment(
+    site_packages: Iterable[str],
+) -> Dict[str, str]:
+    """
+    Infer environment marker variables from the layout of site-packages
+    directories (such as "lib/python3.9/site-packages" or
+    "Lib/site-packages").
+    """
+    environment: Dict[str, str] = {}
+    directory: str
+    for directory in site_packages:
+        layout_match: Optional[Match[str]] = re.search(
+            r"[/\\](python|pypy)(\d+\.\d+)[/\\](?:site|dist)-packages$",
+            directory,
+        )
+        if layout_match:
+            environment.setdefault("python_version", layout_match.group(2))
+            if layout_match.group(1) == "pypy":
+                environment.update(
+                    _get_implementation_marker_environment("PyPy")
+                )
+        elif re.search(r"[/\\]Lib[/\\]site-packages$", directory):
+            environment.update(_WINDOWS_MARKER_ENVIRONMENT)
+    return environment
+
+
+def _get_target_marker_environment(
+    python: str, site_packages: Iterable[str]
+) -> Dict[str, str]:
+    """
+    Return those environment marker variables of a target environment which
+    can be inferred from its python executable's *pyvenv.cfg* and from the
+    layout of its site-packages directories.
+    """
+    environment: Dict[str, str] = _get_site_packages_marker_environment(
+        site_packages
+    )
+    version: str = environment.pop("python_version", "")
+    if python:
+        executable: Path = Path(os.path.abspath(python))
+        pyvenv_cfg: Dict[str, str] = _read_pyvenv_cfg(
+            _get_executable_prefix(executable)
+        )
+        version = _get_python_version(executable, pyvenv_cfg) or version
+        if executable.parent.name == "Scripts":
+            environment.update(_WINDOWS_MARKER_ENVIRONMENT)
+        if pyvenv_cfg.get("implementation"):
+            environment.update(
+                _get_implementation_marker_environment(
+                    pyvenv_cfg["implementation"]
+                )
+            )
+    if version:
+        python_version: str = ".".join(version.split(".")[:2])
+        environment["python_version"] = python_version
+        if version.count(".") > 1:
+            environment["python_full_version"] = version
+        elif python_version != "{}.{}".format(*sys.version_info[:2]):
+            # Only the minor version is known
+            environment["python_full_version"] = f"{python_version}.0"
+    return environment
+
+
+def set_target_environment(
+    python: str = "", site_packages: Iterable[str] = ()
+) -> None:
+    """
+    Inspect a different python environment than the current one. Distribution
+    metadata is read directly from the target environment's site-packages
+    directories, so the target interpreter is never launched in order to read
+    metadata (it is only used for `pip` commands which modify the target
+    environment, such as installing missing requirements). Metadata for
+    editable installations is not regenerated for a target environment.
+
+    Parameters:
+
+    - python (str) = "": The path of the target environment's python
+      executable
+    - site_packages ([str]) = (): One or more site-packages directories
+      belonging to the target environment. These are inferred from `python`
+      if not provided. If neither `python` nor `site_packages` are provided,
+      the current environment is inspected.
+
+    Environment markers in the requirements of installed distributions are
+    evaluated using the target environment's python version (and platform,
+    where this can be inferred) rather than that of the running interpreter.
+    """
+    global _target_paths, _target_python
+    if isinstance(site_packages, str):
+        site_packages = (site_packages,)
+    directories: Tuple[str, ...] = tuple(map(os.path.abspath, site_packages))
+    if python and not directories:
+        directories = get_python_site_packages(python)
+    target_python: str = os.path.abspath(python) if python else ""
+    target_paths: Optional[Tuple[str, ...]] = (
+        tuple(
+            unique_everseen(
+                chain(
+                    *(
+                        chain((directory,), _iter_pth_file_paths(directory))
+                        for directory in directories
+                    )
+                )
+            )
+        )
+        if (python or directories)
+        else None
     )
+    set_marker_environment(_get_target_marker_environment(python, directories))
+    # Cached distribution information remains valid if the target is unchanged
+    if (target_paths, target_python) != (_target_paths, _target_python):
+        _target_paths, _target_python = target_paths, target_python
+        refresh_working_set()
+
+
+def get_distribution_paths() -> Tuple[str, ...]:
+    """
+    Return the directories in which installed distributions are looked
+    for: those of the target environment (see `set_target_environment`), or
+    `sys.path`.
+    """
+    if _target_paths is None:
+        return tuple(sys.path)
+    return _target_paths
+
+
+def get_python_executable() -> str:
+    """
+    Return the python executable used to run `pip` commands: that of the
+    target environment (see `set_target_environment`), or `sys.executable`.
+    An empty string is returned if a target environment was identified only
+    by its site-packages directories.
+    """
+    if _target_paths is None:
+        return sys.executable
+    return _target_python
 
 
 @_return_dict_str_str_lru_cache()
@@ -154,17 +483,51 @@ def get_editable_distributions_locations() -> Dict[str, str]:
     return dict(_iter_editable_distribution_locations())
 
 
+def get_environment_fingerprint() -> List[List[Any]]:
+    """
+    Return a fingerprint of the environment being inspected, composed of the
+    modification times of all distribution paths (which change when
+    distributions are installed or uninstalled) and of the setup files of
+    all editable installations. If the fingerprint changes, cached
+    distribution information should be refreshed (using
+    `refresh_working_set`).
+    """
+    fingerprint: List[List[Any]] = []
+    path: str
+    for path in get_distribution_paths():
+        try:
+            fingerprint.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            fingerprint.append([path, None])
+    location: str
+    for location in sorted(
+        set(get_editable_distributions_locations().values())
+    ):
+        fingerprint.append([location, _get_setup_files_fingerprint(location)])
+    return fingerprint
+
+
 def refresh_working_set() -> None:
     """
     Force a refresh of all distribution information and clear related caches
     """
     get_installed_distributions.cache_clear()
+    get_requirement_graph.cache_clear()
     get_editable_distributions_locations.cache_clear()  # type: ignore
     is_editable.cache_clear()
     is_installed.cache_clear()
     get_requirement_string_distribution_name.cache_clear()
-    pkg_resources.working_set.entries = []
-    pkg_resources.working_set.__init__()  # type: ignore
+
+
+def clear_path_caches() -> None:
+    """
+    Clear cached information retrieved for paths (which may be relative to
+    the current working directory) and the projects they refer to. This
+    should be done whenever the working directory changes.
+    """
+    get_configuration_file_type.cache_clear()
+    get_requirement_string_distribution_name.cache_clear()
+    _setup_metadata.clear()
 
 
 def _iter_find_dist_info(directory: Path, project_name: str) -> Iterable[Path]:
@@ -175,9 +538,7 @@ def _iter_find_dist_info(directory: Path, project_name: str) -> Iterable[Path]:
     """
     yield from filter(
         Path.is_dir,
-        directory.glob(
-            f"{pkg_resources.to_filename(project_name)}" "-*.dist-info"
-        ),
+        directory.glob(f"{_to_filename(project_name)}" "-*.dist-info"),
     )
 
 
@@ -210,58 +571,247 @@ def _merge_directories(
     rmtree(source_directory)
 
 
-def refresh_editable_distributions() -> None:
+def _get_setup_files_fingerprint(directory: str) -> List[List[Any]]:
+    """
+    Get the names, modification times and sizes of the setup.py, setup.cfg
+    and pyproject.toml files in a project directory
+    """
+    fingerprint: List[List[Any]] = []
+    file_name: str
+    for file_name in _SETUP_FILE_NAMES:
+        try:
+            stat_result: os.stat_result = os.stat(
+                os.path.join(directory, file_name)
+            )
+        except OSError:
+            continue
+        fingerprint.append(
+            [file_name, stat_result.st_mtime_ns, stat_result.st_size]
+        )
+    return fingerprint
+
+
+def _get_editable_distribution_fingerprint(
+    location: str, egg_base: Path, distribution: IndexedDistribution
+) -> List[List[Any]]:
     """
-    Update distribution information for editable installs
+    Get the modification times and sizes of an editable project's setup files
+    and of its installed metadata, for the purpose of detecting when the
+    metadata needs to be regenerated
     """
+    fingerprint: List[List[Any]] = _get_setup_files_fingerprint(location)
+    metadata_path: str
+    for metadata_path in sorted(
+        set(
+            chain(
+                map(
+                    str,
+                    _iter_find_dist_info(egg_base, distribution.project_name),
+                ),
+                (distribution.egg_info,),
+            )
+        )
+    ):
+        fingerprint.append(
+            [metadata_path, get_metadata_fingerprint(metadata_path)]
+        )
+    return fingerprint
+
+
+def _refresh_editable_distribution(
+    location: str, distribution: IndexedDistribution, force: bool = False
+) -> None:
+    egg_base: Path = Path(getattr(distribution, "egg_info")).parent
+    cache_key: str = f"{location}\n{egg_base}"
+    if (not force) and (
+        read_cache(
+            "editable-fingerprints",
+            cache_key,
+            _EDITABLE_FINGERPRINT_VERSION,
+        ).get("fingerprint")
+        == _get_editable_distribution_fingerprint(
+            location, egg_base, distribution
+        )
+    ):
+        # Neither the setup files nor the metadata have changed since the
+        # metadata was last generated
+        return
+    # Find pre-existing dist-info directories, and rename them so that
+    # the new dist-info directory doesn't overwrite the old one, then
+    # merge the two directories, replacing old files with new files
+    # when they exist in both
+    temp_directory: Path = _move_dist_info_to_temp_directory(
+        egg_base, distribution.project_name
+    )
+    try:
+        if egg_base == location:
+            setup_egg_info(location)
+        else:
+            setup_dist_info(location, egg_base)
+    finally:
+        _merge_directories(
+            temp_directory,
+            next(
+                iter(_iter_find_dist_info(egg_base, distribution.project_name))
+            ),
+            overwrite=False,
+        )
+    write_cache(
+        "editable-fingerprints",
+        cache_key,
+        _EDITABLE_FINGERPRINT_VERSION,
+        {
+            "fingerprint": _get_editable_distribution_fingerprint(
+                location, egg_base, distribution
+            )
+        },
+    )
+
+
+def set_refresh_editable_distributions(
+    refresh: bool = True, jobs: Optional[int] = None
+) -> None:
+    """
+    Determine whether distribution metadata for editable installs should be
+    regenerated (when stale) prior to reading installed distributions. This is
+    enabled by default, and can be disabled by read-only callers in order to
+    avoid the cost of checking for (and regenerating) stale metadata.
+
+    Parameters:
+
+    - refresh (bool) = True
+    - jobs (int|None) = None: The maximum number of projects for which
+      metadata may be regenerated concurrently. If `0`, the number of CPUs
+      is used. If `None`, the current setting is retained.
+    """
+    global _refresh_editable, _refresh_editable_jobs
+    _refresh_editable = refresh
+    if jobs is not None:
+        _refresh_editable_jobs = jobs
+
+
+def refresh_editable_distributions(
+    force: bool = False, jobs: Optional[int] = None
+) -> None:
+    """
+    Update distribution information for editable installs. Metadata is only
+    regenerated for projects for which setup.py, setup.cfg, pyproject.toml
+    or the installed metadata have changed since it was last generated.
+
+    Parameters:
+
+    - force (bool) = False: If `True`, metadata will be regenerated for all
+      editable installs, whether or not changes have been detected
+    - jobs (int|None) = None: The maximum number of projects for which
+      metadata may be regenerated concurrently. If `0`, the number of CPUs
+      is used. If `None`, the value set using
+      `set_refresh_editable_distributions` is used.
+    """
+    if jobs is None:
+        jobs = _refresh_editable_jobs
     name: str
     location: str
+    indexed_distributions: Mapping[
+        str, IndexedDistribution
+    ] = _get_indexed_distributions()
+    locations_distributions: List[Tuple[str, IndexedDistribution]] = []
     for name, location in get_editable_distributions_locations().items():
-        distribution: pkg_resources.Distribution = (
-            pkg_resources.get_distribution(name)
+        distribution: Optional[
+            IndexedDistribution
+        ] = indexed_distributions.get(name)
+        if distribution is not None:
+            locations_distributions.append((location, distribution))
+    if not locations_distributions:
+        return
+    from concurrent.futures import ThreadPoolExecutor
+
+    def refresh_editable_distribution(
+        location_distribution: Tuple[str, IndexedDistribution]
+    ) -> None:
+        _refresh_editable_distribution(*location_distribution, force=force)
+
+    # Each refresh is performed by a `setup.py` sub-process, so a thread pool
+    # is sufficient to run these processes in parallel
+    with ThreadPoolExecutor(
+        max_workers=min(
+            jobs or os.cpu_count() or 1, len(locations_distributions)
         )
-        egg_base: Path = Path(getattr(distribution, "egg_info")).parent
-        # Find pre-existing dist-info directories, and rename them so that
-        # the new dist-info directory doesn't overwrite the old one, then
-        # merge the two directories, replacing old files with new files
-        # when they exist in both
-        temp_directory: Path = _move_dist_info_to_temp_directory(
-            egg_base, distribution.project_name
+    ) as executor:
+        deque(
+            executor.map(
+                refresh_editable_distribution, locations_distributions
+            ),
+            maxlen=0,
         )
-        try:
-            if egg_base == location:
-                setup_egg_info(location)
-            else:
-                setup_dist_info(location, egg_base)
-        finally:
-            _merge_directories(
-                temp_directory,
-                next(
-                    iter(
-                        _iter_find_dist_info(
-                            egg_base, distribution.project_name
-                        )
-                    )
-                ),
-                overwrite=False,
-            )
-    pkg_resources.working_set.entries = []
-    pkg_resources.working_set.__init__()  # type: ignore
 
 
-@lru_cache()
-def get_installed_distributions() -> Dict[str, pkg_resources.Distribution]:
+def set_metadata_backend(backend: str = "index") -> None:
     """
-    Return a dictionary of installed distributions.
+    Select the source of installed distribution metadata. The backend can
+    also be selected using the environment variable
+    `DAVES_DEV_TOOLS_METADATA_BACKEND`.
+
+    Parameters:
+
+    - backend (str) = "index": "index" (the default) reads distributions from
+      a persistent index, which is only partially re-read when distributions
+      are added, removed or modified. "importlib" lists distributions using
+      `importlib.metadata`, and reads the metadata of each distribution only
+      when it is first looked up (nothing is cached between invocations).
     """
-    refresh_editable_distributions()
-    installed: Dict[str, pkg_resources.Distribution] = {}
-    for distribution in pkg_resources.working_set:
-        installed[normalize_name(distribution.project_name)] = distribution
+    global _metadata_backend
+    backend = backend.lower()
+    if backend not in METADATA_BACKENDS:
+        raise ValueError(
+            f"{backend} is not a recognized metadata backend (expected one "
+            f"of: {', '.join(METADATA_BACKENDS)})"
+        )
+    _metadata_backend = backend
+    refresh_working_set()
+
+
+def get_metadata_backend() -> str:
+    """
+    Return the name of the selected source of installed distribution
+    metadata (see `set_metadata_backend`)
+    """
+    return _metadata_backend
+
+
+def _get_indexed_distributions() -> Mapping[str, IndexedDistribution]:
+    """
+    Read the distribution index for each directory in `sys.path` (or in the
+    target environment), and return a dictionary mapping normalized
+    distribution names to distributions.
+    """
+    if _metadata_backend == "importlib":
+        from .importlib_backend import ImportlibDistributions
+
+        return ImportlibDistributions(
+            get_distribution_paths(), normalize_name=normalize_name
+        )
+    installed: Dict[str, IndexedDistribution] = {}
+    distribution: IndexedDistribution
+    for distribution in iter_indexed_distributions(get_distribution_paths()):
+        # Distributions found earlier in the path take precedence
+        installed.setdefault(
+            normalize_name(distribution.project_name), distribution
+        )
     return installed
 
 
-def get_distribution(name: str) -> pkg_resources.Distribution:
+@lru_cache()
+def get_installed_distributions() -> Mapping[str, IndexedDistribution]:
+    """
+    Return a mapping of (normalized) names to installed distributions.
+    """
+    # Editable metadata is only regenerated for the current environment
+    if _refresh_editable and (_target_paths is None):
+        refresh_editable_distributions()
+    return _get_indexed_distributions()
+
+
+def get_distribution(name: str) -> IndexedDistribution:
     return get_installed_distributions()[normalize_name(name)]
 
 
@@ -281,26 +831,89 @@ def get_requirement_string_distribution_name(requirement_string: str) -> str:
     )
 
 
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_requirement(requirement_string: str) -> Requirement:
+    """
+    Parse a requirement string. The same `Requirement` instance is returned
+    for recently parsed strings, so the result must not be modified (copy it
+    first, if needed).
+    """
+    return Requirement(requirement_string)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_specifier_set(specifiers: str) -> SpecifierSet:
+    """
+    Parse a comma-separated list of specifiers, returning the same
+    `SpecifierSet` instance for recently parsed strings.
+    """
+    return SpecifierSet(specifiers)
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_version(version: str) -> Version:
+    """
+    Parse a version string, returning the same `Version` instance for
+    recently parsed strings.
+    """
+    return _parse_version(version)
+
+
+def get_parse_cache_info() -> Dict[str, Dict[str, int]]:
+    """
+    Return the number of cache hits and misses, and the current and maximum
+    number of entries, for each of `parse_requirement`,
+    `parse_specifier_set` and `parse_version`.
+    """
+    function: Any
+    return {
+        name: function.cache_info()._asdict()
+        for name, function in (
+            ("requirement", parse_requirement),
+            ("specifier_set", parse_specifier_set),
+            ("version", parse_version),
+        )
+    }
+
+
 @lru_cache()
 def is_requirement_string(requirement_string: str) -> bool:
     try:
-        Requirement(requirement_string)
+        parse_requirement(requirement_string)
     except InvalidRequirement:
         return False
     return True
 
 
-def _iter_file_requirement_strings(path: str) -> Iterable[str]:
-    lines: List[str]
-    requirement_file_io: IO[str]
-    with open(path) as requirement_file_io:
-        lines = requirement_file_io.readlines()
-    return filter(is_requirement_string, lines)
+def _read_text(path: str, data: Optional[str] = None) -> str:
+    if data is None:
+        text_io: IO[str]
+        with open(path) as text_io:
+            data = text_io.read()
+    return data
 
 
-def _iter_setup_cfg_requirement_strings(path: str) -> Iterable[str]:
+def _read_configuration(path: str, data: Optional[str] = None) -> ConfigParser:
     parser: ConfigParser = ConfigParser()
-    parser.read(path)
+    if data is None:
+        parser.read(path)
+    else:
+        parser.read_string(data)
+    return parser
+
+
+def _iter_file_requirement_strings(
+    path: str, data: Optional[str] = None
+) -> Iterable[str]:
+    return filter(
+        is_requirement_string, _read_text(path, data).splitlines(True)
+    )
+
+
+def _iter_setup_cfg_requirement_strings(
+    path: str, data: Optional[str] = None
+) -> Iterable[str]:
+    parser: ConfigParser = _read_configuration(path, data)
     requirement_strings: Iterable[str] = ()
     if ("options" in parser) and ("install_requires" in parser["options"]):
         requirement_strings = chain(
@@ -324,9 +937,10 @@ def _iter_setup_cfg_requirement_strings(path: str) -> Iterable[str]:
     return unique_everseen(requirement_strings)
 
 
-def _iter_tox_ini_requirement_strings(path: str) -> Iterable[str]:
-    parser: ConfigParser = ConfigParser()
-    parser.read(path)
+def _iter_tox_ini_requirement_strings(
+    path: str, data: Optional[str] = None
+) -> Iterable[str]:
+    parser: ConfigParser = _read_configuration(path, data)
 
     def get_section_option_requirements(
         section_name: str, option_name: str
@@ -354,35 +968,43 @@ def _iter_tox_ini_requirement_strings(path: str) -> Iterable[str]:
     )
 
 
-def _iter_pyproject_toml_requirement_strings(path: str) -> Iterable[str]:
-    pyproject_io: IO[str]
-    with open(path) as pyproject_io:
-        pyproject: Dict[str, Any] = tomli.loads(pyproject_io.read())
-        if ("build-system" in pyproject) and (
-            "requires" in pyproject["build-system"]
-        ):
-            return pyproject["build-system"]["requires"]
-    return ()
+def _iter_pyproject_toml_requirement_strings(
+    path: str, data: Optional[str] = None
+) -> Iterable[str]:
+    import tomli
+
+    return iter_pyproject_requirement_strings(
+        tomli.loads(_read_text(path, data))
+    )
 
 
-def iter_configuration_file_requirement_strings(path: str) -> Iterable[str]:
+def iter_configuration_file_requirement_strings(
+    path: str, data: Optional[str] = None
+) -> Iterable[str]:
     """
     Read a configuration file and yield the parsed requirements.
+
+    Parameters:
+
+    - path (str): The path of a setup.cfg, pyproject.toml, tox.ini or
+      requirements.txt file
+    - data (str|None) = None: The contents of the file, if these have
+      already been read (by default, the file at `path` is read)
     """
     configuration_file_type: ConfigurationFileType = (
         get_configuration_file_type(path)
     )
     if configuration_file_type == ConfigurationFileType.SETUP_CFG:
-        return _iter_setup_cfg_requirement_strings(path)
+        return _iter_setup_cfg_requirement_strings(path, data)
     elif configuration_file_type == ConfigurationFileType.PYPROJECT_TOML:
-        return _iter_pyproject_toml_requirement_strings(path)
+        return _iter_pyproject_toml_requirement_strings(path, data)
     elif configuration_file_type == ConfigurationFileType.TOX_INI:
-        return _iter_tox_ini_requirement_strings(path)
+        return _iter_tox_ini_requirement_strings(path, data)
     else:
         assert (
             configuration_file_type == ConfigurationFileType.REQUIREMENTS_TXT
         )
-        return _iter_file_requirement_strings(path)
+        return _iter_file_requirement_strings(path, data)
 
 
 @lru_cache()
@@ -397,10 +1019,7 @@ def is_editable(distribution_project_name: str) -> bool:
 
 
 def _get_setup_cfg_metadata(path: str, key: str) -> str:
-    if os.path.basename(path).lower() != "setup.cfg":
-        if not os.path.isdir(path):
-            path = os.path.dirname(path)
-        path = os.path.join(path, "setup.cfg")
+    path = _get_project_file_path(path, "setup.cfg")
     if os.path.isfile(path):
         parser: ConfigParser = ConfigParser()
         parser.read(path)
@@ -411,6 +1030,113 @@ def _get_setup_cfg_metadata(path: str, key: str) -> str:
     return ""
 
 
+def _get_project_file_path(path: str, file_name: str) -> str:
+    """
+    Given a project directory, or a path to a file in the project directory,
+    return the path of the project file named `file_name`.
+    """
+    if os.path.basename(path).lower() != file_name:
+        if not os.path.isdir(path):
+            path = os.path.dirname(path)
+        path = os.path.join(path, file_name)
+    return path
+
+
+def _get_pyproject_toml_metadata(path: str, key: str) -> str:
+    """
+    Read a value from the `[project]` table (see PEP 621) of a project's
+    pyproject.toml file. If the file or table does not exist, or if the
+    value is declared as being "dynamic", an empty string is returned.
+    """
+    import tomli
+
+    path = _get_project_file_path(path, "pyproject.toml")
+    if os.path.isfile(path):
+        pyproject_io: IO[str]
+        with open(path) as pyproject_io:
+            try:
+                project: Any = tomli.loads(pyproject_io.read()).get("project")
+            except tomli.TOMLDecodeError:
+                warn(f"Could not parse {path}: {get_exception_text()}")
+                return ""
+        if isinstance(project, dict) and key not in project.get("dynamic", ()):
+            value: Any = project.get(key, "")
+            if isinstance(value, str):
+                return value
+    return ""
+
+
+def _get_ast_string(node: Optional[ast.AST]) -> Optional[str]:
+    """
+    Return the value of a string literal node, or `None` if `node` is not a
+    string literal (`ast.Str` is used by python versions prior to 3.8, and
+    `ast.Constant` thereafter).
+    """
+    value: Any = getattr(node, "value", getattr(node, "s", None))
+    if type(node).__name__ in ("Constant", "Str") and isinstance(value, str):
+        return value
+    return None
+
+
+def _iter_setup_py_setup_calls(module: ast.Module) -> Iterable[ast.Call]:
+    node: ast.AST
+    for node in ast.walk(module):
+        if isinstance(node, ast.Call) and (
+            (isinstance(node.func, ast.Name) and node.func.id == "setup")
+            or (
+                isinstance(node.func, ast.Attribute)
+                and node.func.attr == "setup"
+            )
+        ):
+            yield node
+
+
+def _get_ast_module_string_variables(module: ast.Module) -> Dict[str, str]:
+    """
+    Return a dictionary mapping the names of module-level variables which are
+    assigned string literals to their values
+    """
+    variables: Dict[str, str] = {}
+    node: ast.stmt
+    for node in module.body:
+        if isinstance(node, ast.Assign):
+            value: Optional[str] = _get_ast_string(node.value)
+            if value is not None:
+                target: ast.expr
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        variables[target.id] = value
+    return variables
+
+
+def _get_setup_py_static_metadata(path: str, key: str) -> str:
+    """
+    Read the literal value of the keyword argument `key` from a `setup()` call
+    in a setup.py script, without executing the script. Values which are
+    string literals, or module-level variables assigned a string literal,
+    are supported. For anything else, an empty string is returned.
+    """
+    path = _get_project_file_path(path, "setup.py")
+    if not os.path.isfile(path):
+        return ""
+    setup_py_io: IO[bytes]
+    try:
+        with open(path, "rb") as setup_py_io:
+            module: ast.Module = ast.parse(setup_py_io.read(), path)
+    except (SyntaxError, ValueError):
+        return ""
+    variables: Dict[str, str] = _get_ast_module_string_variables(module)
+    call: ast.Call
+    for call in _iter_setup_py_setup_calls(module):
+        keyword: ast.keyword
+        for keyword in call.keywords:
+            if keyword.arg == key:
+                if isinstance(keyword.value, ast.Name):
+                    return variables.get(keyword.value.id, "")
+                return _get_ast_string(keyword.value) or ""
+    return ""
+
+
 def _get_setup_py_metadata(path: str, args: Tuple[str, ...]) -> str:
     """
     Execute a setup.py script with `args` and return the response.
@@ -421,75 +1147,174 @@ def _get_setup_py_metadata(path: str, args: Tuple[str, ...]) -> str:
     - args ([str])
     """
     value: str = ""
-    current_directory: str = os.path.abspath(os.curdir)
+    path = os.path.abspath(path)
     directory: str = path
-    try:
-        if os.path.basename(path).lower() == "setup.py":
+    if os.path.basename(path).lower() == "setup.py":
+        directory = os.path.dirname(path)
+    else:
+        if not os.path.isdir(path):
             directory = os.path.dirname(path)
-            os.chdir(directory)
-        else:
-            if not os.path.isdir(path):
-                directory = os.path.dirname(path)
-            os.chdir(directory)
-            path = os.path.join(directory, "setup.py")
-        if os.path.isfile(path):
-            command: Tuple[str, ...] = (sys.executable, path) + args
+        path = os.path.join(directory, "setup.py")
+    if os.path.isfile(path):
+        command: Tuple[str, ...] = (sys.executable, path) + args
+        try:
+            value = (
+                check_output(
+                    command,
+                    encoding="utf-8",
+                    universal_newlines=True,
+                    cwd=directory,
+                )
+                .strip()
+                .split("\n")[-1]
+            )
+        except CalledProcessError:
+            warn(
+                f"A package name could not be found in {path}, "
+                "attempting to refresh egg info"
+                f"\nError ignored: {get_exception_text()}"
+            )
+            # re-write egg info and attempt to get the name again
+            setup_egg_info(directory)
             try:
                 value = (
                     check_output(
-                        command, encoding="utf-8", universal_newlines=True
+                        command,
+                        encoding="utf-8",
+                        universal_newlines=True,
+                        cwd=directory,
                     )
                     .strip()
                     .split("\n")[-1]
                 )
-            except CalledProcessError:
+            except Exception:
                 warn(
-                    f"A package name could not be found in {path}, "
-                    "attempting to refresh egg info"
+                    f"A package name could not be found in {path}"
                     f"\nError ignored: {get_exception_text()}"
                 )
-                # re-write egg info and attempt to get the name again
-                setup_egg_info(directory)
-                try:
-                    value = (
-                        check_output(
-                            command, encoding="utf-8", universal_newlines=True
-                        )
-                        .strip()
-                        .split("\n")[-1]
-                    )
-                except Exception:
-                    warn(
-                        f"A package name could not be found in {path}"
-                        f"\nError ignored: {get_exception_text()}"
-                    )
-    finally:
-        os.chdir(current_directory)
     return value
 
 
-def get_setup_distribution_name(path: str) -> str:
+def _get_static_metadata(path: str, key: str) -> str:
     """
-    Get a distribution's name from setup.py or setup.cfg
+    Get a metadata value from setup.cfg, pyproject.toml or setup.py without
+    executing any code. If the value cannot be determined statically, an
+    empty string is returned.
     """
-    return normalize_name(
-        _get_setup_cfg_metadata(path, "name")
-        or _get_setup_py_metadata(path, ("--name",))
+    value: str = _get_setup_cfg_metadata(path, key)
+    # Directives such as "attr: package.__version__" require evaluation
+    if value.startswith(("attr:", "file:")):
+        value = ""
+    return (
+        value
+        or _get_pyproject_toml_metadata(path, key)
+        or _get_setup_py_static_metadata(path, key)
     )
 
 
-def get_setup_distribution_version(path: str) -> str:
+def _read_static_setup_metadata(
+    directory: str, fingerprint: List[List[Any]]
+) -> Dict[str, str]:
     """
-    Get a distribution's version from setup.py or setup.cfg
+    Read statically determined metadata values for the project in
+    `directory` from the user's cache directory, if they were cached when
+    the project's setup files matched `fingerprint`
     """
-    return _get_setup_cfg_metadata(path, "version") or _get_setup_py_metadata(
-        path, ("--version",)
+    data: Dict[str, Any] = read_cache(
+        "setup-metadata", directory, _SETUP_METADATA_VERSION
+    )
+    return (
+        data.get("values", {})
+        if data.get("fingerprint") == fingerprint
+        else {}
     )
 
 
-def _setup(arguments: Tuple[str, ...]) -> None:
+def _get_setup_metadata(path: str, key: str, cache: bool = True) -> str:
+    """
+    Get a metadata value for the project at `path`, using cached values
+    when none of the project's setup files have been modified since the value
+    was cached. Values are cached in-memory and, if they were determined
+    statically (without executing setup.py), in the user's cache directory,
+    so they can be re-used by subsequent commands. Values retrieved by
+    executing setup.py may be derived from other sources (such as version
+    control tags), so are not cached across commands.
+    """
+    path = os.path.abspath(path)
+    directory: str = path if os.path.isdir(path) else os.path.dirname(path)
+    if not cache:
+        return _get_static_metadata(directory, key) or _get_setup_py_metadata(
+            directory, (f"--{key}",)
+        )
+    fingerprint: List[List[Any]] = _get_setup_files_fingerprint(directory)
+    cached_fingerprint: List[List[Any]]
+    values: Dict[str, str]
+    cached_fingerprint, values = _setup_metadata.get(directory, ([], {}))
+    if cached_fingerprint != fingerprint:
+        values = dict(_read_static_setup_metadata(directory, fingerprint))
+        _setup_metadata[directory] = (fingerprint, values)
+    if key not in values:
+        value: str = _get_static_metadata(directory, key)
+        if value:
+            static_values: Dict[str, str] = _read_static_setup_metadata(
+                directory, fingerprint
+            )
+            static_values[key] = value
+            write_cache(
+                "setup-metadata",
+                directory,
+                _SETUP_METADATA_VERSION,
+                {"fingerprint": fingerprint, "values": static_values},
+            )
+        else:
+            value = _get_setup_py_metadata(directory, (f"--{key}",))
+            if not value:
+                return value
+        values[key] = value
+    return values[key]
+
+
+def get_setup_distribution_name(path: str, cache: bool = True) -> str:
+    """
+    Get a distribution's name from setup.cfg, pyproject.toml or setup.py (a
+    setup.py script is only executed if the name cannot be determined
+    statically).
+
+    Parameters:
+
+    - path (str): A project directory, or the path to a file in that
+      directory
+    - cache (bool) = True: If `True`, a previously retrieved name is returned
+      if none of the project's setup files have changed since it was
+      retrieved
+    """
+    return normalize_name(_get_setup_metadata(path, "name", cache=cache))
+
+
+def get_setup_distribution_version(path: str, cache: bool = True) -> str:
+    """
+    Get a distribution's version from setup.cfg, pyproject.toml or setup.py
+    (a setup.py script is only executed if the version cannot be determined
+    statically).
+
+    Parameters:
+
+    - path (str): A project directory, or the path to a file in that
+      directory
+    - cache (bool) = True: If `True`, a previously retrieved version is
+      returned if none of the project's setup files have changed since it was
+      retrieved. Versions computed dynamically by setup.py from other sources
+      (such as version control tags) should not be cached.
+    """
+    return _get_setup_metadata(path, "version", cache=cache)
+
+
+def _setup(location: Path, arguments: Tuple[str, ...]) -> None:
     try:
-        check_output((sys.executable, "setup.py") + arguments)
+        # Each setup script is executed in its own working directory (rather
+        # than changing the working directory of the current process), so
+        # that scripts for different projects can be executed concurrently
+        check_output((sys.executable, "setup.py") + arguments, cwd=location)
     except CalledProcessError:
         warn(f"Ignoring error: {get_exception_text()}")
 
@@ -504,12 +1329,9 @@ def _setup_location(
         return
     if isinstance(arguments, str):
         arguments = (arguments,)
-    current_directory: Path = Path(os.curdir).absolute()
-    os.chdir(location)
-    try:
-        deque(map(_setup, arguments), maxlen=0)
-    finally:
-        os.chdir(current_directory)
+    argument: Tuple[str, ...]
+    for argument in arguments:
+        _setup(location, argument)
 
 
 def setup_dist_egg_info(directory: str) -> None:
@@ -577,41 +1399,12 @@ def setup_egg_info(directory: Union[str, Path], egg_base: str = "") -> None:
     )
 
 
-def _get_pkg_requirement(
-    requirement_string: str,
-) -> pkg_resources.Requirement:
-    requirement: Union[
-        Requirement, pkg_resources.Requirement
-    ] = _get_requirement(requirement_string, pkg_resources.Requirement.parse)
-    assert isinstance(requirement, pkg_resources.Requirement)
-    return requirement
-
-
 def get_requirement(
     requirement_string: str,
 ) -> Requirement:
-    requirement: Union[
-        Requirement, pkg_resources.Requirement
-    ] = _get_requirement(requirement_string, Requirement)
-    assert isinstance(requirement, Requirement)
-    return requirement
-
-
-def _get_requirement(
-    requirement_string: str,
-    constructor: Callable[
-        [str], Union[Requirement, pkg_resources.Requirement]
-    ],
-) -> Union[Requirement, pkg_resources.Requirement]:
     try:
-        return constructor(requirement_string)
-    except (
-        InvalidRequirement,
-        getattr(
-            pkg_resources, "extern"
-        ).packaging.requirements.InvalidRequirement,
-        getattr(pkg_resources, "RequirementParseError"),
-    ):
+        return parse_requirement(requirement_string)
+    except InvalidRequirement:
         # Try to parse the requirement as an installation target location,
         # such as can be used with `pip install`
         location: str = requirement_string
@@ -623,7 +1416,128 @@ def _get_requirement(
         location = os.path.abspath(location)
         name: str = get_setup_distribution_name(location)
         assert name, f"No distribution found in {location}"
-        return constructor(f"{name}{extras}")
+        return Requirement(f"{name}{extras}")
+
+
+def get_requirement_node(
+    requirement: Requirement,
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Return the requirement graph node for a requirement: a tuple comprised
+    of the normalized distribution name and the (sorted, normalized) names
+    of requested extras.
+    """
+    return (
+        get_requirement_distribution_name(requirement),
+        tuple(sorted(set(map(normalize_name, requirement.extras)))),
+    )
+
+
+class RequirementGraph:
+    """
+    A directed graph of the requirements of installed distributions.
+
+    Nodes are `(name, extras)` tuples (see `get_requirement_node`), and the
+    edges of a node are the requirements (including markers) of that
+    distribution when installed with those extras. Edges and transitive
+    closures are computed on demand, using an iterative worklist, and
+    memoized for the lifetime of the graph. A graph reflects a single state
+    of the environment, and is discarded (by `refresh_working_set`) whenever
+    distribution information is refreshed.
+    """
+
+    def __init__(self) -> None:
+        self._edges: Dict[
+            Tuple[str, Tuple[str, ...]], Tuple[Requirement, ...]
+        ] = {}
+        self._closures: Dict[
+            Tuple[str, Tuple[str, ...]], FrozenSet[Tuple[str, Tuple[str, ...]]]
+        ] = {}
+
+    def get_edges(
+        self, node: Tuple[str, Tuple[str, ...]]
+    ) -> Tuple[Requirement, ...]:
+        """
+        Return the requirements of the distribution identified by `node`, or
+        an empty tuple if the distribution is not installed.
+        """
+        edges: Optional[Tuple[Requirement, ...]] = self._edges.get(node)
+        if edges is None:
+            distribution: Optional[
+                IndexedDistribution
+            ] = get_installed_distributions().get(node[0])
+            if distribution is None:
+                # Missing distributions are not memoized, since they may be
+                # installed later
+                return ()
+            edges = tuple(distribution.requires(extras=node[1]))
+            self._edges[node] = edges
+        return edges
+
+    def get_requirements(
+        self, requirement: Requirement, echo: bool = False
+    ) -> Tuple[Requirement, ...]:
+        """
+        Return the direct requirements of `requirement`, installing the
+        required distribution if it is missing.
+        """
+        node: Tuple[str, Tuple[str, ...]] = get_requirement_node(requirement)
+        if _get_requirement_distribution(requirement, node[0], echo=echo):
+            return self.get_edges(node)
+        return ()
+
+    def get_closure(
+        self,
+        requirement: Requirement,
+        exclude: AbstractSet[str] = frozenset(),
+        echo: bool = False,
+    ) -> FrozenSet[Tuple[str, Tuple[str, ...]]]:
+        """
+        Return all nodes reachable from `requirement` (including the node for
+        `requirement` itself), installing missing distributions as they are
+        encountered.
+
+        Parameters:
+
+        - requirement (packaging.requirements.Requirement)
+        - exclude ({str}): Normalized names of distributions to exclude.
+          Traversal halts at excluded distributions, so closures are only
+          memoized when nothing is excluded.
+        - echo (bool) = False: If `True`, commands and responses executed in
+          subprocesses will be printed to `sys.stdout`
+        """
+        root: Tuple[str, Tuple[str, ...]] = get_requirement_node(requirement)
+        memoize: bool = not exclude
+        if memoize and root in self._closures:
+            return self._closures[root]
+        closure: Set[Tuple[str, Tuple[str, ...]]] = set()
+        stack: List[Requirement] = [requirement]
+        while stack:
+            requirement = stack.pop()
+            node: Tuple[str, Tuple[str, ...]] = get_requirement_node(
+                requirement
+            )
+            if (node in closure) or (node[0] in exclude):
+                continue
+            closure.add(node)
+            if memoize and node in self._closures:
+                # Sibling subtrees which have already been resolved are
+                # not walked again
+                closure |= self._closures[node]
+            else:
+                stack.extend(self.get_requirements(requirement, echo=echo))
+        result: FrozenSet[Tuple[str, Tuple[str, ...]]] = frozenset(closure)
+        if memoize:
+            self._closures[root] = result
+        return result
+
+
+@lru_cache()
+def get_requirement_graph() -> RequirementGraph:
+    """
+    Return the requirement graph for the current environment.
+    """
+    return RequirementGraph()
 
 
 def get_required_distribution_names(
@@ -631,6 +1545,7 @@ def get_required_distribution_names(
     exclude: Iterable[str] = (),
     recursive: bool = True,
     echo: bool = False,
+    batch_install: bool = False,
 ) -> Set[str]:
     """
     Return a `set` of all distribution names which are required by the
@@ -647,27 +1562,43 @@ def get_required_distribution_names(
       be obtained recursively.
     - echo (bool) = False: If `True`, commands and responses executed in
       subprocesses will be printed to `sys.stdout`
+    - batch_install (bool) = False: If `True`, all missing required
+      distributions are installed using a single `pip install` command
+      before requirements are looked up, rather than being installed one at a
+      time as they are encountered
     """
     if isinstance(exclude, str):
         exclude = {normalize_name(exclude)}
     else:
         exclude = set(map(normalize_name, exclude))
-    return set(
-        _iter_requirement_names(
-            _get_pkg_requirement(requirement_string),
-            exclude=exclude,
-            recursive=recursive,
-            echo=echo,
+    requirement: Requirement = get_requirement(requirement_string)
+    name: str = get_requirement_distribution_name(requirement)
+    if name in exclude:
+        return set()
+    if batch_install:
+        install_missing_requirements((requirement,), exclude, echo=echo)
+    graph: RequirementGraph = get_requirement_graph()
+    names: Set[str]
+    if recursive:
+        names = {
+            node[0] for node in graph.get_closure(requirement, exclude, echo)
+        }
+    else:
+        names = (
+            set(
+                map(
+                    get_requirement_distribution_name,
+                    graph.get_requirements(requirement, echo=echo),
+                )
+            )
+            - exclude
         )
-    )
-
-
-def _get_pkg_requirement_name(requirement: pkg_resources.Requirement) -> str:
-    return normalize_name(requirement.project_name)
+    names.discard(name)
+    return names
 
 
 def install_requirement(
-    requirement: Union[str, Requirement, pkg_resources.Requirement],
+    requirement: Union[str, Requirement],
     echo: bool = True,
 ) -> None:
     """
@@ -675,12 +1606,14 @@ def install_requirement(
 
     Parameters:
 
-    - requirement (str)
+    - requirement (str|packaging.requirements.Requirement): Other requirement
+      types (such as `pkg_resources.Requirement`) are converted using their
+      string representation
     - echo (bool) = True: If `True` (default), the `pip install`
       commands will be echoed to `sys.stdout`
     """
-    if isinstance(requirement, str):
-        requirement = Requirement(requirement)
+    if not isinstance(requirement, Requirement):
+        requirement = Requirement(str(requirement))
     return _install_requirement(requirement, echo=echo)
 
 
@@ -699,7 +1632,7 @@ def _install_requirement_string(
             run(
                 (
                     (
-                        sys.executable,
+                        get_python_executable(),
                         "-m",
                         "pip",
                         "install",
@@ -732,17 +1665,13 @@ def _install_requirement_string(
 
 
 def _install_requirement(
-    requirement: Union[Requirement, pkg_resources.Requirement],
+    requirement: Requirement,
     echo: bool = True,
 ) -> None:
     requirement_string: str = str(requirement)
     # Get the distribution name
-    name: str = normalize_name(
-        requirement.name
-        if isinstance(requirement, Requirement)
-        else requirement.project_name
-    )
-    distribution: Optional[pkg_resources.Distribution] = None
+    name: str = normalize_name(requirement.name)
+    distribution: Optional[IndexedDistribution] = None
     editable_location: str = ""
     try:
         distribution = get_distribution(name)
@@ -770,12 +1699,167 @@ def _install_requirement(
     refresh_working_set()
 
 
-def _get_pkg_requirement_distribution(
-    requirement: pkg_resources.Requirement,
+def _get_install_requirement_string(requirement: Requirement) -> str:
+    # Markers have already been evaluated while walking the dependency
+    # graph (and `extra` markers would otherwise never match), so only the
+    # name, extras, specifier and URL are passed to pip
+    requirement_string: str = requirement.name
+    if requirement.extras:
+        requirement_string += f"[{','.join(sorted(requirement.extras))}]"
+    if requirement.url:
+        return f"{requirement_string} @ {requirement.url}"
+    return f"{requirement_string}{requirement.specifier}"
+
+
+def install_requirements(
+    requirements: Iterable[Union[str, Requirement]],
+    echo: bool = True,
+) -> None:
+    """
+    Install one or more requirements using a single `pip install` command,
+    then refresh distribution metadata once.
+
+    Parameters:
+
+    - requirements ([str|Requirement])
+    - echo (bool) = True: If `True` (default), the `pip install`
+      command will be echoed to `sys.stdout`
+    """
+    if isinstance(requirements, (str, Requirement)):
+        requirements = (requirements,)
+    requirement_strings: Tuple[str, ...] = tuple(
+        unique_everseen(
+            _get_install_requirement_string(
+                Requirement(requirement)
+                if isinstance(requirement, str)
+                else requirement
+            )
+            for requirement in requirements
+        )
+    )
+    if not requirement_strings:
+        return
+    try:
+        run(
+            (
+                get_python_executable(),
+                "-m",
+                "pip",
+                "install",
+                "--no-deps",
+                "--no-compile",
+                "--no-build-isolation",
+            )
+            + requirement_strings,
+            echo=echo,
+        )
+    except CalledProcessError as error:
+        append_exception_text(
+            error, f"\nCould not install {', '.join(requirement_strings)}"
+        )
+        raise error
+    # Refresh the metadata
+    refresh_working_set()
+
+
+def _iter_missing_requirements(
+    requirements: Iterable[Requirement],
+    exclude: Set[str],
+) -> Iterable[Requirement]:
+    """
+    Yield one requirement for each distribution reachable from
+    `requirements` which is not currently installed. The requirements of
+    missing distributions cannot be known until they are installed, so
+    traversal stops at each missing distribution.
+    """
+    installed: Mapping[
+        str, IndexedDistribution
+    ] = get_installed_distributions()
+    graph: RequirementGraph = get_requirement_graph()
+    visited: Set[Tuple[str, Tuple[str, ...]]] = set()
+    missing: Set[str] = set()
+    stack: List[Requirement] = list(requirements)
+    while stack:
+        requirement: Requirement = stack.pop()
+        node: Tuple[str, Tuple[str, ...]] = get_requirement_node(requirement)
+        name: str = node[0]
+        if (
+            (name in exclude)
+            or (name in _BUILTIN_DISTRIBUTION_NAMES)
+            or (node in visited)
+        ):
+            continue
+        visited.add(node)
+        if name in installed:
+            stack.extend(graph.get_edges(node))
+        elif name not in missing:
+            missing.add(name)
+            yield requirement
+
+
+def install_missing_requirements(
+    requirements: Iterable[Union[str, Requirement]],
+    exclude: Iterable[str] = (),
+    echo: bool = False,
+) -> None:
+    """
+    Find every distribution required (recursively) by `requirements` which
+    is not installed, and install all of them using a single `pip install`
+    command. Because the requirements of newly installed distributions may
+    themselves be missing, this is repeated until no installable
+    requirements remain missing.
+
+    Parameters:
+
+    - requirements ([str|Requirement]): One or more requirement strings or
+      requirements.
+    - exclude ([str]): The name of one or more distributions to *exclude*.
+      Excluding a distribution also halts traversal of its requirements.
+    - echo (bool) = False: If `True`, the `pip install` commands will be
+      echoed to `sys.stdout`
+    """
+    if not get_python_executable():
+        # Missing distributions cannot be installed in a target environment
+        # without its interpreter
+        return
+    if isinstance(requirements, (str, Requirement)):
+        requirements = (requirements,)
+    if isinstance(exclude, str):
+        exclude = (exclude,)
+    exclude_names: Set[str] = set(map(normalize_name, exclude))
+    root_requirements: Tuple[Requirement, ...] = tuple(
+        get_requirement(requirement)
+        if isinstance(requirement, str)
+        else requirement
+        for requirement in requirements
+    )
+    attempted: Set[str] = set()
+    while True:
+        missing: List[Requirement] = [
+            requirement
+            for requirement in _iter_missing_requirements(
+                root_requirements, exclude_names
+            )
+            if get_requirement_distribution_name(requirement) not in attempted
+        ]
+        if not missing:
+            break
+        attempted |= set(map(get_requirement_distribution_name, missing))
+        if echo:
+            warn(
+                "The following required distributions were not installed, "
+                "attempting to install them now: "
+                f"{', '.join(sorted(map(str, missing)))}"
+            )
+        install_requirements(missing, echo=echo)
+
+
+def _get_requirement_distribution(
+    requirement: Requirement,
     name: str,
     reinstall: bool = True,
     echo: bool = False,
-) -> Optional[pkg_resources.Distribution]:
+) -> Optional[IndexedDistribution]:
     if name in _BUILTIN_DISTRIBUTION_NAMES:
         return None
     try:
@@ -783,6 +1867,14 @@ def _get_pkg_requirement_distribution(
     except KeyError:
         if not reinstall:
             raise
+        if not get_python_executable():
+            # Without an interpreter for the target environment, missing
+            # distributions cannot be installed
+            warn(
+                f'The required distribution "{name}" is not installed in '
+                "the target environment"
+            )
+            return None
         if echo:
             warn(
                 f'The required distribution "{name}" was not installed, '
@@ -790,69 +1882,22 @@ def _get_pkg_requirement_distribution(
             )
         # Attempt to install the requirement...
         install_requirement(requirement, echo=echo)
-        return _get_pkg_requirement_distribution(
+        return _get_requirement_distribution(
             requirement, name, reinstall=False, echo=echo
         )
 
 
-def _iter_requirement_names(
-    requirement: pkg_resources.Requirement,
-    exclude: Set[str],
-    recursive: bool = True,
-    echo: bool = False,
-) -> Iterable[str]:
-    name: str = normalize_name(requirement.project_name)
-    extras: Set[str] = set(map(normalize_name, requirement.extras))
-    if name in exclude:
-        return ()
-    # Ensure we don't follow the same requirement again, causing cyclic
-    # recursion
-    exclude.add(name)
-    distribution: Optional[
-        pkg_resources.Distribution
-    ] = _get_pkg_requirement_distribution(requirement, name, echo=echo)
-    if distribution is None:
-        return ()
-    requirements: List[pkg_resources.Requirement] = distribution.requires(
-        extras=tuple(sorted(extras))
-    )
-    lateral_exclude: Set[str] = set()
-
-    def iter_requirement_names_(
-        requirement_: pkg_resources.Requirement,
-    ) -> Iterable[str]:
-        return _iter_requirement_names(
-            requirement_,
-            exclude=(
-                exclude
-                | (lateral_exclude - {_get_pkg_requirement_name(requirement_)})
-            ),
-            recursive=recursive,
-            echo=echo,
-        )
-
-    def not_excluded(name: str) -> bool:
-        if name not in exclude:
-            # Add this to the exclusions
-            lateral_exclude.add(name)
-            return True
-        return False
-
-    if recursive:
-        requirement_names = chain(
-            filter(not_excluded, map(_get_pkg_requirement_name, requirements)),
-            *map(iter_requirement_names_, requirements),
-        )
-    return requirement_names
-
-
 def _iter_requirement_strings_required_distribution_names(
     requirement_strings: Iterable[str],
     echo: bool = False,
+    batch_install: bool = False,
 ) -> Iterable[str]:
     visited_requirement_strings: Set[str] = set()
     if isinstance(requirement_strings, str):
         requirement_strings = (requirement_strings,)
+    if batch_install:
+        requirement_strings = tuple(requirement_strings)
+        install_missing_requirements(requirement_strings, echo=echo)
 
     def get_required_distribution_names_(requirement_string: str) -> Set[str]:
         if requirement_string not in visited_requirement_strings:
@@ -876,6 +1921,7 @@ def _iter_requirement_strings_required_distribution_names(
 def get_requirements_required_distribution_names(
     requirements: Iterable[str] = (),
     echo: bool = False,
+    batch_install: bool = False,
 ) -> Set[str]:
     """
     Get the distributions required by one or more specified distributions or
@@ -886,6 +1932,10 @@ def get_requirements_required_distribution_names(
     - requirements ([str]): One or more requirement specifiers (for example:
       "requirement-name[extra-a,extra-b]" or ".[extra-a, extra-b]) and/or paths
       to a setup.cfg, pyproject.toml, tox.ini or requirements.txt file
+    - echo (bool) = False: If `True`, commands and responses executed in
+      subprocesses will be printed to `sys.stdout`
+    - batch_install (bool) = False: If `True`, all missing required
+      distributions are installed using a single `pip install` command
     """
     # Separate requirement strings from requirement files
     if isinstance(requirements, str):
@@ -910,6 +1960,7 @@ def get_requirements_required_distribution_names(
                     )
                 ),
                 echo=echo,
+                batch_install=batch_install,
             ),
             key=lambda name: name.lower(),
         )
@@ -917,11 +1968,13 @@ def get_requirements_required_distribution_names(
 
 
 def iter_distribution_location_file_paths(location: str) -> Iterable[str]:
+    import importlib_metadata
+
     location = os.path.abspath(location)
     name: str = get_setup_distribution_name(location)
     setup_egg_info(location)
     metadata_path: str = os.path.join(
-        location, f"{pkg_resources.to_filename(name)}.egg-info"
+        location, f"{_to_filename(name)}.egg-info"
     )
     distribution: importlib_metadata.Distribution = (
         importlib_metadata.Distribution.at(metadata_path)
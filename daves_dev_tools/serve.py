@@ -0,0 +1,412 @@
+"""
+This module provides an opt-in daemon which keeps the distribution index and
+requirement graph in memory, so that commands which inspect the current
+environment can be answered without re-reading distribution metadata.
+
+The daemon listens on a Unix socket. When the socket exists, the
+`requirements`, `install-editable` and `uninstall-all` commands send their
+arguments, working directory and environment variables to the daemon, which
+runs the command in-process and returns its output (including that of any
+sub-processes, such as `pip`) and exit status. Before each command, the
+daemon discards information cached for paths in prior commands, and
+compares a fingerprint of the environment's distribution paths and editable
+projects' setup files with that seen previously, discarding cached
+distribution information if anything has changed.
+
+Forwarding can be disabled by setting the `DAVES_DEV_TOOLS_NO_DAEMON`
+environment variable to a non-empty value.
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence
+from .utilities import get_cache_directory
+
+__all__: List[str] = ["get_socket_path", "request", "forward", "serve"]
+# Commands which are sent to the daemon when it is running
+SERVED_COMMANDS: Sequence[str] = (
+    "requirements",
+    "install_editable",
+    "uninstall_all",
+)
+
+
+def get_socket_path() -> str:
+    """
+    Return the path of the socket on which the daemon for the current
+    python executable listens. This is taken from the
+    `DAVES_DEV_TOOLS_SOCKET` environment variable if set, otherwise a socket
+    in the daves-dev-tools cache directory is used, named for a hash of
+    `sys.executable`.
+    """
+    path: str = os.environ.get("DAVES_DEV_TOOLS_SOCKET", "")
+    if not path:
+        import hashlib
+
+        path = os.path.join(
+            get_cache_directory("serve"),
+            hashlib.sha1(sys.executable.encode()).hexdigest()[:16] + ".sock",
+        )
+    return path
+
+
+def _get_environment() -> Dict[str, Any]:
+    # The first entry of `sys.path` depends on how python was invoked, and
+    # is not relevant to the distributions installed
+    return {"executable": sys.executable, "path": sys.path[1:]}
+
+
+def request(message: Dict[str, Any], socket_path: str = "") -> Dict[str, Any]:
+    """
+    Send a message to the daemon, and return its response.
+
+    Parameters:
+
+    - message ({str: typing.Any}): A JSON-serializable dictionary
+    - socket_path (str) = "": The daemon's socket (by default,
+      the path returned by `get_socket_path` is used)
+    """
+    with socket.socket(
+        socket.AF_UNIX, socket.SOCK_STREAM  # type: ignore
+    ) as client:
+        client.connect(socket_path or get_socket_path())
+        client.sendall(json.dumps(message).encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile("rb") as response_io:
+            return json.loads(response_io.read() or b"{}")
+
+
+def forward(arguments: Sequence[str], socket_path: str = "") -> Optional[int]:
+    """
+    Run a command using the daemon, if it is running and serves the current
+    python environment, writing the command's output to `sys.stdout` and
+    `sys.stderr`. The command's exit status is returned, or `None` if the
+    command was not run (in which case it should be run locally).
+
+    Parameters:
+
+    - arguments ([str]): Command line arguments (excluding the program name)
+    - socket_path (str) = "": The daemon's socket (by default,
+      the path returned by `get_socket_path` is used)
+    """
+    if os.environ.get("DAVES_DEV_TOOLS_NO_DAEMON") or not hasattr(
+        socket, "AF_UNIX"
+    ):
+        return None
+    socket_path = socket_path or get_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+    try:
+        response: Dict[str, Any] = request(
+            dict(
+                _get_environment(),
+                arguments=list(arguments),
+                directory=os.getcwd(),
+                environment=dict(os.environ),
+            ),
+            socket_path,
+        )
+    except (OSError, ValueError):
+        # The daemon is not running, or did not respond
+        return None
+    if not response.get("served"):
+        return None
+    sys.stdout.write(response["stdout"])
+    sys.stdout.flush()
+    sys.stderr.write(response["stderr"])
+    sys.stderr.flush()
+    return response["status"]
+
+
+def _get_exit_status(error: SystemExit) -> int:
+    if error.code is None:
+        return 0
+    if isinstance(error.code, int):
+        return error.code
+    print(error.code, file=sys.stderr)
+    return 1
+
+
+@contextmanager
+def _capture(file_descriptor: int) -> Iterator[IO[bytes]]:
+    """
+    Redirect a file descriptor to a temporary file for the duration of the
+    context, so that output written by sub-processes is captured
+    """
+    from tempfile import TemporaryFile
+
+    with TemporaryFile() as capture_io:
+        saved_file_descriptor: int = os.dup(file_descriptor)
+        os.dup2(capture_io.fileno(), file_descriptor)
+        try:
+            yield capture_io
+        finally:
+            os.dup2(saved_file_descriptor, file_descriptor)
+            os.close(saved_file_descriptor)
+
+
+@contextmanager
+def _redirect_output() -> Iterator[Dict[str, str]]:
+    """
+    Capture everything written to stdout and stderr, both by this process
+    and by sub-processes, and store the output in the yielded dictionary
+    (under the keys "stdout" and "stderr") when the context exits
+    """
+    output: Dict[str, str] = {}
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with _capture(1) as stdout_capture_io, _capture(2) as stderr_capture_io:
+        # Python output is written directly to the capture files (line by
+        # line), so that it is interleaved with sub-process output in order
+        with open(
+            stdout_capture_io.fileno(), "w", buffering=1, closefd=False
+        ) as stdout_io, open(
+            stderr_capture_io.fileno(), "w", buffering=1, closefd=False
+        ) as stderr_io:
+            try:
+                with redirect_stdout(stdout_io), redirect_stderr(stderr_io):
+                    yield output
+            finally:
+                stdout_io.flush()
+                stderr_io.flush()
+                capture_io: IO[bytes]
+                for name, capture_io in (
+                    ("stdout", stdout_capture_io),
+                    ("stderr", stderr_capture_io),
+                ):
+                    capture_io.seek(0)
+                    output[name] = capture_io.read().decode(errors="replace")
+
+
+@contextmanager
+def _use_environment(environment: Optional[Dict[str, str]]) -> Iterator[None]:
+    """
+    Replace the environment variables of this process for the duration of
+    the context (if `environment` is not `None`)
+    """
+    if environment is None:
+        yield
+        return
+    prior_environment: Dict[str, str] = dict(os.environ)
+    os.environ.clear()
+    os.environ.update(environment)
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(prior_environment)
+
+
+def _run_command(arguments: Sequence[str], directory: str) -> Dict[str, Any]:
+    """
+    Run a command in this process, and return its output and exit status
+    """
+    import warnings
+    from .__main__ import main
+
+    argv: List[str] = sys.argv
+    current_directory: str = os.getcwd()
+    status: int = 0
+    output: Dict[str, str]
+    try:
+        os.chdir(directory)
+        sys.argv = ["daves-dev-tools"] + list(arguments)
+        with _redirect_output() as output:
+            # Reset the warnings filter so that warnings are shown for
+            # every command, not just the first to encounter them
+            with warnings.catch_warnings():
+                warnings.simplefilter("default")
+                try:
+                    main(forward=False)
+                except SystemExit as error:
+                    status = _get_exit_status(error)
+    finally:
+        sys.argv = argv
+        os.chdir(current_directory)
+    return dict(output, served=True, status=status)
+
+
+class _Daemon:
+    """
+    This class holds the state of the daemon between requests
+    """
+
+    def __init__(self) -> None:
+        self.fingerprint: List[List[Any]] = []
+        self.stopped: bool = False
+
+    def reset(self) -> None:
+        """
+        Restore the default environment settings (which commands may
+        change), discard information cached for paths (which may be relative
+        to a prior command's working directory), and discard cached
+        distribution information if the environment has changed since the
+        last command
+        """
+        from .requirements.utilities import (
+            clear_path_caches,
+            get_environment_fingerprint,
+            get_metadata_backend,
+            refresh_working_set,
+            set_metadata_backend,
+            set_refresh_editable_distributions,
+            set_target_environment,
+        )
+
+        set_refresh_editable_distributions(True)
+        set_target_environment()
+        clear_path_caches()
+        backend: str = (
+            os.environ.get("DAVES_DEV_TOOLS_METADATA_BACKEND", "").lower()
+            or "index"
+        )
+        if backend != get_metadata_backend():
+            set_metadata_backend(backend)
+        fingerprint: List[List[Any]] = get_environment_fingerprint()
+        if fingerprint != self.fingerprint:
+            refresh_working_set()
+            self.fingerprint = fingerprint
+
+    def respond(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        command: str = message.get("command", "")
+        if command == "ping":
+            return {"served": True}
+        if command == "stop":
+            self.stopped = True
+            return {"served": True}
+        if {
+            key: message.get(key) for key in ("executable", "path")
+        } != _get_environment():
+            # The client is using a different python environment
+            return {"served": False}
+        # Commands are run using the client's environment variables
+        with _use_environment(message.get("environment")):
+            self.reset()
+            return _run_command(message["arguments"], message["directory"])
+
+
+def _bind(socket_path: str, daemon: _Daemon) -> Any:
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            message: Dict[str, Any] = json.loads(self.rfile.readline())
+            self.wfile.write(
+                json.dumps(daemon.respond(message)).encode() + b"\n"
+            )
+
+    class Server(socketserver.UnixStreamServer):  # type: ignore
+        def handle_timeout(self) -> None:
+            daemon.stopped = True
+
+    # Only the current user may connect to the socket
+    umask: int = os.umask(0o177)
+    try:
+        server: Any = Server(socket_path, Handler)
+    finally:
+        os.umask(umask)
+    return server
+
+
+def serve(socket_path: str = "", timeout: float = 0) -> None:
+    """
+    Run the daemon until it is stopped (using `daves-dev-tools serve --stop`)
+    or, if a `timeout` is specified, until no command has been received for
+    `timeout` seconds.
+
+    Parameters:
+
+    - socket_path (str) = "": The socket on which to listen (by default,
+      the path returned by `get_socket_path` is used)
+    - timeout (float) = 0: The number of idle seconds after which the daemon
+      should exit (by default, the daemon runs until stopped)
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        raise NotImplementedError(
+            "`daves-dev-tools serve` requires Unix domain socket support"
+        )
+    from .requirements.utilities import get_installed_distributions
+
+    socket_path = socket_path or get_socket_path()
+    if os.path.exists(socket_path):
+        try:
+            request({"command": "ping"}, socket_path)
+        except OSError:
+            # Remove a socket left behind by a daemon which did not exit
+            # cleanly
+            os.remove(socket_path)
+        else:
+            raise RuntimeError(
+                f"A daemon is already listening on {socket_path}"
+            )
+    daemon: _Daemon = _Daemon()
+    server: Any = _bind(socket_path, daemon)
+    server.timeout = timeout or None
+    try:
+        # Read installed distributions before the first command is received
+        daemon.reset()
+        get_installed_distributions()
+        while not daemon.stopped:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="daves-dev-tools serve",
+        description=(
+            "This command runs a daemon which keeps installed distribution "
+            "information in memory, and to which the `requirements`, "
+            "`install-editable` and `uninstall-all` commands are sent "
+            "while it is running. Cached information is discarded "
+            "whenever distributions are installed or uninstalled, or the "
+            "setup files of an editable installation are modified. "
+            "Set the `DAVES_DEV_TOOLS_NO_DAEMON` environment variable to "
+            "run commands without the daemon."
+        ),
+    )
+    parser.add_argument(
+        "-s",
+        "--socket",
+        default="",
+        type=str,
+        help=(
+            "The path of the socket on which to listen. Clients use the "
+            "`DAVES_DEV_TOOLS_SOCKET` environment variable to locate the "
+            "socket, so this should match if specified (by default, a "
+            "socket in the daves-dev-tools cache directory is used, which "
+            "is specific to the current python executable)."
+        ),
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        default=0,
+        type=float,
+        help=(
+            "Exit after this many seconds without receiving a command "
+            "(by default, the daemon runs until stopped)"
+        ),
+    )
+    parser.add_argument(
+        "--stop",
+        default=False,
+        action="store_const",
+        const=True,
+        help="Stop a running daemon",
+    )
+    arguments: argparse.Namespace = parser.parse_args()
+    if arguments.stop:
+        request({"command": "stop"}, arguments.socket)
+    else:
+        serve(arguments.socket, timeout=arguments.timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 import argparse
-import sys
 from pipes import quote
 from itertools import chain
 from typing import Iterable, Tuple
 from .requirements.utilities import (
     get_installed_distributions,
+    get_python_executable,
     get_requirements_required_distribution_names,
+    set_refresh_editable_distributions,
+    set_target_environment,
 )
 from .utilities import run
 
@@ -37,7 +39,7 @@ def uninstall_all(exclude: Iterable[str] = (), dry_run: bool = False) -> None:
     )
     if uninstall_distribution_names:
         command: Tuple[str, ...] = (
-            sys.executable,
+            get_python_executable(),
             "-m",
             "pip",
             "uninstall",
@@ -86,7 +88,46 @@ def main() -> None:
             "which, absent this flag, would be executed"
         ),
     )
+    parser.add_argument(
+        "-nr",
+        "--no-refresh",
+        default=False,
+        action="store_const",
+        const=True,
+        help=(
+            "Don't regenerate stale metadata for editable installations "
+            "before reading installed distributions (for read-only use, "
+            "where the cost of checking for stale metadata isn't warranted)"
+        ),
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        type=int,
+        help=(
+            "The maximum number of editable installations for which "
+            "metadata may be regenerated concurrently (by default, the "
+            "number of CPUs is used)"
+        ),
+    )
+    parser.add_argument(
+        "-p",
+        "--python",
+        default="",
+        type=str,
+        help=(
+            "The python executable of an environment to operate on, instead "
+            "of the current environment. Distribution metadata is read "
+            "directly from the environment's site-packages directories "
+            "(the executable is only run for `pip` commands)."
+        ),
+    )
     arguments: argparse.Namespace = parser.parse_args()
+    set_refresh_editable_distributions(
+        not arguments.no_refresh, jobs=arguments.jobs
+    )
+    set_target_environment(arguments.python)
     uninstall_all(exclude=arguments.exclude, dry_run=arguments.dry_run)
 
 
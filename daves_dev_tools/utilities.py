@@ -1,5 +1,4 @@
 import functools
-import runpy
 from shutil import which
 import sys
 import os
@@ -10,6 +9,7 @@ from urllib.parse import urlparse, urlunparse, ParseResult, quote as _quote
 from typing import (
     Any,
     Callable,
+    Dict,
     List,
     Iterable,
     Sequence,
@@ -29,6 +29,9 @@ __all__: List[str] = [
     "iter_sys_argv_get",
     "sys_argv_get",
     "update_url_user_password",
+    "get_cache_directory",
+    "read_cache",
+    "write_cache",
 ]
 lru_cache: Callable[..., Any] = functools.lru_cache
 
@@ -163,6 +166,8 @@ def run_module_as_main(
     - echo (bool) = False: If `True`, an equivalent shell command is printed
       to sys.stdout.
     """
+    import runpy
+
     prior_sys_exit: Callable[[Union[str, int, None]], NoReturn] = sys.exit
     prior_sys_argv: List[str] = sys.argv
     if not isinstance(arguments, list):
@@ -186,6 +191,142 @@ def run_module_as_main(
         sys.argv = prior_sys_argv
 
 
+def get_cache_directory(*names: str) -> str:
+    """
+    Return the path of a directory in which daves-dev-tools can persist
+    cached data between invocations, creating it if it does not exist.
+
+    The cache root is taken from the `DAVES_DEV_TOOLS_CACHE_DIRECTORY`
+    environment variable if set, otherwise from `LOCALAPPDATA` (on Windows) or
+    `XDG_CACHE_HOME`, falling back to "~/.cache". Persistent caching can be
+    disabled altogether by setting the `DAVES_DEV_TOOLS_NO_CACHE` environment
+    variable to a non-empty value.
+
+    Parameters:
+
+    - names ([str]): Zero or more sub-directory names
+    """
+    root: str = os.environ.get("DAVES_DEV_TOOLS_CACHE_DIRECTORY", "")
+    if not root:
+        root = os.path.join(
+            os.environ.get(
+                "LOCALAPPDATA" if os.name == "nt" else "XDG_CACHE_HOME", ""
+            )
+            or os.path.join(os.path.expanduser("~"), ".cache"),
+            "daves-dev-tools",
+        )
+    directory: str = os.path.join(root, *names)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _get_cache_path(namespace: str, key: str) -> str:
+    # Imported here to keep start-up time low for commands which don't use
+    # caches
+    import hashlib
+
+    return os.path.join(
+        get_cache_directory(namespace),
+        f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json",
+    )
+
+
+def read_cache(namespace: str, key: str, version: int) -> Dict[str, Any]:
+    """
+    Read data persisted by `write_cache`, returning an empty dictionary if
+    no cache exists for `key`, if it cannot be read, or if it was written
+    using a different `version` of the cache format.
+
+    Parameters:
+
+    - namespace (str): The name of the cache (and the directory in which it
+      is stored)
+    - key (str): A unique identifier for the cached data within `namespace`,
+      such as an absolute path
+    - version (int): The version of the cached data format
+    """
+    import json
+
+    data: Dict[str, Any] = {}
+    if os.environ.get("DAVES_DEV_TOOLS_NO_CACHE"):
+        return data
+    try:
+        with open(_get_cache_path(namespace, key)) as cache_io:
+            data = json.load(cache_io)
+    except (OSError, ValueError):
+        return {}
+    if not (
+        isinstance(data, dict)
+        and data.get("version") == version
+        and data.get("key") == key
+    ):
+        return {}
+    return data.get("data") or {}
+
+
+def write_cache(
+    namespace: str, key: str, version: int, data: Dict[str, Any]
+) -> None:
+    """
+    Atomically persist `data` (which must be JSON-serializable) for retrieval
+    by `read_cache`. Errors are ignored, as caches are only an optimization.
+
+    Parameters:
+
+    - namespace (str): The name of the cache (and the directory in which it
+      is stored)
+    - key (str): A unique identifier for the cached data within `namespace`,
+      such as an absolute path
+    - version (int): The version of the cached data format
+    - data ({str: Any})
+    """
+    import json
+
+    if os.environ.get("DAVES_DEV_TOOLS_NO_CACHE"):
+        return
+    try:
+        write_text_atomically(
+            _get_cache_path(namespace, key),
+            json.dumps({"version": version, "key": key, "data": data}),
+        )
+    except OSError:
+        pass
+
+
+def write_text_atomically(path: str, text: str) -> None:
+    """
+    Write `text` to a temporary file in the same directory as `path`, then
+    move it into place, so that readers never see a partially written file.
+    If `path` already exists, its permissions are preserved, and if it is a
+    symbolic link, the file it links to is replaced (rather than the link).
+    Line endings are written as-is, without translation.
+
+    Parameters:
+
+    - path (str)
+    - text (str)
+    """
+    from tempfile import mkstemp
+
+    path = os.path.realpath(path)
+    file_descriptor: int
+    temp_path: str
+    file_descriptor, temp_path = mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w", newline="") as text_io:
+            text_io.write(text)
+        try:
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
 def _validate_key(key: str) -> None:
     if not key.startswith("-"):
         raise ValueError(
@@ -0,0 +1,106 @@
+"""
+Compare the cold-start time of each installed-distribution metadata backend.
+
+Each measurement runs a new python process which imports
+`daves_dev_tools.requirements.utilities` (or `pkg_resources`, for reference)
+and looks up an installed distribution, so interpreter start-up and import
+time are included.
+
+Usage:
+
+    python tests/benchmark_metadata_backends.py [-r REPEAT]
+"""
+import argparse
+import os
+import sys
+from shutil import rmtree
+from statistics import median
+from subprocess import check_call
+from tempfile import mkdtemp
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+_PKG_RESOURCES_SCRIPT: str = (
+    "import pkg_resources\n" "pkg_resources.get_distribution('pip')\n"
+)
+_BACKEND_SCRIPT: str = (
+    "from daves_dev_tools.requirements.utilities import (\n"
+    "    get_distribution, set_refresh_editable_distributions\n"
+    ")\n"
+    "set_refresh_editable_distributions(False)\n"
+    "get_distribution('pip')\n"
+)
+
+
+def _time_script(script: str, environment: Dict[str, str]) -> float:
+    start: float = perf_counter()
+    check_call((sys.executable, "-c", script), env=environment)
+    return perf_counter() - start
+
+
+def _benchmark(
+    script: str,
+    repeat: int,
+    backend: str = "",
+    cold_cache: bool = False,
+) -> Tuple[float, float]:
+    """
+    Return the minimum and median times (in seconds) taken to run `script`
+    """
+    times: List[float] = []
+    cache_directory: str = mkdtemp(prefix="benchmark_cache_")
+    environment: Dict[str, str] = dict(
+        os.environ, DAVES_DEV_TOOLS_CACHE_DIRECTORY=cache_directory
+    )
+    if backend:
+        environment["DAVES_DEV_TOOLS_METADATA_BACKEND"] = backend
+    try:
+        if not cold_cache:
+            # Populate the cache
+            _time_script(script, environment)
+        for _ in range(repeat):
+            if cold_cache:
+                rmtree(cache_directory, ignore_errors=True)
+            times.append(_time_script(script, environment))
+    finally:
+        rmtree(cache_directory, ignore_errors=True)
+    return min(times), median(times)
+
+
+def main(arguments: Optional[List[str]] = None) -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        description=(
+            "Compare the cold-start time of installed-distribution metadata "
+            "backends"
+        )
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        default=10,
+        type=int,
+        help="The number of times to run each benchmark (default: 10)",
+    )
+    namespace: argparse.Namespace = parser.parse_args(arguments)
+    benchmarks: Tuple[Tuple[str, str, str, bool], ...] = (
+        ("pkg_resources (reference)", _PKG_RESOURCES_SCRIPT, "", False),
+        ("index (no cache)", _BACKEND_SCRIPT, "index", True),
+        ("index (cached)", _BACKEND_SCRIPT, "index", False),
+        ("importlib", _BACKEND_SCRIPT, "importlib", False),
+    )
+    name: str
+    script: str
+    backend: str
+    cold_cache: bool
+    print(f"{'backend':<28}{'min (ms)':>10}{'median (ms)':>14}")
+    for name, script, backend, cold_cache in benchmarks:
+        minimum: float
+        median_: float
+        minimum, median_ = _benchmark(
+            script, namespace.repeat, backend=backend, cold_cache=cold_cache
+        )
+        print(f"{name:<28}{minimum * 1000:>10.1f}{median_ * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
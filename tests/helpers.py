@@ -0,0 +1,104 @@
+"""
+This module provides fixtures shared by the test modules in this directory
+"""
+import unittest
+import os
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Iterable, Union
+
+
+def write_file(path: str, data: Union[str, bytes]) -> str:
+    """
+    Write `data` to `path` (creating parent directories as needed), and
+    return `path`
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(data, str):
+        with open(path, "w") as text_io:
+            text_io.write(data)
+    else:
+        with open(path, "wb") as binary_io:
+            binary_io.write(data)
+    return path
+
+
+def write_dist_info(
+    site_packages: str,
+    name: str,
+    version: str,
+    requires_dist: Iterable[str] = (),
+    provides_extra: Iterable[str] = (),
+) -> str:
+    """
+    Write a minimal dist-info directory for a distribution to
+    `site_packages`, and return the path of its metadata file
+    """
+    return write_file(
+        os.path.join(
+            site_packages,
+            f"{name.replace('-', '_')}-{version}.dist-info",
+            "METADATA",
+        ),
+        "Metadata-Version: 2.1\n"
+        f"Name: {name}\n"
+        f"Version: {version}\n"
+        + "".join(
+            f"Requires-Dist: {requirement}\n" for requirement in requires_dist
+        )
+        + "".join(f"Provides-Extra: {extra}\n" for extra in provides_extra),
+    )
+
+
+def write_site_packages(site_packages: str) -> None:
+    """
+    Write metadata for two distributions to `site_packages`:
+
+    - package-a (1.2.3), a dist-info distribution requiring package-b, and
+      package-c for its extra "c"
+    - package-b (2.0), an egg-info distribution requiring package-d, and
+      package-e for its extra "e"
+    """
+    write_file(
+        os.path.join(site_packages, "package_a-1.2.3.dist-info", "METADATA"),
+        "Metadata-Version: 2.1\n"
+        "Name: package-a\n"
+        "Version: 1.2.3\n"
+        "Requires-Dist: package-b (>=1.0)\n"
+        'Requires-Dist: package-c ; extra == "c"\n'
+        "Provides-Extra: c\n"
+        "\n"
+        # The metadata body should not be parsed as headers
+        "Name: Not a header\n",
+    )
+    write_file(
+        os.path.join(site_packages, "package_b.egg-info", "PKG-INFO"),
+        "Metadata-Version: 1.0\nName: package-b\nVersion: 2.0\n",
+    )
+    write_file(
+        os.path.join(site_packages, "package_b.egg-info", "requires.txt"),
+        "package-d\n\n[e]\npackage-e\n",
+    )
+
+
+class CacheDirectoryTestCase(unittest.TestCase):
+    """
+    A test case which uses a temporary daves-dev-tools cache directory for
+    each test
+    """
+
+    def setUp(self) -> None:
+        self.cache_directory: str = mkdtemp(prefix="test_cache_")
+        self.prior_cache_directory: str = os.environ.get(
+            "DAVES_DEV_TOOLS_CACHE_DIRECTORY", ""
+        )
+        os.environ["DAVES_DEV_TOOLS_CACHE_DIRECTORY"] = self.cache_directory
+
+    def tearDown(self) -> None:
+        if self.prior_cache_directory:
+            os.environ[
+                "DAVES_DEV_TOOLS_CACHE_DIRECTORY"
+            ] = self.prior_cache_directory
+        else:
+            os.environ.pop("DAVES_DEV_TOOLS_CACHE_DIRECTORY", None)
+        rmtree(self.cache_directory, ignore_errors=True)
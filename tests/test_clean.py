@@ -1 +1,270 @@
-# TODO: Unit tests for daves_dev_tools.clean
+import unittest
+import json
+import os
+from contextlib import redirect_stdout
+from io import StringIO
+from subprocess import check_call
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from daves_dev_tools.clean import (
+    clean,
+    delete_empty_directories,
+    delete_ignored,
+    get_ignored_files,
+    iter_ignored_files,
+)
+
+
+def _write_files(directory: str, paths: Iterable[str]) -> None:
+    path: str
+    for path in paths:
+        path = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file_io:
+            file_io.write(path)
+
+
+class TestClean(unittest.TestCase):
+    """
+    This test case validates functionality for `daves_dev_tools.clean`
+    """
+
+    def test_get_ignored_files(self) -> None:
+        """
+        Ensure that ignored files are listed without adding anything to the
+        git index, and that excluded files are omitted
+        """
+        with TemporaryDirectory() as directory:
+            check_call(("git", "init", "-q", directory))
+            _write_files(
+                directory,
+                (
+                    ".gitignore",
+                    "setup.py",
+                    "build/lib/module.py",
+                    "package/__pycache__/module.pyc",
+                    "venv/lib/site.py",
+                    "name with\nline break.pyc",
+                ),
+            )
+            with open(os.path.join(directory, ".gitignore"), "w") as file_io:
+                file_io.write("build/\n__pycache__/\nvenv/\n*.pyc\n")
+            ignored_files: Set[str] = set(iter_ignored_files(directory))
+            assert ignored_files == {
+                "build/lib/module.py",
+                "package/__pycache__/module.pyc",
+                "venv/lib/site.py",
+                "name with\nline break.pyc",
+            }
+            assert get_ignored_files(
+                directory, exclude=frozenset(("venv",))
+            ) == (ignored_files - {"venv/lib/site.py"})
+            # Nothing has been added to the index
+            assert not os.path.exists(os.path.join(directory, ".git/index"))
+
+    def test_get_ignored_files_exclude(self) -> None:
+        """
+        Ensure that files matching an exclude pattern, or in a directory
+        matching an exclude pattern, are omitted
+        """
+        with TemporaryDirectory() as directory:
+            check_call(("git", "init", "-q", directory))
+            _write_files(
+                directory,
+                (
+                    "build/lib/module.py",
+                    "build/library/module.py",
+                    "package/__pycache__/module.pyc",
+                    "package.egg-info/PKG-INFO",
+                    "docs/_build/index.html",
+                    "docs/_build/static/style.css",
+                    ".tox/py36/log.txt",
+                ),
+            )
+            with open(os.path.join(directory, ".gitignore"), "w") as file_io:
+                file_io.write("*\n")
+            assert get_ignored_files(
+                directory,
+                exclude=frozenset(
+                    (
+                        "./build/lib",
+                        "**/__pycache__",
+                        "*.egg-info",
+                        "docs/_build/*.html",
+                        "*tox",
+                    )
+                ),
+            ) == {
+                ".gitignore",
+                "build/library/module.py",
+                "docs/_build/static/style.css",
+                # As with `glob`, wildcards don't match a leading "."
+                ".tox/py36/log.txt",
+            }
+
+    def test_delete_ignored(self) -> None:
+        """
+        Ensure that ignored files and directories are deleted, except where
+        excluded, and that the number of files and bytes deleted is returned
+        """
+        with TemporaryDirectory() as directory:
+            check_call(("git", "init", "-q", directory))
+            _write_files(
+                directory,
+                (
+                    "setup.py",
+                    "build/lib/package/module.py",
+                    "build/lib/package/data/data.json",
+                    "build/keep/module.py",
+                    "package/__pycache__/module.pyc",
+                    "package/module.py",
+                ),
+            )
+            with open(os.path.join(directory, ".gitignore"), "w") as file_io:
+                file_io.write("build/\n__pycache__/\n")
+            paths: Set[str] = set(
+                os.path.join(directory, path)
+                for path in get_ignored_files(directory)
+            )
+            expected_number_of_bytes: int = sum(
+                os.path.getsize(path)
+                for path in paths
+                if "build/keep/" not in path.replace("\\", "/")
+            )
+            # Nothing is deleted during a dry run, and each ignored directory
+            # is printed once (rather than each file in it)
+            stdout: StringIO = StringIO()
+            with redirect_stdout(stdout):
+                assert delete_ignored(directory, dry_run=True)[0] == 4
+            assert all(map(os.path.exists, paths))
+            commands: List[str] = [
+                line
+                for line in stdout.getvalue().splitlines()
+                if line.startswith("rm ")
+            ]
+            assert sorted(commands) == [
+                f"rm -R {os.path.join(directory, 'build')}",
+                f"rm -R {os.path.join(directory, 'package', '__pycache__')}",
+            ]
+            # Directories containing excluded paths are not removed, so their
+            # removable contents are printed instead
+            stdout = StringIO()
+            with redirect_stdout(stdout):
+                assert (
+                    delete_ignored(
+                        directory,
+                        exclude=frozenset(("build/keep",)),
+                        dry_run=True,
+                    )[0]
+                    == 3
+                )
+            assert sorted(
+                line
+                for line in stdout.getvalue().splitlines()
+                if line.startswith("rm ")
+            ) == [
+                f"rm -R {os.path.join(directory, 'build', 'lib')}",
+                f"rm -R {os.path.join(directory, 'package', '__pycache__')}",
+            ]
+            with redirect_stdout(StringIO()):
+                number_of_files, number_of_bytes = delete_ignored(
+                    directory, exclude=frozenset(("build/keep",)), jobs=2
+                )
+            assert number_of_files == 3
+            assert number_of_bytes == expected_number_of_bytes
+            assert set(os.listdir(directory)) == {
+                ".git",
+                ".gitignore",
+                "setup.py",
+                "build",
+                "package",
+            }
+            # Only the excluded directory is left in the ignored directory
+            assert os.listdir(os.path.join(directory, "build")) == ["keep"]
+            assert os.listdir(os.path.join(directory, "package")) == [
+                "module.py"
+            ]
+
+    def test_delete_empty_directories(self) -> None:
+        """
+        Ensure that directories which are empty, or which contain only empty
+        directories, are deleted in one pass, and that the contents of
+        excluded directories are left untouched
+        """
+        with TemporaryDirectory() as directory:
+            _write_files(
+                directory,
+                ("setup.py", "a/b/.DS_Store", "venv/lib/python/.DS_Store"),
+            )
+            path: str
+            for path in ("a/c/d", "a/c/e", "venv/include", "f/g"):
+                os.makedirs(os.path.join(directory, path))
+            _write_files(directory, ("f/module.py",))
+            with redirect_stdout(StringIO()):
+                assert (
+                    delete_empty_directories(
+                        directory, exclude=frozenset(("venv",))
+                    )
+                    == 6
+                )
+            assert set(os.listdir(directory)) == {"setup.py", "f", "venv"}
+            assert os.listdir(os.path.join(directory, "f")) == ["module.py"]
+            assert set(os.listdir(os.path.join(directory, "venv"))) == {
+                "lib",
+                "include",
+            }
+
+    def test_clean_report(self) -> None:
+        """
+        Ensure that the JSON report lists the number of files and bytes in
+        each top-level directory, and that nothing is deleted during a dry
+        run
+        """
+        with TemporaryDirectory() as directory:
+            check_call(("git", "init", "-q", directory))
+            _write_files(
+                directory,
+                (
+                    "build/lib/module.py",
+                    "build/lib/data.json",
+                    "package/__pycache__/module.pyc",
+                    "package/module.py",
+                    "module.pyc",
+                ),
+            )
+            with open(os.path.join(directory, ".gitignore"), "w") as file_io:
+                file_io.write("build/\n*.pyc\n")
+            stdout: StringIO = StringIO()
+            with redirect_stdout(stdout):
+                clean(directory, dry_run=True, report="json")
+            records: List[Dict[str, Any]] = list(
+                map(json.loads, stdout.getvalue().splitlines())
+            )
+            directories_files_bytes: Dict[str, Tuple[int, int]] = {
+                record["directory"]: (record["files"], record["bytes"])
+                for record in records
+                if "directory" in record
+            }
+
+            def size(path: str) -> int:
+                return os.path.getsize(os.path.join(directory, path))
+
+            assert directories_files_bytes == {
+                "build": (
+                    2,
+                    size("build/lib/module.py") + size("build/lib/data.json"),
+                ),
+                "package": (1, size("package/__pycache__/module.pyc")),
+                ".": (1, size("module.pyc")),
+            }
+            assert records[-2]["files"] == 4
+            assert records[-2]["bytes"] == sum(
+                files_bytes[1]
+                for files_bytes in directories_files_bytes.values()
+            )
+            assert records[-1] == {"empty_directories": 0}
+            assert os.path.exists(os.path.join(directory, "module.pyc"))
+
+
+if __name__ == "__main__":
+    unittest.main()
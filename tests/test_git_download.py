@@ -1,10 +1,13 @@
 import unittest
 import os
-from typing import List
-from subprocess import check_output
-from tempfile import mkdtemp
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import List, Tuple
+from subprocess import check_call, check_output
+from tempfile import TemporaryDirectory, mkdtemp
 from shutil import rmtree
-from daves_dev_tools.git.download import download
+from daves_dev_tools.git.download import _clone, download
 
 
 PROJECT_DIRECTORY: str = os.path.join(
@@ -56,6 +59,67 @@ class TestGitDownload(unittest.TestCase):
             os.chdir(current_directory)
             rmtree(temp_directory, ignore_errors=True)
 
+    def test_git_download_sparse(self) -> None:
+        """
+        Ensure that only the blobs for requested files are fetched from a
+        remote supporting partial clones
+        """
+        with TemporaryDirectory() as temp_directory:
+            source: str = os.path.join(temp_directory, "source")
+            check_call(("git", "init", "-q", source))
+            path: str
+            for path in ("setup.cfg", "module.py", "a/b/module.py", "a/c.txt"):
+                path = os.path.join(source, path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as file_io:
+                    file_io.write(path)
+            check_call(("git", "add", "."), cwd=source)
+            check_call(
+                (
+                    "git",
+                    "-c",
+                    "user.name=Test",
+                    "-c",
+                    "user.email=test@example.com",
+                    "commit",
+                    "-q",
+                    "-m",
+                    "Test",
+                ),
+                cwd=source,
+            )
+            bare: str = os.path.join(temp_directory, "bare.git")
+            check_call(("git", "clone", "-q", "--bare", source, bare))
+            check_call(
+                ("git", "config", "uploadpack.allowFilter", "true"), cwd=bare
+            )
+            url: str = Path(bare).as_uri()
+            files: Tuple[str, ...] = ("**/*.py", "setup.cfg")
+            clone: str = os.path.join(temp_directory, "clone")
+            _clone(url, clone, files)
+            # Only the blob for "a/c.txt" has not been fetched
+            assert (
+                check_output(
+                    (
+                        "git",
+                        "rev-list",
+                        "--objects",
+                        "--missing=print",
+                        "HEAD",
+                    ),
+                    cwd=clone,
+                    universal_newlines=True,
+                ).count("\n?")
+                == 1
+            )
+            target: str = os.path.join(temp_directory, "target")
+            with redirect_stdout(StringIO()):
+                paths: List[str] = download(url, files, directory=target)
+            assert sorted(
+                os.path.relpath(path, target).replace("\\", "/")
+                for path in paths
+            ) == ["a/b/module.py", "module.py", "setup.cfg"]
+
 
 if __name__ == "__main__":
     unittest.main()
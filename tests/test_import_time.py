@@ -0,0 +1,127 @@
+import unittest
+import os
+import sys
+from subprocess import run, PIPE
+from typing import List, Set, Tuple
+
+# The maximum cumulative time which may be spent importing modules in order
+# to display command line help, as a multiple of the time taken to import
+# `argparse` (measured in the same environment, so that the budget scales
+# with the speed of the machine running the tests)
+IMPORT_BUDGET_RATIO: int = 20
+# Modules which should not be imported in order to display command line help
+# for the top-level CLI or `git download`
+HEAVY_MODULES: Tuple[str, ...] = (
+    "pkg_resources",
+    "setuptools",
+    "distutils",
+    "packaging",
+    "tomli",
+    "tomli_w",
+    "importlib_metadata",
+    "more_itertools",
+    "daves_dev_tools.requirements",
+)
+PROJECT_DIRECTORY: str = os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))
+)
+
+
+def _get_import_time(
+    *arguments: str, module: str = "daves_dev_tools"
+) -> Tuple[int, Set[str]]:
+    """
+    Run `python -X importtime *arguments`, and return the cumulative time
+    spent on imports performed after the interpreter finished starting up
+    (from the import of `module` onwards, in microseconds), and the names of
+    the modules imported.
+    """
+    stderr: str = run(
+        (sys.executable, "-X", "importtime") + arguments,
+        stdout=PIPE,
+        stderr=PIPE,
+        cwd=PROJECT_DIRECTORY,
+        universal_newlines=True,
+    ).stderr
+    # Each line is formatted as "import time: self | cumulative | name",
+    # with nested imports indicated by indenting the name
+    lines: List[Tuple[int, str]] = []
+    line: str
+    name: str
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.count("|") == 2:
+            cumulative: str
+            cumulative, name = line.split("|")[1:]
+            if cumulative.strip().isdigit():
+                lines.append((int(cumulative), name.rstrip()[1:]))
+    # Find the last top-level import preceding `module` (imports before
+    # this are performed when the interpreter starts up)
+    start: int = 0
+    index: int
+    microseconds: int
+    for index, (microseconds, name) in enumerate(lines):
+        if name.strip().startswith(module):
+            break
+        if not name.startswith(" "):
+            start = index + 1
+    lines = lines[start:]
+    return (
+        sum(
+            microseconds
+            for microseconds, name in lines
+            if not name.startswith(" ")
+        ),
+        {name.strip() for microseconds, name in lines},
+    )
+
+
+class TestImportTime(unittest.TestCase):
+    """
+    This test case ensures that command line help is displayed without
+    importing modules which the command does not need
+    """
+
+    baseline: int = 0
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Use the fastest of several measurements, to reduce noise
+        cls.baseline = min(
+            _get_import_time("-c", "import argparse", module="argparse")[0]
+            for _ in range(3)
+        )
+
+    def _assert_import_budget(self, *arguments: str) -> None:
+        import_time: int
+        modules: Set[str]
+        import_time, modules = _get_import_time(
+            "-m", "daves_dev_tools", *arguments
+        )
+        assert "daves_dev_tools" in modules
+        heavy_modules: Set[str] = {
+            module
+            for module in modules
+            if module.partition(".")[0] in HEAVY_MODULES
+            or module.startswith(HEAVY_MODULES)
+        }
+        assert not heavy_modules, (
+            f"`daves-dev-tools {' '.join(arguments)}` imported "
+            f"{', '.join(sorted(heavy_modules))}"
+        )
+        budget: int = self.baseline * IMPORT_BUDGET_RATIO
+        assert import_time <= budget, (
+            f"`daves-dev-tools {' '.join(arguments)}` spent "
+            f"{import_time / 1000:.1f}ms on imports (the budget is "
+            f"{budget / 1000:.1f}ms: {IMPORT_BUDGET_RATIO} times the "
+            f"{self.baseline / 1000:.1f}ms taken to import `argparse`)"
+        )
+
+    def test_help(self) -> None:
+        self._assert_import_budget("--help")
+
+    def test_git_download_help(self) -> None:
+        self._assert_import_budget("git", "download", "--help")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import unittest
+import os
+import json
+from io import StringIO
+from tempfile import mkdtemp
+from shutil import rmtree
+from typing import Any, Dict, List
+from daves_dev_tools.requirements.graph import write_graph
+from daves_dev_tools.requirements.utilities import set_target_environment
+from helpers import CacheDirectoryTestCase, write_dist_info
+
+
+class TestRequirementsGraph(CacheDirectoryTestCase):
+    """
+    This test case validates functionality for
+    `daves_dev_tools.requirements.graph`
+    """
+
+    def _set_synthetic_target_environment(self) -> None:
+        """
+        Target a python 2.7 environment containing only synthetic
+        distributions
+        """
+        self.target_directory: str = mkdtemp(prefix="test_graph_")
+        site_packages: str = os.path.join(
+            self.target_directory, "lib", "python2.7", "site-packages"
+        )
+        write_dist_info(
+            site_packages,
+            "app",
+            "1.0",
+            requires_dist=(
+                "lib-a[fast]>=1.0",
+                "lib-b",
+                'lib-c ; python_version == "2.7"',
+                'lib-d ; python_version != "2.7"',
+            ),
+        )
+        write_dist_info(
+            site_packages,
+            "lib-a",
+            "1.1",
+            requires_dist=("lib-b>=2", 'lib-e ; extra == "fast"'),
+            provides_extra=("fast",),
+        )
+        write_dist_info(site_packages, "lib-b", "2.0", ("lib-x",))
+        write_dist_info(site_packages, "lib-c", "3.0")
+        write_dist_info(site_packages, "lib-d", "4.0")
+        write_dist_info(site_packages, "lib-e", "5.0")
+        write_dist_info(site_packages, "lib-x", "6.0", ("lib-y",))
+        write_dist_info(site_packages, "lib-y", "7.0")
+        set_target_environment(site_packages=site_packages)
+
+    def tearDown(self) -> None:
+        set_target_environment()
+        if hasattr(self, "target_directory"):
+            rmtree(self.target_directory, ignore_errors=True)
+        super().tearDown()
+
+    def test_write_graph_json_synthetic(self) -> None:
+        """
+        Ensure that the JSON graph of a synthetic environment has exactly
+        the expected nodes: with extras, versions, and markers on edges,
+        with each node visited once, without requirements whose markers
+        don't apply to the target environment, and without excluded
+        distributions or their (exclusively) transitive requirements
+        """
+        self._set_synthetic_target_environment()
+        file_io: StringIO = StringIO()
+        write_graph(("app",), file_io, exclude=("lib-x",))
+        assert json.loads(file_io.getvalue()) == [
+            {
+                "id": "app",
+                "name": "app",
+                "extras": [],
+                "version": "1.0",
+                "requires": [
+                    {
+                        "id": "lib-a[fast]",
+                        "specifier": ">=1.0",
+                        "marker": None,
+                    },
+                    {"id": "lib-b", "specifier": "", "marker": None},
+                    {
+                        "id": "lib-c",
+                        "specifier": "",
+                        "marker": 'python_version == "2.7"',
+                    },
+                ],
+            },
+            {
+                "id": "lib-a[fast]",
+                "name": "lib-a",
+                "extras": ["fast"],
+                "version": "1.1",
+                "requires": [
+                    {"id": "lib-b", "specifier": ">=2", "marker": None},
+                    {
+                        "id": "lib-e",
+                        "specifier": "",
+                        "marker": 'extra == "fast"',
+                    },
+                ],
+            },
+            {
+                "id": "lib-b",
+                "name": "lib-b",
+                "extras": [],
+                "version": "2.0",
+                "requires": [],
+            },
+            {
+                "id": "lib-e",
+                "name": "lib-e",
+                "extras": [],
+                "version": "5.0",
+                "requires": [],
+            },
+            {
+                "id": "lib-c",
+                "name": "lib-c",
+                "extras": [],
+                "version": "3.0",
+                "requires": [],
+            },
+        ]
+
+    def test_write_graph_dot_synthetic(self) -> None:
+        """
+        Ensure that the DOT graph of a synthetic environment labels nodes
+        with versions, and edges with specifiers
+        """
+        self._set_synthetic_target_environment()
+        file_io: StringIO = StringIO()
+        write_graph(("app",), file_io, output_format="dot", exclude=("lib-b",))
+        lines: List[str] = file_io.getvalue().splitlines()
+        assert lines[:4] == [
+            "digraph requirements {",
+            '  "app" [label="app\\n1.0"];',
+            '  "app" -> "lib-a[fast]" [label=">=1.0"];',
+            '  "app" -> "lib-c" [label="; python_version == \\"2.7\\""];',
+        ]
+        assert '  "lib-a[fast]" [label="lib-a[fast]\\n1.1"];' in lines
+        assert not any("lib-b" in line for line in lines)
+        assert not any("lib-d" in line for line in lines)
+
+    def test_write_graph_json(self) -> None:
+        """
+        Ensure that the JSON graph includes versions and edges, and that
+        excluded distributions are omitted
+        """
+        file_io: StringIO = StringIO()
+        write_graph(("flake8",), file_io, exclude=("pyflakes",))
+        nodes: List[Dict[str, Any]] = json.loads(file_io.getvalue())
+        nodes_by_id: Dict[str, Dict[str, Any]] = {
+            node["id"]: node for node in nodes
+        }
+        assert nodes[0]["id"] == "flake8"
+        assert nodes[0]["version"]
+        requires: List[str] = [
+            requirement["id"] for requirement in nodes[0]["requires"]
+        ]
+        assert "pycodestyle" in requires
+        assert "pyflakes" not in requires
+        assert "pyflakes" not in nodes_by_id
+        # Every edge should reference a node in the graph
+        node: Dict[str, Any]
+        for node in nodes:
+            for requirement in node["requires"]:
+                assert requirement["id"] in nodes_by_id
+
+    def test_write_graph_dot(self) -> None:
+        """
+        Ensure that a DOT graph is written with nodes and edges
+        """
+        file_io: StringIO = StringIO()
+        write_graph(("flake8",), file_io, output_format="dot")
+        dot: str = file_io.getvalue()
+        assert dot.startswith("digraph requirements {\n")
+        assert dot.endswith("}\n")
+        assert '"flake8" -> "pycodestyle"' in dot
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+import unittest
+import os
+import json
+import hashlib
+from tempfile import mkdtemp
+from shutil import rmtree
+from typing import Any, Dict, Iterable, List, Tuple
+from daves_dev_tools.requirements.index import IndexedDistribution
+from daves_dev_tools.requirements.hashes import (
+    get_distributions_hashes,
+    get_files_sha256,
+    _FILE_HASHES_VERSION,
+)
+from daves_dev_tools.utilities import read_cache, write_cache
+from helpers import CacheDirectoryTestCase, write_file
+
+
+class TestRequirementsHashes(CacheDirectoryTestCase):
+    """
+    This test case validates functionality for
+    `daves_dev_tools.requirements.hashes`
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory: str = mkdtemp(prefix="test_hashes_")
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        rmtree(self.directory, ignore_errors=True)
+
+    def _write(self, file_name: str, data: bytes) -> str:
+        return write_file(os.path.join(self.directory, file_name), data)
+
+    def test_get_distributions_hashes(self) -> None:
+        """
+        Ensure hashes are found for matching local archives and in
+        direct_url.json
+        """
+        self._write("wheels/package_a-1.0-py3-none-any.whl", b"wheel")
+        self._write("wheels/package-a-1.0.tar.gz", b"sdist")
+        self._write("wheels/package_a-2.0-py3-none-any.whl", b"other")
+        self._write("wheels/empty-1.0-py3-none-any.whl", b"")
+        self._write(
+            "site/package_b-1.0.dist-info/direct_url.json",
+            json.dumps(
+                {
+                    "url": "https://example.com/package_b-1.0.tar.gz",
+                    "archive_info": {"hash": "sha256=abc"},
+                }
+            ).encode(),
+        )
+        # Hashes using algorithms rejected by pip should be skipped, in
+        # favor of digests of local archives
+        self._write("wheels/package_d-1.0-py3-none-any.whl", b"package-d")
+        self._write(
+            "site/package_d-1.0.dist-info/direct_url.json",
+            json.dumps(
+                {
+                    "url": "https://example.com/package_d-1.0.tar.gz",
+                    "archive_info": {
+                        "hash": "md5=abc",
+                        "hashes": {"md5": "abc", "sha1": "def"},
+                    },
+                }
+            ).encode(),
+        )
+        self._write(
+            "site/package_e-1.0.dist-info/direct_url.json",
+            json.dumps(
+                {
+                    "url": "https://example.com/package_e-1.0.tar.gz",
+                    "archive_info": {
+                        "hash": "sha1=def",
+                        "hashes": {"sha1": "def", "sha512": "ghi"},
+                    },
+                }
+            ).encode(),
+        )
+        self._write(
+            "site/package_f-1.0.dist-info/direct_url.json",
+            json.dumps(
+                {
+                    "url": "https://example.com/package_f-1.0.tar.gz",
+                    "archive_info": {"hash": "md5=abc"},
+                }
+            ).encode(),
+        )
+        hashes: Dict[str, Tuple[str, ...]] = get_distributions_hashes(
+            (
+                IndexedDistribution("package_a", "1.0"),
+                IndexedDistribution(
+                    "package-d",
+                    "1.0",
+                    egg_info=os.path.join(
+                        self.directory, "site", "package_d-1.0.dist-info"
+                    ),
+                ),
+                IndexedDistribution(
+                    "package-e",
+                    "1.0",
+                    egg_info=os.path.join(
+                        self.directory, "site", "package_e-1.0.dist-info"
+                    ),
+                ),
+                IndexedDistribution(
+                    "package-b",
+                    "1.0",
+                    egg_info=os.path.join(
+                        self.directory, "site", "package_b-1.0.dist-info"
+                    ),
+                ),
+                IndexedDistribution(
+                    "package-f",
+                    "1.0",
+                    egg_info=os.path.join(
+                        self.directory, "site", "package_f-1.0.dist-info"
+                    ),
+                ),
+                IndexedDistribution("empty", "1.0"),
+                IndexedDistribution("package-c", "1.0"),
+            ),
+            find_links=(os.path.join(self.directory, "wheels"),),
+        )
+        assert hashes == {
+            "package-a": tuple(
+                sorted(
+                    (
+                        f"sha256:{hashlib.sha256(b'wheel').hexdigest()}",
+                        f"sha256:{hashlib.sha256(b'sdist').hexdigest()}",
+                    )
+                )
+            ),
+            "package-b": ("sha256:abc",),
+            "package-d": (
+                f"sha256:{hashlib.sha256(b'package-d').hexdigest()}",
+            ),
+            "package-e": ("sha512:ghi",),
+            "empty": (f"sha256:{hashlib.sha256(b'').hexdigest()}",),
+        }
+
+    def test_get_files_sha256_cache(self) -> None:
+        """
+        Ensure cached digests are used for unchanged files, and invalidated
+        when files change
+        """
+        path: str = self._write("file.whl", b"abc")
+        os.utime(path, ns=(0, 0))
+        assert get_files_sha256((path,)) == {
+            path: hashlib.sha256(b"abc").hexdigest()
+        }
+        # Rewrite the file with the same size and modification time to
+        # verify that the cached digest is used
+        self._write("file.whl", b"xyz")
+        os.utime(path, ns=(0, 0))
+        assert get_files_sha256((path,)) == {
+            path: hashlib.sha256(b"abc").hexdigest()
+        }
+        self._write("file.whl", b"wxyz")
+        assert get_files_sha256((path,)) == {
+            path: hashlib.sha256(b"wxyz").hexdigest()
+        }
+
+    def test_get_files_sha256_cache_merge(self) -> None:
+        """
+        Ensure entries written to the cache by concurrent runs are retained,
+        and entries for files which no longer exist are dropped
+        """
+        path_a: str = self._write("a.whl", b"a")
+        path_b: str = self._write("b.whl", b"b")
+        path_c: str = self._write("c.whl", b"c")
+        path_d: str = self._write("d.whl", b"d")
+        get_files_sha256((path_a, path_b))
+        os.remove(path_b)
+        concurrent_entry: List[Any] = [0, 1, "concurrent"]
+
+        def iter_paths() -> Iterable[str]:
+            # Simulate a concurrent run caching a digest for `path_d` after
+            # this run has read the cache
+            write_cache(
+                "file-hashes",
+                "sha256",
+                _FILE_HASHES_VERSION,
+                dict(
+                    read_cache("file-hashes", "sha256", _FILE_HASHES_VERSION),
+                    **{path_d: concurrent_entry},
+                ),
+            )
+            yield path_c
+
+        assert get_files_sha256(iter_paths()) == {
+            path_c: hashlib.sha256(b"c").hexdigest()
+        }
+        cache: Dict[str, Any] = read_cache(
+            "file-hashes", "sha256", _FILE_HASHES_VERSION
+        )
+        assert set(cache) == {path_a, path_c, path_d}
+        assert cache[path_d] == concurrent_entry
+
+
+if __name__ == "__main__":
+    unittest.main()
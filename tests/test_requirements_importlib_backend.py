@@ -0,0 +1,53 @@
+import unittest
+from tempfile import mkdtemp
+from shutil import rmtree
+from daves_dev_tools.requirements.importlib_backend import (
+    ImportlibDistributions,
+)
+from daves_dev_tools.requirements.index import IndexedDistribution
+from helpers import write_site_packages
+
+
+class TestRequirementsImportlibBackend(unittest.TestCase):
+    """
+    This test case validates functionality for
+    `daves_dev_tools.requirements.importlib_backend`
+    """
+
+    def setUp(self) -> None:
+        self.site_packages: str = mkdtemp(prefix="test_importlib_site_")
+        write_site_packages(self.site_packages)
+
+    def tearDown(self) -> None:
+        rmtree(self.site_packages, ignore_errors=True)
+
+    def test_importlib_distributions(self) -> None:
+        """
+        Ensure distributions are listed without reading metadata, and that
+        metadata is read correctly when a distribution is looked up
+        """
+        distributions: ImportlibDistributions = ImportlibDistributions(
+            (self.site_packages,)
+        )
+        assert set(distributions) == {"package-a", "package-b"}
+        assert "package-a" in distributions
+        # No metadata has been loaded yet
+        assert not distributions._distributions
+        package_a: IndexedDistribution = distributions["package-a"]
+        assert package_a.version == "1.2.3"
+        assert package_a.extras == ("c",)
+        assert [
+            requirement.name for requirement in package_a.requires(("c",))
+        ] == ["package-b", "package-c"]
+        package_b: IndexedDistribution = distributions["package-b"]
+        assert package_b.version == "2.0"
+        assert package_b.extras == ("e",)
+        assert [
+            requirement.name for requirement in package_b.requires(("e",))
+        ] == ["package-d", "package-e"]
+        with self.assertRaises(KeyError):
+            distributions["package-c"]
+
+
+if __name__ == "__main__":
+    unittest.main()
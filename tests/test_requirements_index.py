@@ -0,0 +1,84 @@
+import unittest
+import os
+from tempfile import mkdtemp
+from shutil import rmtree
+from typing import Dict, List
+from daves_dev_tools.requirements.index import (
+    DistributionIndex,
+    IndexedDistribution,
+)
+from helpers import CacheDirectoryTestCase, write_site_packages
+
+
+class TestRequirementsIndex(CacheDirectoryTestCase):
+    """
+    This test case validates functionality for
+    `daves_dev_tools.requirements.index`
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.site_packages: str = mkdtemp(prefix="test_index_site_")
+        write_site_packages(self.site_packages)
+        # Modification times within the last couple of seconds are not
+        # trusted by the index, so we backdate the directory
+        os.utime(self.site_packages, ns=(0, 0))
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        rmtree(self.site_packages, ignore_errors=True)
+
+    def _get_distributions(self) -> Dict[str, IndexedDistribution]:
+        index: DistributionIndex = DistributionIndex(self.site_packages)
+        index.refresh()
+        distribution: IndexedDistribution
+        return {
+            distribution.project_name: distribution
+            for distribution in index.iter_distributions()
+        }
+
+    def test_index(self) -> None:
+        """
+        Ensure distribution metadata is read correctly, persisted, and
+        invalidated when the metadata changes
+        """
+        distributions: Dict[
+            str, IndexedDistribution
+        ] = self._get_distributions()
+        assert set(distributions.keys()) == {"package-a", "package-b"}
+        package_a: IndexedDistribution = distributions["package-a"]
+        assert package_a.version == "1.2.3"
+        assert package_a.extras == ("c",)
+        names: List[str] = [
+            requirement.name for requirement in package_a.requires()
+        ]
+        assert names == ["package-b"]
+        names = [
+            requirement.name for requirement in package_a.requires(("c",))
+        ]
+        assert names == ["package-b", "package-c"]
+        assert str(package_a.as_requirement()) == "package-a==1.2.3"
+        package_b: IndexedDistribution = distributions["package-b"]
+        assert package_b.version == "2.0"
+        names = [
+            requirement.name for requirement in package_b.requires(("e",))
+        ]
+        assert names == ["package-d", "package-e"]
+        # A new index should be loaded from the cache without reading
+        # any metadata
+        index: DistributionIndex = DistributionIndex(self.site_packages)
+        assert not index.refresh()
+        # Modifying the metadata should invalidate only that entry
+        rmtree(os.path.join(self.site_packages, "package_b.egg-info"))
+        metadata_path: str = os.path.join(
+            self.site_packages, "package_a-1.2.3.dist-info", "METADATA"
+        )
+        with open(metadata_path, "a") as metadata_io:
+            metadata_io.write("More description\n")
+        os.utime(metadata_path, ns=(0, 0))
+        distributions = self._get_distributions()
+        assert set(distributions.keys()) == {"package-a"}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from typing import List
+from daves_dev_tools.requirements.pyproject import (
+    get_edited_pyproject_toml,
+    iter_requirement_string_spans,
+)
+
+PYPROJECT_TOML: str = """# Comments are preserved
+[build-system]
+requires = [
+    "setuptools>=40.0",  # A comment
+    'wheel>=0.30',
+]
+build-backend = "setuptools.build_meta"
+
+[project]
+name = "test-project"
+dependencies = ["requests>=2.0", "escaped\\u002Dname>=1.0"]
+classifiers = ["Not :: A Requirement"]
+released = 1979-05-27 07:32:00Z
+
+[project.optional-dependencies]
+dev = [
+  '''black>=22.0''',
+]
+"docs" = ["sphinx>=4.0"]
+
+[tool.example]
+requires = ["not-a-requirement>=1.0"]
+"""
+
+
+class TestRequirementsPyproject(unittest.TestCase):
+    """
+    This test case validates functionality for
+    `daves_dev_tools.requirements.pyproject`
+    """
+
+    def test_iter_requirement_string_spans(self) -> None:
+        """
+        Ensure that requirement strings are found in all requirement tables,
+        and only in those tables
+        """
+        values: List[str] = [
+            span.value
+            for span in iter_requirement_string_spans(PYPROJECT_TOML)
+        ]
+        assert values == [
+            "setuptools>=40.0",
+            "wheel>=0.30",
+            "requests>=2.0",
+            "escaped-name>=1.0",
+            "black>=22.0",
+            "sphinx>=4.0",
+        ]
+
+    def test_get_edited_pyproject_toml(self) -> None:
+        """
+        Ensure that only the edited strings are rewritten
+        """
+        assert get_edited_pyproject_toml(
+            PYPROJECT_TOML, lambda requirement: requirement.replace(".0", ".1")
+        ) == (
+            PYPROJECT_TOML.replace("setuptools>=40.0", "setuptools>=40.1")
+            .replace("requests>=2.0", "requests>=2.1")
+            .replace('"escaped\\u002Dname>=1.0"', '"escaped-name>=1.1"')
+            .replace("'''black>=22.0'''", '"black>=22.1"')
+            .replace("sphinx>=4.0", "sphinx>=4.1")
+        )
+
+    def test_unsupported_document(self) -> None:
+        """
+        Ensure that invalid documents raise a `ValueError`
+        """
+        with self.assertRaises(ValueError):
+            list(iter_requirement_string_spans("[project\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 import os
+import shutil
 import tomli
-from typing import Iterable
+from contextlib import redirect_stdout
+from io import StringIO
+from tempfile import TemporaryDirectory
+from typing import Callable, Dict, Iterable, List, Optional
 from configparser import ConfigParser
 from packaging.requirements import Requirement
 from packaging.specifiers import Specifier
@@ -10,6 +14,9 @@ from daves_dev_tools.requirements.update import (
     get_updated_requirements_txt,
     get_updated_setup_cfg,
     get_updated_pyproject_toml,
+    get_updated_tox_ini,
+    iter_find_requirements_files,
+    update,
 )
 
 
@@ -105,6 +112,95 @@ class TestRequirementsUpdate(unittest.TestCase):
         ].values():
             validate_requirements(extra_requirements_string)
 
+    def test_get_updated_setup_cfg_formatting(self) -> None:
+        """
+        Ensure that only changed version numbers are replaced in a setup.cfg
+        file, and that an "all" extra is added, or replaced, in place
+        """
+        versions: Dict[str, Optional[str]] = {
+            "requests": "2.28.1",
+            "twine": "4.0.2",
+            "wheel": "0.38.4",
+        }
+        setup_cfg_data: str = (
+            "[options]\n"
+            "# Comments are preserved\n"
+            "install_requires =\n"
+            "    requests >= 2.0 ; python_version >= '3.6'  \n"
+            "    not-installed~=1.0\n"
+            "\n"
+            "[options.extras_require]\n"
+            "twine = twine>=1.0\n"
+            "wheel =\n"
+            "\twheel>=0.30,!=0.31.0\n"
+            "\n"
+            "[metadata]\n"
+            "name = test\n"
+        )
+        updated_setup_cfg_data: str = get_updated_setup_cfg(
+            setup_cfg_data, all_extra_name="all", versions=versions
+        )
+        assert updated_setup_cfg_data == (
+            "[options]\n"
+            "# Comments are preserved\n"
+            "install_requires =\n"
+            "    requests >= 2.28 ; python_version >= '3.6'  \n"
+            "    not-installed~=1.0\n"
+            "\n"
+            "[options.extras_require]\n"
+            "twine = twine>=4.0\n"
+            "wheel =\n"
+            "\twheel>=0.38,!=0.31.0\n"
+            "all =\n"
+            "\ttwine>=4.0\n"
+            "\twheel>=0.38,!=0.31.0\n"
+            "\n"
+            "[metadata]\n"
+            "name = test\n"
+        )
+        # Updating the "all" extra a second time should replace it
+        assert (
+            get_updated_setup_cfg(
+                updated_setup_cfg_data, all_extra_name="all", versions=versions
+            )
+            == updated_setup_cfg_data
+        )
+
+    def test_get_updated_tox_ini(self) -> None:
+        """
+        Ensure that only changed version numbers are replaced in a tox.ini
+        file, including for factor-conditional requirements
+        """
+        versions: Dict[str, Optional[str]] = {
+            "tox": "4.4.6",
+            "pytest": "7.2.1",
+            "flake8": "6.0.0",
+        }
+        assert get_updated_tox_ini(
+            "[tox]\n"
+            "requires = tox>=3.0  # comment\n"
+            "\n"
+            "[testenv]\n"
+            "; comment\n"
+            "deps =\n"
+            "    pytest ~= 6.0\n"
+            "    py38: flake8>=3.0.0\n"
+            "    -r requirements.txt\n"
+            "commands = pytest>=1.0\n",
+            versions=versions,
+        ) == (
+            "[tox]\n"
+            "requires = tox>=4.4  # comment\n"
+            "\n"
+            "[testenv]\n"
+            "; comment\n"
+            "deps =\n"
+            "    pytest ~= 7.2\n"
+            "    py38: flake8>=6.0.0\n"
+            "    -r requirements.txt\n"
+            "commands = pytest>=1.0\n"
+        )
+
     def test_get_updated_pyproject_toml(self) -> None:
         """
         Ensure that updating a pyproject.toml file occurs without problems
@@ -157,6 +253,181 @@ class TestRequirementsUpdate(unittest.TestCase):
             assert updated_requirements_txt_data != requirements_txt_data
             validate_requirements(updated_requirements_txt_data)
 
+    def test_update(self) -> None:
+        """
+        Ensure that updating multiple files at once produces the same
+        results as updating each file individually, and that files which
+        are already up-to-date are not re-written
+        """
+        get_updated_data: Dict[str, Callable[..., str]] = {
+            "setup.cfg": get_updated_setup_cfg,
+            "pyproject.toml": get_updated_pyproject_toml,
+            "requirements.txt": get_updated_requirements_txt,
+        }
+        with TemporaryDirectory() as directory:
+            file_name: str
+            expected: Dict[str, str] = {}
+            for file_name in (
+                "setup.cfg",
+                "pyproject.toml",
+                "requirements.txt",
+            ):
+                path: str = os.path.join(directory, file_name)
+                shutil.copy(
+                    os.path.join(TEST_PROJECT_DIRECTORY, file_name), path
+                )
+                with open(path) as file_io:
+                    data: str = file_io.read()
+                expected[path] = get_updated_data[file_name](
+                    data, ignore=("pip", "setuptools")
+                )
+            os.chmod(os.path.join(directory, "requirements.txt"), 0o640)
+            update(expected.keys(), ignore=("pip", "setuptools"), jobs=2)
+            for path, data in expected.items():
+                with open(path) as file_io:
+                    assert file_io.read() == data, path
+            assert (
+                os.stat(os.path.join(directory, "requirements.txt")).st_mode
+                & 0o777
+            ) == 0o640
+            # Files are only written if they have changed
+            modified_times: Dict[str, int] = {
+                path: os.stat(path).st_mtime_ns for path in expected
+            }
+            stdout: StringIO = StringIO()
+            with redirect_stdout(stdout):
+                update(expected.keys(), ignore=("pip", "setuptools"))
+            assert "Updating" not in stdout.getvalue()
+            for path, modified_time in modified_times.items():
+                assert os.stat(path).st_mtime_ns == modified_time
+
+    def test_update_line_endings(self) -> None:
+        """
+        Ensure that CRLF line endings are preserved when updating files
+        """
+        with TemporaryDirectory() as directory:
+            paths: List[str] = []
+            file_name: str
+            for file_name in ("setup.cfg", "requirements.txt"):
+                path: str = os.path.join(directory, file_name)
+                with open(
+                    os.path.join(TEST_PROJECT_DIRECTORY, file_name)
+                ) as file_io:
+                    data: str = file_io.read()
+                with open(path, "w", newline="") as file_io:
+                    file_io.write(data.replace("\n", "\r\n"))
+                paths.append(path)
+            with redirect_stdout(StringIO()):
+                assert update(
+                    paths, ignore=("pip", "setuptools"), all_extra_name="all"
+                )
+            for path in paths:
+                with open(path, "rb") as binary_io:
+                    binary: bytes = binary_io.read()
+                assert b"flake8>=0.0.0" not in binary, path
+                assert binary.count(b"\n") == binary.count(b"\r\n"), path
+
+    def test_update_check_diff(self) -> None:
+        """
+        Ensure that no files are written in check or diff mode, that
+        differences are reported, and that checking stops at the first file
+        which would change
+        """
+        with TemporaryDirectory() as directory:
+            paths: List[str] = []
+            index: int
+            for index in range(2):
+                path: str = os.path.join(
+                    directory, f"requirements-{index}.txt"
+                )
+                shutil.copy(
+                    os.path.join(TEST_PROJECT_DIRECTORY, "requirements.txt"),
+                    path,
+                )
+                paths.append(path)
+            stdout: StringIO = StringIO()
+            with redirect_stdout(stdout):
+                assert update(paths, diff=True)
+            assert stdout.getvalue().count("+flake8>=") == 2
+            assert f"--- {paths[1]}\n" in stdout.getvalue()
+            stdout = StringIO()
+            with redirect_stdout(stdout):
+                assert update(paths, check=True)
+            # Only the first file found to be out-of-date is reported
+            assert stdout.getvalue() in (
+                f"Requirements are out-of-date in {path}\n" for path in paths
+            )
+            for path in paths:
+                with open(path) as file_io:
+                    assert "flake8>=0.0.0" in file_io.read()
+            with redirect_stdout(StringIO()):
+                assert update(paths)
+                assert not update(paths, check=True)
+
+    def test_update_check_lazy(self) -> None:
+        """
+        Ensure that checking stops pulling paths once a file is found which
+        would change
+        """
+        with TemporaryDirectory() as directory:
+            out_of_date_path: str = os.path.join(directory, "requirements.txt")
+            shutil.copy(
+                os.path.join(TEST_PROJECT_DIRECTORY, "requirements.txt"),
+                out_of_date_path,
+            )
+            up_to_date_path: str = os.path.join(
+                directory, "requirements-empty.txt"
+            )
+            with open(up_to_date_path, "w") as file_io:
+                file_io.write("\n")
+
+            def iter_paths() -> Iterable[str]:
+                yield out_of_date_path
+                yield up_to_date_path
+                raise AssertionError(
+                    "Paths were consumed after an out-of-date file was found"
+                )
+
+            stdout: StringIO = StringIO()
+            with redirect_stdout(stdout):
+                assert update(iter_paths(), check=True, jobs=1)
+            assert stdout.getvalue() == (
+                f"Requirements are out-of-date in {out_of_date_path}\n"
+            )
+
+    def test_iter_find_requirements_files(self) -> None:
+        """
+        Ensure that requirements files are found in nested directories, and
+        that excluded directories and other text files are passed over
+        """
+        with TemporaryDirectory() as directory:
+            relative_path: str
+            for relative_path in (
+                "setup.cfg",
+                "README.txt",
+                "a/requirements.txt",
+                "a/b/requirements-dev.txt",
+                "a/b/tox.ini",
+                "c/pyproject.toml",
+                ".git/requirements.txt",
+                "a/venv/lib/site-packages/x/setup.cfg",
+                "site-packages/tox.ini",
+            ):
+                path: str = os.path.join(directory, relative_path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w"):
+                    pass
+            assert sorted(
+                os.path.relpath(path, directory).replace(os.path.sep, "/")
+                for path in iter_find_requirements_files(directory, jobs=2)
+            ) == [
+                "a/b/requirements-dev.txt",
+                "a/b/tox.ini",
+                "a/requirements.txt",
+                "c/pyproject.toml",
+                "setup.cfg",
+            ]
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,294 @@
+import unittest
+import os
+import sys
+from tempfile import mkdtemp
+from shutil import rmtree
+from typing import FrozenSet, List, Set, Tuple
+from packaging.requirements import Requirement
+from daves_dev_tools.requirements.utilities import (
+    RequirementGraph,
+    _get_install_requirement_string,
+    _iter_missing_requirements,
+    _setup_metadata,
+    get_installed_distributions,
+    get_parse_cache_info,
+    get_python_executable,
+    get_python_site_packages,
+    set_target_environment,
+    get_setup_distribution_name,
+    get_setup_distribution_version,
+    parse_requirement,
+)
+from daves_dev_tools.requirements.update import (
+    get_updated_requirement_string,
+)
+from daves_dev_tools.requirements import index
+from helpers import CacheDirectoryTestCase, write_dist_info, write_file
+
+
+class TestRequirementsUtilities(CacheDirectoryTestCase):
+    """
+    This test case validates functionality for
+    `daves_dev_tools.requirements.utilities`
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.project_directory: str = mkdtemp(prefix="test_project_")
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        rmtree(self.project_directory, ignore_errors=True)
+
+    def _write(self, file_name: str, data: str) -> None:
+        write_file(os.path.join(self.project_directory, file_name), data)
+
+    def test_get_setup_static_metadata(self) -> None:
+        """
+        Ensure that literal names and versions are read from setup.py and
+        pyproject.toml files without executing setup.py
+        """
+        # A setup.py script which would fail if executed
+        self._write(
+            "setup.py",
+            "import not_a_real_module\n"
+            'VERSION = "1.2.3"\n'
+            'not_a_real_module.setup(name="Project_A", version=VERSION)\n',
+        )
+        assert (
+            get_setup_distribution_name(self.project_directory) == "project-a"
+        )
+        assert (
+            get_setup_distribution_version(self.project_directory) == "1.2.3"
+        )
+        # PEP 621 metadata takes precedence over setup.py, unless dynamic
+        self._write(
+            "pyproject.toml",
+            '[project]\nname = "project-b"\ndynamic = ["version"]\n',
+        )
+        assert (
+            get_setup_distribution_name(self.project_directory) == "project-b"
+        )
+        assert (
+            get_setup_distribution_version(self.project_directory) == "1.2.3"
+        )
+
+    def test_setup_metadata_cache(self) -> None:
+        """
+        Ensure that cached setup metadata is invalidated when a setup file
+        changes
+        """
+        self._write("setup.cfg", "[metadata]\nname = project-a\n")
+        assert (
+            get_setup_distribution_name(self.project_directory) == "project-a"
+        )
+        # Clear the in-memory cache, to ensure the on-disk cache is used
+        _setup_metadata.clear()
+        assert (
+            get_setup_distribution_name(self.project_directory) == "project-a"
+        )
+        self._write("setup.cfg", "[metadata]\nname = project-bc\n")
+        assert (
+            get_setup_distribution_name(self.project_directory) == "project-bc"
+        )
+
+    def test_setup_metadata_cache_dynamic(self) -> None:
+        """
+        Ensure that values retrieved by executing setup.py are not cached
+        across commands, since they may be derived from other sources
+        """
+        self._write("VERSION", "1.0\n")
+        self._write(
+            "setup.py",
+            "from setuptools import setup\n"
+            'with open("VERSION") as version_io:\n'
+            '    setup(name="project-a", version=version_io.read().strip())\n',
+        )
+        assert get_setup_distribution_version(self.project_directory) == "1.0"
+        self._write("VERSION", "1.1\n")
+        # The in-memory cache is retained for the current command...
+        assert get_setup_distribution_version(self.project_directory) == "1.0"
+        # ...but subsequent commands re-execute setup.py
+        _setup_metadata.clear()
+        assert get_setup_distribution_version(self.project_directory) == "1.1"
+
+    def test_iter_missing_requirements(self) -> None:
+        """
+        Ensure that only distributions which are not installed are identified
+        as missing, and that install requirement strings omit markers
+        """
+        missing: List[Requirement] = list(
+            _iter_missing_requirements(
+                (
+                    Requirement("packaging"),
+                    Requirement(
+                        'not-a-real-distribution[a]>=1 ; extra == "b"'
+                    ),
+                    Requirement("another-not-real-distribution"),
+                ),
+                exclude={"another-not-real-distribution"},
+            )
+        )
+        assert [requirement.name for requirement in missing] == [
+            "not-a-real-distribution"
+        ]
+        assert (
+            _get_install_requirement_string(missing[0])
+            == "not-a-real-distribution[a]>=1"
+        )
+
+    def test_requirement_graph(self) -> None:
+        """
+        Ensure that requirement closures are resolved, memoized, and halted
+        at excluded distributions
+        """
+        graph: RequirementGraph = RequirementGraph()
+        closure: FrozenSet[Tuple[str, Tuple[str, ...]]] = graph.get_closure(
+            Requirement("flake8")
+        )
+        names: Set[str] = {name for name, extras in closure}
+        assert {"flake8", "pyflakes", "pycodestyle", "mccabe"} <= names
+        assert graph.get_closure(Requirement("flake8")) is closure
+        names = {
+            name
+            for name, extras in graph.get_closure(
+                Requirement("flake8"), exclude={"pyflakes"}
+            )
+        }
+        assert "pyflakes" not in names
+        assert "pycodestyle" in names
+
+    def test_target_environment(self) -> None:
+        """
+        Ensure that distributions are read from a target environment's
+        site-packages directories (and from directories added by *.pth
+        files), without running its interpreter
+        """
+        self._write(
+            "pyvenv.cfg", "home = /not/a/python/bin\nversion = 3.9.1\n"
+        )
+        os.makedirs(os.path.join(self.project_directory, "bin"))
+        # The "interpreter" is not executable, so this would fail if run
+        python: str = os.path.join(self.project_directory, "bin", "python")
+        self._write(os.path.join("bin", "python"), "")
+        site_packages: str = os.path.join(
+            self.project_directory, "lib", "python3.9", "site-packages"
+        )
+        os.makedirs(os.path.join(site_packages, "package_a-1.0.dist-info"))
+        self._write(
+            os.path.join(site_packages, "package_a-1.0.dist-info", "METADATA"),
+            "Name: package-a\nVersion: 1.0\n",
+        )
+        os.makedirs(
+            os.path.join(self.project_directory, "src", "package_b.egg-info")
+        )
+        self._write(
+            os.path.join("src", "package_b.egg-info", "PKG-INFO"),
+            "Name: package-b\nVersion: 2.0\n",
+        )
+        self._write(
+            os.path.join(site_packages, "package_b.pth"), "../../../src\n"
+        )
+        assert get_python_site_packages(python) == (site_packages,)
+        try:
+            set_target_environment(python)
+            assert get_python_executable() == python
+            assert set(get_installed_distributions().keys()) == {
+                "package-a",
+                "package-b",
+            }
+        finally:
+            set_target_environment()
+        assert "package-a" not in get_installed_distributions()
+
+    def test_target_environment_markers(self) -> None:
+        """
+        Ensure that environment markers are evaluated using the python
+        version and platform of a target environment, rather than those of
+        the running interpreter
+        """
+        version: str = "2.7" if sys.version_info[0] > 2 else "3.9"
+        site_packages: str = os.path.join(
+            self.project_directory, "lib", f"python{version}", "site-packages"
+        )
+        write_dist_info(
+            site_packages,
+            "package-a",
+            "1.0",
+            requires_dist=(
+                f'package-b ; python_version == "{version}"',
+                f'package-c ; python_version != "{version}"',
+                'package-d ; sys_platform == "win32"',
+            ),
+        )
+        write_dist_info(site_packages, "package-b", "1.0")
+        windows_site_packages: str = os.path.join(
+            self.project_directory, "windows", "Lib", "site-packages"
+        )
+        write_dist_info(
+            windows_site_packages,
+            "package-a",
+            "1.0",
+            requires_dist=('package-d ; sys_platform == "win32"',),
+        )
+        try:
+            set_target_environment(site_packages=site_packages)
+            assert [
+                requirement.name
+                for requirement in get_installed_distributions()[
+                    "package-a"
+                ].requires()
+            ] == ["package-b"]
+            assert {
+                name
+                for name, extras in RequirementGraph().get_closure(
+                    Requirement("package-a")
+                )
+            } == {"package-a", "package-b"}
+            # The version found in pyvenv.cfg is used when the target is
+            # identified by its python executable
+            self._write(
+                "pyvenv.cfg",
+                f"home = /not/a/python/bin\nversion = {version}.1\n",
+            )
+            self._write(os.path.join("bin", "python"), "")
+            set_target_environment(
+                os.path.join(self.project_directory, "bin", "python")
+            )
+            assert [
+                requirement.name
+                for requirement in get_installed_distributions()[
+                    "package-a"
+                ].requires()
+            ] == ["package-b"]
+            set_target_environment(site_packages=windows_site_packages)
+            assert [
+                requirement.name
+                for requirement in get_installed_distributions()[
+                    "package-a"
+                ].requires()
+            ] == ["package-d"]
+        finally:
+            set_target_environment()
+        assert not index._marker_environment
+
+    def test_parse_requirement(self) -> None:
+        """
+        Ensure that parsed requirements are re-used, that hits and misses
+        are counted, and that updating a requirement string does not modify
+        the shared requirement
+        """
+        requirement_string: str = "test-parse-requirement>=1.0"
+        misses: int = get_parse_cache_info()["requirement"]["misses"]
+        requirement: Requirement = parse_requirement(requirement_string)
+        hits: int = get_parse_cache_info()["requirement"]["hits"]
+        assert get_parse_cache_info()["requirement"]["misses"] == misses + 1
+        assert parse_requirement(requirement_string) is requirement
+        assert get_parse_cache_info()["requirement"]["hits"] == hits + 1
+        flake8_requirement: Requirement = parse_requirement("flake8>=0.0")
+        assert get_updated_requirement_string("flake8>=0.0") != "flake8>=0.0"
+        assert str(flake8_requirement.specifier) == ">=0.0"
+
+
+if __name__ == "__main__":
+    unittest.main()
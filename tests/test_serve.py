@@ -0,0 +1,115 @@
+import unittest
+import os
+import socket
+import sys
+from contextlib import redirect_stdout
+from io import StringIO
+from subprocess import check_call
+from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import Dict
+from daves_dev_tools.requirements.utilities import (
+    get_requirement_string_distribution_name,
+)
+from daves_dev_tools.serve import (
+    _Daemon,
+    _redirect_output,
+    _use_environment,
+    forward,
+    request,
+    serve,
+)
+
+
+@unittest.skipUnless(
+    hasattr(socket, "AF_UNIX"), "Unix domain sockets are not supported"
+)
+class TestServe(unittest.TestCase):
+    """
+    This test case validates functionality for `daves_dev_tools.serve`
+    """
+
+    def test_forward(self) -> None:
+        """
+        Ensure that commands sent to the daemon produce the same output and
+        status as when run locally, and that the daemon can be stopped
+        """
+        with TemporaryDirectory() as directory:
+            socket_path: str = os.path.join(directory, "test.sock")
+            # Nothing is forwarded while the daemon is not running
+            assert forward(("requirements", "freeze"), socket_path) is None
+            thread: Thread = Thread(
+                target=serve, args=(socket_path,), kwargs={"timeout": 60}
+            )
+            thread.start()
+            try:
+                while not os.path.exists(socket_path):
+                    thread.join(0.05)
+                    assert thread.is_alive()
+                stdout: StringIO = StringIO()
+                with redirect_stdout(stdout):
+                    status = forward(
+                        ("requirements", "freeze", "flake8"), socket_path
+                    )
+                assert status == 0
+                assert stdout.getvalue().startswith("flake8==")
+                assert "pycodestyle==" in stdout.getvalue()
+                # Argument errors are reported with a non-zero status
+                with redirect_stdout(StringIO()):
+                    status = forward(
+                        ("requirements", "freeze", "--not-an-option"),
+                        socket_path,
+                    )
+                assert status == 2
+            finally:
+                request({"command": "stop"}, socket_path)
+                thread.join(60)
+            assert not thread.is_alive()
+            assert not os.path.exists(socket_path)
+
+    def test_reset(self) -> None:
+        """
+        Ensure that paths are resolved relative to the working directory of
+        the current command, not that of a prior command
+        """
+        daemon: _Daemon = _Daemon()
+        current_directory: str = os.getcwd()
+        with TemporaryDirectory() as directory:
+            try:
+                name: str
+                for name in ("project-a", "project-b"):
+                    os.mkdir(os.path.join(directory, name))
+                    os.chdir(os.path.join(directory, name))
+                    with open("setup.cfg", "w") as file_io:
+                        file_io.write(f"[metadata]\nname = {name}\n")
+                    daemon.reset()
+                    assert get_requirement_string_distribution_name(".") == (
+                        name
+                    )
+            finally:
+                os.chdir(current_directory)
+
+    def test_redirect_output(self) -> None:
+        """
+        Ensure that commands are run with the client's environment
+        variables, and that the output of sub-processes is captured
+        """
+        output: Dict[str, str]
+        with _use_environment(
+            dict(os.environ, DAVES_DEV_TOOLS_TEST="b")
+        ), _redirect_output() as output:
+            print("a")
+            check_call(
+                (
+                    sys.executable,
+                    "-c",
+                    "import os\nprint(os.environ['DAVES_DEV_TOOLS_TEST'])",
+                )
+            )
+            print("c", file=sys.stderr)
+        assert output == {"stdout": "a\nb\n", "stderr": "c\n"}
+        assert "DAVES_DEV_TOOLS_TEST" not in os.environ
+
+
+if __name__ == "__main__":
+    unittest.main()